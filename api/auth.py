@@ -1,13 +1,20 @@
+import os
+import threading
+import uuid
 from datetime import datetime, timedelta
-from typing import Generator
+from typing import Generator, NamedTuple, Optional
 
+from cachetools import TTLCache
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event, select
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from database.db import SessionLocal
+from api.verificacao_senhas import VerificadorSenhas
+from database.db import SessionLocal, iniciar_sessoes_assincronas
 from models.user import User
 
 # Configurações de segurança
@@ -15,6 +22,10 @@ SECRET_KEY = "chave-secreta"                    # TEMPORÁRIA PARA TESTES -> ENV
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Cache dos usuários autenticados: evita uma consulta ao banco a cada requisição protegida
+AUTH_CACHE_TTL_SEGUNDOS = float(os.getenv("AUTH_CACHE_TTL_SEGUNDOS", "60"))
+AUTH_CACHE_MAX = int(os.getenv("AUTH_CACHE_MAX", "10000"))
+
 # Instância do gerador de hash de senha
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -33,6 +44,37 @@ def get_db() -> Generator[Session, None, None]:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+# Dados do usuário autenticado que os endpoints usam (não depende de uma sessão aberta)
+class UsuarioAutenticado(NamedTuple):
+    id: int
+    username: str
+    is_admin: bool
+
+
+# Usuários autenticados por (username, jti do token), por até AUTH_CACHE_TTL_SEGUNDOS.
+# `_geracao_cache` muda a cada invalidação: uma consulta ao banco que começou antes
+# dela não volta a preencher o cache com dados antigos.
+_usuarios_cache: TTLCache = TTLCache(maxsize=AUTH_CACHE_MAX, ttl=AUTH_CACHE_TTL_SEGUNDOS)
+_trava_cache = threading.Lock()
+_geracao_cache = 0
+
+# Remove do cache os tokens de um usuário (ou de todos); chamado quando um usuário muda
+def invalidar_usuario(username: Optional[str] = None) -> None:
+    global _geracao_cache
+    with _trava_cache:
+        _geracao_cache += 1
+        if username is None:
+            _usuarios_cache.clear()
+            return
+        for chave in [chave for chave in _usuarios_cache.keys() if chave[0] == username]:
+            _usuarios_cache.pop(chave, None)
+
+# Qualquer alteração ou remoção de usuário feita por esta aplicação invalida o cache
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _usuario_alterado(mapper, connection, target: User) -> None:
+    invalidar_usuario()
+
 # Busca usuário no banco
 def get_user_by_username(db: Session, username: str) -> User | None:
     return db.query(User).filter(User.username == username).first()
@@ -44,19 +86,56 @@ def authenticate_user(db: Session, username: str, password: str) -> User | None:
         return None
     return user
 
-# Gera token JWT
+# Busca usuário numa sessão própria, para uso fora do threadpool
+def _buscar_usuario(username: str) -> User | None:
+    db = SessionLocal()
+    try:
+        return get_user_by_username(db, username)
+    finally:
+        db.close()
+
+# Busca usuário sem bloquear o event loop: sessão assíncrona se DB_ASYNC=1, senão no threadpool
+async def buscar_usuario(username: str) -> User | None:
+    sessoes_assincronas = iniciar_sessoes_assincronas()
+    if sessoes_assincronas is None:
+        return await run_in_threadpool(_buscar_usuario, username)
+    async with sessoes_assincronas() as db:
+        resultado = await db.execute(select(User).where(User.username == username).limit(1))
+        return resultado.scalars().first()
+
+# Mesma autenticação sem bloquear o servidor: a consulta fora do event loop e o bcrypt no pool de processos
+async def autenticar_usuario(username: str, password: str, verificador: VerificadorSenhas) -> User | None:
+    user = await buscar_usuario(username)
+    if not user or not await verificador.verificar(password, user.hashed_password):
+        return None
+    return user
+
+# Gera token JWT (cada token tem um `jti` próprio, que identifica sua entrada no cache)
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-# Pega o usuário atual baseado no token
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
+# Claims do token para o usuário (o `is_admin` vai no token e é conferido contra o banco)
+def claims_usuario(user) -> dict:
+    return {"sub": user.username, "is_admin": bool(user.is_admin)}
+
+# Carrega o usuário do banco e confere que ele ainda corresponde às claims do token
+async def _carregar_usuario(username: str, payload: dict) -> Optional[UsuarioAutenticado]:
+    user = await buscar_usuario(username)
+    if user is None:
+        return None
+    # Um token emitido antes de o usuário mudar de perfil deixa de valer
+    if "is_admin" in payload and bool(payload["is_admin"]) != bool(user.is_admin):
+        return None
+    return UsuarioAutenticado(id=user.id, username=user.username, is_admin=bool(user.is_admin))
+
+# Pega o usuário atual baseado no token: a assinatura é sempre verificada, mas o banco
+# só é consultado na primeira vez que o token aparece (ou depois do TTL/invalidação).
+# É assíncrona para que um acerto no cache não ocupe uma thread do threadpool.
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> UsuarioAutenticado:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Token inválido ou expirado",
@@ -65,13 +144,23 @@ def get_current_user(
 
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
+    except JWTError:
+        raise credentials_exception
+    username: str = payload.get("sub")
+    if username is None:
+        raise credentials_exception
 
-        user = get_user_by_username(db, username)
-        if user is None:
-            raise credentials_exception
+    chave = (username, payload.get("jti"))
+    with _trava_cache:
+        user = _usuarios_cache.get(chave)
+        geracao = _geracao_cache
+    if user is not None:
         return user
-    except JWTError:
-        raise credentials_exception
\ No newline at end of file
+
+    user = await _carregar_usuario(username, payload)
+    if user is None:
+        raise credentials_exception
+    with _trava_cache:
+        if geracao == _geracao_cache:
+            _usuarios_cache[chave] = user
+    return user
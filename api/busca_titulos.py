@@ -0,0 +1,307 @@
+# api/busca_titulos.py
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+TAMANHO_NGRAMA = 3
+_PADRAO_TOKEN = re.compile(r"\w+")
+_VAZIO = np.empty(0, dtype=np.int64)
+
+
+def normalizar(texto: str) -> str:
+    """Remove acentos, converte para minúsculas e colapsa espaços."""
+    decomposto = unicodedata.normalize("NFKD", str(texto))
+    sem_acentos = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return " ".join(sem_acentos.casefold().split())
+
+
+def tokenizar(texto_normalizado: str) -> List[str]:
+    return _PADRAO_TOKEN.findall(texto_normalizado)
+
+
+def ngramas(texto_normalizado: str) -> set:
+    n = TAMANHO_NGRAMA
+    return {texto_normalizado[i:i + n] for i in range(len(texto_normalizado) - n + 1)}
+
+
+def _intersectar(listas: List[np.ndarray]) -> np.ndarray:
+    """Interseção de listas de ids ordenadas, começando pela menor."""
+    if not listas:
+        return _VAZIO
+    listas = sorted(listas, key=len)
+    resultado = listas[0]
+    for lista in listas[1:]:
+        if not len(resultado):
+            break
+        resultado = np.intersect1d(resultado, lista, assume_unique=True)
+    return resultado
+
+
+class IndiceTitulos:
+    """
+    Índice invertido sobre os títulos normalizados (sem acento e em minúsculas):
+
+    - token -> ids dos livros (casamento de palavras e de prefixos de palavras);
+    - trigrama -> ids dos livros (casamento de trechos quaisquer do título);
+    - os títulos numa coluna Arrow, varrida de uma vez para os trechos curtos
+      demais para um trigrama.
+
+    As listas de ids são arrays NumPy ordenados e nunca são alteradas depois de
+    criadas: `atualizado()` devolve um novo índice que compartilha as listas que
+    não mudaram, então requisições em andamento sobre o índice antigo continuam
+    vendo um estado consistente.
+    """
+
+    def __init__(self, titulos: Optional[Mapping[int, str]] = None):
+        self._originais: Dict[int, str] = {}
+        self._titulos: Dict[int, str] = {}
+        self._tokens: Dict[str, np.ndarray] = {}
+        self._ngramas: Dict[str, np.ndarray] = {}
+        self._vocabulario: List[str] = []
+        self._colunas: Optional[Tuple[np.ndarray, pa.Array]] = None
+        if titulos:
+            self._construir(titulos)
+
+    def __len__(self) -> int:
+        return len(self._titulos)
+
+    def tokens(self) -> Iterable[Tuple[str, np.ndarray]]:
+        """Pares (token, ids ordenados dos livros cujo título contém o token)."""
+        return self._tokens.items()
+
+    def _construir(self, titulos: Mapping[int, str]):
+        tokens, trigramas = defaultdict(list), defaultdict(list)
+        for id_livro in sorted(titulos):
+            original = titulos[id_livro]
+            normalizado = normalizar(original)
+            self._originais[id_livro] = original
+            self._titulos[id_livro] = normalizado
+            for token in set(tokenizar(normalizado)):
+                tokens[token].append(id_livro)
+            for trigrama in ngramas(normalizado):
+                trigramas[trigrama].append(id_livro)
+        self._tokens = {t: np.asarray(ids, dtype=np.int64) for t, ids in tokens.items()}
+        self._ngramas = {g: np.asarray(ids, dtype=np.int64) for g, ids in trigramas.items()}
+        self._vocabulario = sorted(self._tokens)
+
+    def atualizado(self, titulos: Mapping[int, str]) -> Tuple["IndiceTitulos", dict]:
+        """
+        Cria um novo índice para o conjunto `titulos` (id -> título) reaproveitando
+        este: só os livros novos, alterados ou removidos têm suas entradas refeitas.
+
+        Returns:
+            tuple: O novo índice e a contagem de livros adicionados, alterados e removidos.
+        """
+        adicionar: Dict[str, set] = defaultdict(set)
+        remover: Dict[str, set] = defaultdict(set)
+        adicionar_ng: Dict[str, set] = defaultdict(set)
+        remover_ng: Dict[str, set] = defaultdict(set)
+        delta = {"adicionados": 0, "alterados": 0, "removidos": 0}
+
+        novo = IndiceTitulos()
+        novo._originais = dict(self._originais)
+        novo._titulos = dict(self._titulos)
+
+        for id_livro, original in titulos.items():
+            anterior = self._originais.get(id_livro)
+            if anterior == original:
+                continue
+            normalizado = normalizar(original)
+            if anterior is None:
+                delta["adicionados"] += 1
+                tokens_antigos, ngramas_antigos = set(), set()
+            else:
+                delta["alterados"] += 1
+                tokens_antigos = set(tokenizar(self._titulos[id_livro]))
+                ngramas_antigos = ngramas(self._titulos[id_livro])
+            tokens_novos, ngramas_novos = set(tokenizar(normalizado)), ngramas(normalizado)
+            for token in tokens_antigos - tokens_novos:
+                remover[token].add(id_livro)
+            for token in tokens_novos - tokens_antigos:
+                adicionar[token].add(id_livro)
+            for trigrama in ngramas_antigos - ngramas_novos:
+                remover_ng[trigrama].add(id_livro)
+            for trigrama in ngramas_novos - ngramas_antigos:
+                adicionar_ng[trigrama].add(id_livro)
+            novo._originais[id_livro] = original
+            novo._titulos[id_livro] = normalizado
+
+        for id_livro in self._originais.keys() - titulos.keys():
+            delta["removidos"] += 1
+            for token in set(tokenizar(self._titulos[id_livro])):
+                remover[token].add(id_livro)
+            for trigrama in ngramas(self._titulos[id_livro]):
+                remover_ng[trigrama].add(id_livro)
+            del novo._originais[id_livro]
+            del novo._titulos[id_livro]
+
+        novo._tokens = self._aplicar(self._tokens, adicionar, remover)
+        novo._ngramas = self._aplicar(self._ngramas, adicionar_ng, remover_ng)
+        novo._vocabulario = (
+            sorted(novo._tokens) if (adicionar or remover) else self._vocabulario
+        )
+        return novo, delta
+
+    @staticmethod
+    def _aplicar(listas: Dict[str, np.ndarray], adicionar: Dict[str, set],
+                 remover: Dict[str, set]) -> Dict[str, np.ndarray]:
+        """Copia o dicionário e substitui apenas as listas de ids que mudaram."""
+        resultado = dict(listas)
+        for chave in adicionar.keys() | remover.keys():
+            ids = resultado.get(chave, _VAZIO)
+            if chave in remover:
+                ids = np.setdiff1d(ids, np.fromiter(remover[chave], dtype=np.int64), assume_unique=True)
+            if chave in adicionar:
+                ids = np.union1d(ids, np.fromiter(adicionar[chave], dtype=np.int64))
+            if len(ids):
+                resultado[chave] = ids
+            else:
+                resultado.pop(chave, None)
+        return resultado
+
+    def _listas_por_prefixo(self, prefixo: str) -> Iterable[np.ndarray]:
+        """Listas de ids de cada palavra do vocabulário que começa com `prefixo`."""
+        vocabulario = self._vocabulario
+        # Por índice: islice avançaria elemento a elemento até a posição da busca binária
+        posicao = bisect_left(vocabulario, prefixo)
+        while posicao < len(vocabulario) and vocabulario[posicao].startswith(prefixo):
+            yield self._tokens[vocabulario[posicao]]
+            posicao += 1
+
+    def _ids_por_prefixo(self, prefixo: str) -> np.ndarray:
+        """Ids dos livros com alguma palavra que começa com `prefixo`."""
+        listas = list(self._listas_por_prefixo(prefixo))
+        if not listas:
+            return _VAZIO
+        return listas[0] if len(listas) == 1 else np.unique(np.concatenate(listas))
+
+    def _coluna_titulos(self) -> Tuple[np.ndarray, pa.Array]:
+        """Ids ordenados e os títulos normalizados na mesma ordem, montados no primeiro uso."""
+        colunas = self._colunas
+        if colunas is None:
+            ids = sorted(self._titulos)
+            colunas = (np.asarray(ids, dtype=np.int64), pa.array([self._titulos[i] for i in ids], type=pa.string()))
+            self._colunas = colunas
+        return colunas
+
+    def _ids_por_trecho(self, consulta: str) -> np.ndarray:
+        """Ids dos livros cujo título normalizado contém `consulta`."""
+        if len(consulta) < TAMANHO_NGRAMA:
+            # Sem trigrama para filtrar: a busca literal do Arrow percorre todos os títulos em C
+            ids, titulos = self._coluna_titulos()
+            return ids[pc.match_substring(titulos, consulta).to_numpy(zero_copy_only=False)]
+        listas = [self._ngramas.get(g, _VAZIO) for g in ngramas(consulta)]
+        candidatos = _intersectar(listas).tolist()
+        return np.fromiter(
+            (i for i in candidatos if consulta in self._titulos[i]), dtype=np.int64
+        )
+
+    def _pontuar(self, id_livro: int, consulta: str, tokens: List[str]) -> float:
+        titulo = self._titulos[id_livro]
+        palavras = tokenizar(titulo)
+        pontos = 0.0
+        if titulo == consulta:
+            pontos += 1000
+        elif titulo.startswith(consulta):
+            pontos += 500
+        posicao = titulo.find(consulta)
+        if posicao >= 0:
+            pontos += 200 - min(posicao, 100)
+        for token in tokens:
+            if token in palavras:
+                pontos += 20
+            elif any(p.startswith(token) for p in palavras):
+                pontos += 10
+        # Títulos mais curtos são casamentos mais precisos
+        return pontos - len(titulo) / 1000
+
+    def encontrar(self, consulta: str) -> np.ndarray:
+        """
+        Ids (ordenados) dos livros que casam com a consulta, sem ranquear.
+
+        Um livro casa se o título contém a consulta como trecho (como o antigo
+        `str.contains`) ou se cada palavra da consulta é prefixo de alguma palavra
+        do título. Acentos e maiúsculas são ignorados. Uma consulta em branco
+        não casa com nada (o MotorConsultas a trata como ausência de filtro).
+        """
+        consulta = normalizar(consulta)
+        if not consulta:
+            return _VAZIO
+        tokens = tokenizar(consulta)
+        por_trecho = self._ids_por_trecho(consulta)
+        por_tokens = _intersectar([self._ids_por_prefixo(t) for t in tokens]) if tokens else _VAZIO
+        return np.union1d(por_trecho, por_tokens)
+
+    def estimar(self, consulta: str) -> int:
+        """
+        Limite superior de quantos livros `encontrar` devolveria, sem intersectar
+        listas: a menor lista de trigramas da consulta mais, entre as palavras da
+        consulta, a menor soma das listas dos prefixos.
+        """
+        consulta = normalizar(consulta)
+        if not consulta:
+            return 0
+        if len(consulta) < TAMANHO_NGRAMA:
+            por_trecho = len(self)
+        else:
+            por_trecho = min(len(self._ngramas.get(g, _VAZIO)) for g in ngramas(consulta))
+        por_tokens = min(
+            (sum(len(ids) for ids in self._listas_por_prefixo(t)) for t in tokenizar(consulta)), default=0
+        )
+        return min(len(self), por_trecho + por_tokens)
+
+    def casam(self, consulta: str, ids: np.ndarray) -> np.ndarray:
+        """
+        Máscara dos `ids` que casam com a consulta (mesmo critério de `encontrar`),
+        conferindo título a título. Para poucos candidatos, vindos de outro
+        índice, sai mais barato que consultar as listas do índice de títulos.
+        """
+        consulta = normalizar(consulta)
+        if not consulta:
+            return np.zeros(len(ids), dtype=bool)
+        tokens = tokenizar(consulta)
+
+        def casa(id_livro: int) -> bool:
+            titulo = self._titulos[id_livro]
+            if consulta in titulo:
+                return True
+            palavras = tokenizar(titulo)
+            return bool(tokens) and all(any(p.startswith(t) for p in palavras) for t in tokens)
+
+        return np.fromiter((casa(i) for i in ids.tolist()), dtype=bool, count=len(ids))
+
+    def ranquear(self, consulta: str, ids: np.ndarray, limite: Optional[int] = None,
+                 deslocamento: int = 0) -> List[int]:
+        """Ordena `ids` (livros que casam com a consulta) do mais para o menos relevante."""
+        consulta = normalizar(consulta)
+        tokens = tokenizar(consulta)
+        chave = lambda i: (-self._pontuar(i, consulta, tokens), i)
+        if limite is None:
+            return sorted(ids.tolist(), key=chave)[deslocamento:]
+        return heapq.nsmallest(deslocamento + limite, ids.tolist(), key=chave)[deslocamento:]
+
+    def buscar(self, consulta: str, candidatos: Optional[np.ndarray] = None,
+               limite: Optional[int] = None, deslocamento: int = 0) -> List[int]:
+        """
+        Busca livros pelo título (ver `encontrar`) e retorna seus ids ordenados por relevância.
+
+        Args:
+            consulta (str): Texto buscado.
+            candidatos (np.ndarray, opcional): Restringe a busca a estes ids.
+            limite (int, opcional): Máximo de resultados retornados.
+            deslocamento (int): Quantos resultados pular (paginação).
+
+        Returns:
+            list[int]: Ids dos livros, do mais para o menos relevante.
+        """
+        encontrados = self.encontrar(consulta)
+        if candidatos is not None:
+            encontrados = np.intersect1d(encontrados, candidatos)
+        return self.ranquear(consulta, encontrados, limite, deslocamento)
@@ -0,0 +1,105 @@
+# api/cache_respostas.py
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from fastapi import Request, Response, status
+from pydantic import TypeAdapter
+
+from api.instrumentacao import medir
+
+
+class RespostaCacheada(NamedTuple):
+    """Corpo JSON já serializado e seu ETag."""
+    corpo: bytes
+    etag: str
+
+
+def serializar_json(conteudo: Any) -> bytes:
+    """Serializa no mesmo formato do JSONResponse do FastAPI (UTF-8, sem espaços)."""
+    return json.dumps(
+        conteudo, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def etag_do_corpo(corpo: bytes) -> str:
+    """ETag forte derivado do conteúdo: igual entre workers que servem os mesmos dados."""
+    return '"' + hashlib.blake2b(corpo, digest_size=12).hexdigest() + '"'
+
+
+def etag_confere(request: Request, etag: str) -> bool:
+    """Verifica se o cabeçalho If-None-Match da requisição contém o ETag informado."""
+    cabecalho = request.headers.get("if-none-match")
+    if not cabecalho:
+        return False
+    if cabecalho.strip() == "*":
+        return True
+    return etag in (valor.strip().removeprefix("W/") for valor in cabecalho.split(","))
+
+
+class CacheRespostas:
+    """
+    Respostas JSON pré-serializadas dos endpoints estáticos do catálogo.
+
+    O cache pertence a uma geração do conjunto de dados: é montado por completo
+    quando o CSV é carregado (ou recarregado) e nunca é alterado depois, então
+    servir uma resposta custa apenas copiar os bytes já prontos. Respostas
+    caras e pouco pedidas podem ser registradas sob demanda: são geradas na
+    primeira requisição da geração e servidas do cache a partir daí.
+    """
+
+    def __init__(self, geracao: int):
+        self.geracao = geracao
+        self._respostas: Dict[str, RespostaCacheada] = {}
+        self._sob_demanda: Dict[str, Tuple[Callable[[], Any], Optional[Any]]] = {}
+        self._trava = threading.Lock()
+
+    def registrar(self, chave: str, conteudo: Any, modelo: Optional[Any] = None) -> RespostaCacheada:
+        """
+        Serializa `conteudo` e guarda o resultado em `chave`. Se `modelo` for
+        informado, o conteúdo é validado uma única vez contra ele, como o FastAPI
+        faria com o `response_model` a cada requisição.
+        """
+        if modelo is not None:
+            with medir(f"respostas.{chave}.validacao"):
+                adaptador = TypeAdapter(modelo)
+                conteudo = adaptador.dump_python(adaptador.validate_python(conteudo), mode="json")
+        with medir(f"respostas.{chave}.json"):
+            corpo = serializar_json(conteudo)
+        return self.registrar_bytes(chave, corpo)
+
+    def registrar_bytes(self, chave: str, corpo: bytes) -> RespostaCacheada:
+        """Guarda em `chave` um corpo JSON já serializado."""
+        resposta = RespostaCacheada(corpo=corpo, etag=etag_do_corpo(corpo))
+        self._respostas[chave] = resposta
+        return resposta
+
+    def registrar_sob_demanda(self, chave: str, gerar: Callable[[], Any], modelo: Optional[Any] = None) -> None:
+        """Como `registrar`, mas `gerar()` só é chamado quando `chave` for pedida pela primeira vez."""
+        self._sob_demanda[chave] = (gerar, modelo)
+
+    def obter(self, chave: str) -> RespostaCacheada:
+        resposta = self._respostas.get(chave)
+        if resposta is not None:
+            return resposta
+        with self._trava:  # gera uma vez só, mesmo com requisições simultâneas
+            if chave not in self._respostas:
+                gerar, modelo = self._sob_demanda[chave]
+                with medir(f"respostas.{chave}.gerar"):
+                    conteudo = gerar()
+                self.registrar(chave, conteudo, modelo)
+                # Só sai da lista depois de gerada: se gerar() ou a validação falhar, a próxima requisição tenta de novo
+                del self._sob_demanda[chave]
+            return self._respostas[chave]
+
+    def responder(self, chave: str, request: Request) -> Response:
+        """
+        Monta a resposta HTTP para `chave`: 304 sem corpo se o cliente já tem a
+        versão atual (If-None-Match), ou 200 com os bytes pré-serializados.
+        """
+        resposta = self.obter(chave)
+        cabecalhos = {"ETag": resposta.etag, "Cache-Control": "no-cache"}
+        if etag_confere(request, resposta.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabecalhos)
+        return Response(content=resposta.corpo, media_type="application/json", headers=cabecalhos)
@@ -0,0 +1,84 @@
+# api/capas.py
+"""
+Capas dos livros servidas pela própria API, a partir do armazém local que o
+scraping preenche (scripts/capas_livros.py). Os clientes deixam de buscar
+centenas de imagens no site original a cada página do catálogo, e o catálogo
+funciona sem acesso à internet.
+
+- GET /api/v1/covers/{hash}: a capa pelo hash do conteúdo. A URL nunca muda de
+  conteúdo, então vai com cache imutável de um ano.
+- GET /api/v1/books/{id}/cover: redireciona para a URL por hash (ou para a
+  imagem original, se a capa ainda não foi baixada). O id é a posição do livro
+  no CSV e pode mudar numa recarga, então o redirecionamento não é guardado
+  em cache sem revalidar.
+
+Com CAPAS_URL_LOCAL=1, o campo `imagem` de cada livro passa a apontar para a
+URL por hash da capa (ou para a rota por id, se ela ainda não foi baixada),
+prefixada por CAPAS_URL_BASE, se definida. A URL original continua guardada no
+catálogo para localizar a capa no armazém.
+"""
+import os
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+
+from api.cache_respostas import etag_confere
+from api.compactacao import LeitorColunas, substituir_coluna
+from scripts.capas_livros import ArmazemCapas
+
+# `imagem` aponta para a capa servida pela API em vez do site original (ative com CAPAS_URL_LOCAL=1)
+CAPAS_URL_LOCAL = os.getenv("CAPAS_URL_LOCAL", "0").lower() not in ("0", "false", "nao", "não")
+# Origem pública da API para montar URLs absolutas (ex.: https://consulta-livros.onrender.com); vazio = caminho relativo
+CAPAS_URL_BASE = os.getenv("CAPAS_URL_BASE", "").rstrip("/")
+
+# A URL por hash identifica o conteúdo: cache de um ano, sem revalidar
+CACHE_CONTROL_CAPAS = "public, max-age=31536000, immutable"
+# O id de um livro pode apontar para outra capa depois de uma recarga: o cliente sempre revalida
+CACHE_CONTROL_CAPA_POR_ID = "no-cache"
+
+# Capas baixadas pelo scraping (data/capas); o índice é relido quando o scraping baixa capas novas
+armazem_capas = ArmazemCapas()
+
+
+def url_capa(id_livro: int) -> str:
+    return f"{CAPAS_URL_BASE}/api/v1/books/{id_livro}/cover"
+
+
+def url_capa_por_hash(hash_capa: str) -> str:
+    return f"{CAPAS_URL_BASE}/api/v1/covers/{hash_capa}"
+
+
+def apontar_capas_locais(dados: pd.DataFrame, armazem: ArmazemCapas = armazem_capas) -> Tuple[pd.DataFrame, LeitorColunas]:
+    """
+    Troca `imagem` pela URL da capa na API: a URL por hash para as capas que já
+    estão no armazém e a rota por id para as demais.
+
+    Returns:
+        tuple: Os dados com as URLs locais e um leitor da coluna `imagem` original
+        (compacta, se os dados forem), para localizar as capas no armazém.
+    """
+    originais = LeitorColunas(dados[["imagem"]])
+    locais = []
+    for id_livro, imagem in zip(dados["id"].tolist(), originais.linhas(np.arange(len(dados)))["imagem"].tolist()):
+        capa = armazem.localizar(imagem) if isinstance(imagem, str) and imagem else None
+        locais.append(url_capa(id_livro) if capa is None else url_capa_por_hash(capa.hash))
+    return substituir_coluna(dados, "imagem", locais), originais
+
+
+def resposta_capa(request: Request, caminho: str, etag: str) -> Response:
+    """
+    O arquivo da capa com cache imutável e ETag (304 se o cliente já tem a mesma
+    versão). FileResponse usa o `http.response.pathsend` do servidor quando ele
+    oferece (envio do arquivo sem passar pelo Python) e, senão, lê em blocos.
+
+    Raises:
+        FileNotFoundError: Se o arquivo não existir.
+    """
+    info = os.stat(caminho)
+    cabecalhos = {"ETag": etag, "Cache-Control": CACHE_CONTROL_CAPAS}
+    if etag_confere(request, etag):
+        return Response(status_code=304, headers=cabecalhos)
+    return FileResponse(caminho, headers=cabecalhos, stat_result=info)
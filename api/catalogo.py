@@ -0,0 +1,307 @@
+# api/catalogo.py
+import functools
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from api.busca_titulos import IndiceTitulos
+from api.cache_respostas import CacheRespostas
+from api.capas import CAPAS_URL_LOCAL, apontar_capas_locais
+from api.compactacao import CATALOGO_COMPACTO, compactar
+from api.consulta_livros import MotorConsultas
+from api.estatisticas import EstatisticasCatalogo
+from api.indice_catalogo import IndiceCatalogo
+from api.instrumentacao import medir, registrar_catalogo
+from api.similaridade import IndiceSimilaridade
+from api.serializacao import registros_json, validar_esquema
+from models.book_models import Book, StatsOverview, CategoryStats, StatsDistribuicao
+from scripts.armazenamento_livros import assinatura_livros, caminho_colunar, ler_livros
+
+CAMINHO_CSV = "data/info_livros.csv"
+COLUNAS_LIVROS = ['id', 'titulo', 'preco', 'avaliacao', 'disponibilidade', 'estoque', 'categoria', 'imagem']
+
+logger = logging.getLogger("api.catalogo")
+
+
+def carregar_dados_livros(caminho: str = CAMINHO_CSV) -> pd.DataFrame:
+    """
+    Lê os livros do scraping (do Arrow por memory-map, se estiver em dia com o
+    CSV, ou do próprio CSV), adiciona a coluna 'id' e converte os tipos das
+    colunas, validando o resultado contra o modelo `Book` uma única vez. Com
+    CATALOGO_COMPACTO (padrão), os dados ficam no formato compacto de
+    api/compactacao.py e só são decodificados na serialização.
+    Se o arquivo não existir, retorna um DataFrame vazio para que a API continue de pé.
+    """
+    try:
+        # O caminho para o CSV deve ser relativo ao local onde você executa o uvicorn
+        # Preço, avaliação e estoque já chegam convertidos (ver scripts/armazenamento_livros.py)
+        with medir("catalogo.leitura"):
+            dados_livros = ler_livros(caminho)
+
+        # Adiciona uma coluna 'id' baseada na posição da linha
+        # (insert em vez de reset_index: não copia as colunas mapeadas do arquivo)
+        dados_livros.insert(0, 'id', np.arange(len(dados_livros), dtype=np.int64))
+        dados_livros['disponibilidade'] = dados_livros['disponibilidade'].astype(bool)
+
+    except FileNotFoundError:
+        print(f"ERRO: O arquivo '{caminho}' não foi encontrado. Certifique-se de que o scraping já foi executado.")
+        # Cria um DataFrame vazio para evitar que a API quebre ao iniciar
+        dados_livros = pd.DataFrame(columns=COLUNAS_LIVROS)
+
+    with medir("catalogo.validacao"):
+        dados_livros = validar_esquema(dados_livros, Book)
+    if not CATALOGO_COMPACTO:
+        return dados_livros
+    with medir("catalogo.compactacao"):
+        return compactar(dados_livros)
+
+
+def listar_categorias(dados: pd.DataFrame) -> List[str]:
+    """Lista ordenada com todas as categorias de livros únicas."""
+    return sorted(dados["categoria"].dropna().unique().tolist())
+
+
+class Catalogo:
+    """
+    Snapshot do acervo de livros associado a um número de geração: o DataFrame,
+    os índices em memória (inclusive o de livros similares) e as respostas pré-serializadas dos endpoints estáticos.
+    Tudo é calculado de uma vez na construção; uma recarga cria um novo Catalogo
+    em vez de alterar este. Se o catálogo `anterior` for informado, o índice de
+    títulos e as estatísticas são atualizados de forma incremental a partir dos dele.
+    Com CAPAS_URL_LOCAL, `imagem` aponta para a capa servida pela API (api/capas.py).
+    """
+
+    def __init__(self, dados: pd.DataFrame, geracao: int = 1, anterior: Optional["Catalogo"] = None,
+                 assinatura: Optional[tuple] = None):
+        self._imagens_originais = None
+        if CAPAS_URL_LOCAL:
+            dados, self._imagens_originais = apontar_capas_locais(dados)
+        self.dados = dados
+        self.geracao = geracao
+        self.assinatura = assinatura
+        self.carregado_em = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+        with medir("catalogo.indices"):
+            self.indice = IndiceCatalogo(dados)
+
+        titulos = dict(zip(dados["id"].tolist(), dados["titulo"].fillna("").astype(str).tolist()))
+        ordem_preco = self.indice.ordenados("preco")[1]
+        if anterior is not None:
+            with medir("catalogo.busca"):
+                self.busca, _ = anterior.busca.atualizado(titulos)
+            with medir("catalogo.estatisticas"):
+                self.estatisticas = anterior.estatisticas.atualizado(anterior.dados, dados, ordem_preco)
+        else:
+            with medir("catalogo.busca"):
+                self.busca = IndiceTitulos(titulos)
+            with medir("catalogo.estatisticas"):
+                self.estatisticas = EstatisticasCatalogo.de_dados(dados, ordem_preco)
+        self.categorias = listar_categorias(dados)
+        with medir("catalogo.similaridade"):
+            self.similares = IndiceSimilaridade(dados, self.busca)
+        with medir("catalogo.consultas"):
+            self.consultas = MotorConsultas(dados, self.indice, self.busca)
+
+        self.respostas = CacheRespostas(geracao)
+        with medir("catalogo.livros_json"):
+            self.respostas.registrar_bytes("livros", registros_json(dados))
+        self.respostas.registrar("categorias", self.categorias, List[str])
+        self.respostas.registrar("stats_overview", self.estatisticas.overview(), StatsOverview)
+        self.respostas.registrar("stats_categorias", self.estatisticas.por_categoria(), List[CategoryStats])
+        self.respostas.registrar_sob_demanda("stats_distribuicao", self.estatisticas.distribuicao, StatsDistribuicao)
+
+    def imagem_original(self, posicao: int) -> Optional[str]:
+        """URL da capa no site de origem, mesmo com `imagem` apontando para a API."""
+        leitor = self._imagens_originais if self._imagens_originais is not None else self.indice
+        imagem = leitor.linhas([posicao])["imagem"].iloc[0]
+        return imagem if isinstance(imagem, str) and imagem else None
+
+
+def carregar_catalogo(caminho: str = CAMINHO_CSV, geracao: int = 1,
+                      anterior: Optional[Catalogo] = None) -> Catalogo:
+    """Lê o CSV e monta um Catalogo completo (dados, índices e cache de respostas)."""
+    # A assinatura é lida antes dos arquivos: se eles mudarem durante a leitura,
+    # a próxima verificação ainda enxerga a diferença e recarrega
+    assinatura = assinatura_livros(caminho)
+    with medir("catalogo.carga"):
+        return Catalogo(carregar_dados_livros(caminho), geracao, anterior, assinatura)
+
+
+class GerenciadorCatalogo:
+    """
+    Mantém o Catalogo em uso e faz a troca a quente quando o CSV muda.
+
+    O novo catálogo (DataFrame, índices e cache) é montado inteiro fora do
+    caminho das requisições e só então publicado, com a troca de uma única
+    referência (`atual`). Cada requisição lê `atual` uma vez no início e trabalha
+    sobre esse snapshot até o fim, mesmo que uma recarga aconteça no meio.
+
+    A construção não lê nada: a primeira carga é feita por `carregar` (ex.: numa
+    thread iniciada na subida da API, com `carregar_em_segundo_plano`) ou, se
+    ninguém a tiver feito, na primeira leitura de `atual`, que espera a carga terminar.
+    """
+
+    def __init__(self, caminho: str = CAMINHO_CSV):
+        self.caminho = caminho
+        self._trava = threading.Lock()
+        # Agendamento de recargas: trava própria, curta, que nunca espera uma recarga terminar
+        self._trava_agenda = threading.Lock()
+        self._forcar_pendente: Optional[bool] = None  # None: nenhuma recarga pendente
+        self._thread: Optional[threading.Thread] = None
+        self._observador = None
+        self._atual: Optional[Catalogo] = None
+
+    @property
+    def atual(self) -> Catalogo:
+        catalogo = self._atual
+        return catalogo if catalogo is not None else self.carregar()
+
+    @property
+    def pronto(self) -> bool:
+        """Se a primeira carga já terminou (usado pela verificação de prontidão)."""
+        return self._atual is not None
+
+    def carregar(self) -> Catalogo:
+        """Faz a primeira carga do catálogo, se ela ainda não aconteceu, e retorna o catálogo em uso."""
+        with self._trava:
+            if self._atual is None:
+                inicio = time.perf_counter()
+                self._publicar(carregar_catalogo(self.caminho), inicio, "catalogo_carregado")
+            return self._atual
+
+    def carregar_em_segundo_plano(self, depois: Optional[Callable[[], None]] = None) -> threading.Thread:
+        """
+        Faz a primeira carga numa thread própria e retorna na hora; `depois` roda
+        na mesma thread quando a carga termina (ex.: aquecimento de outros recursos).
+        """
+        def carregar_e_continuar():
+            try:
+                self.carregar()
+            except Exception:
+                logger.exception("catalogo_falha_carga", extra={"event": "catalogo_falha_carga"})
+                return
+            if depois is not None:
+                depois()
+
+        thread = threading.Thread(target=carregar_e_continuar, name="carga-catalogo", daemon=True)
+        thread.start()
+        return thread
+
+    def _publicar(self, novo: Catalogo, inicio: float, evento: str) -> None:
+        self._atual = novo
+        duracao = time.perf_counter() - inicio
+        registrar_catalogo(novo, duracao)
+        logger.info(
+            evento,
+            extra={
+                "event": evento,
+                "geracao": novo.geracao,
+                "livros": len(novo.dados),
+                "duracao_ms": round(duracao * 1000, 2),
+            },
+        )
+
+    def recarregar(self, forcar: bool = True) -> Catalogo:
+        """
+        Relê o CSV e publica uma nova geração do catálogo.
+
+        Args:
+            forcar (bool): Se False, só recarrega se o arquivo mudou desde a última carga.
+
+        Returns:
+            Catalogo: O catálogo em uso depois da chamada.
+        """
+        with self._trava:
+            anterior = self._atual
+            inicio = time.perf_counter()
+            if anterior is None:
+                # Nada carregado ainda: a recarga é a própria primeira carga
+                self._publicar(carregar_catalogo(self.caminho), inicio, "catalogo_carregado")
+                return self._atual
+            if not forcar and assinatura_livros(self.caminho) == anterior.assinatura:
+                return anterior
+
+            novo = carregar_catalogo(self.caminho, geracao=anterior.geracao + 1, anterior=anterior)
+            self._publicar(novo, inicio, "catalogo_recarregado")
+            return novo
+
+    def recarregar_em_segundo_plano(self, forcar: bool = True):
+        """
+        Agenda uma recarga numa thread própria e retorna na hora. Pedidos feitos
+        enquanto uma recarga está em andamento são agrupados em uma única recarga
+        extra ao final dela, forçada se algum dos pedidos foi forçado.
+
+        Não espera a recarga em andamento: pode ser chamada do event loop (ex.:
+        pelos tratadores de SIGUSR1/SIGUSR2) sem parar o atendimento.
+        """
+        with self._trava_agenda:
+            self._forcar_pendente = bool(self._forcar_pendente) or forcar
+            # A thread só termina depois de ver, sob esta trava, que não há nada pendente
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._processar_pendentes, name="recarga-catalogo", daemon=True)
+            self._thread.start()
+
+    def _processar_pendentes(self):
+        while True:
+            with self._trava_agenda:
+                forcar, self._forcar_pendente = self._forcar_pendente, None
+                if forcar is None:
+                    self._thread = None
+                    return
+            try:
+                self.recarregar(forcar)
+            except Exception:
+                logger.exception("catalogo_falha_recarga", extra={"event": "catalogo_falha_recarga"})
+
+    def iniciar_observador(self, espera_segundos: float = 2.0, ao_mudar: Optional[Callable[[], None]] = None):
+        """
+        Observa o diretório do CSV (watchdog) e recarrega o catálogo quando o
+        CSV ou o Arrow que o acompanha mudam. Eventos em sequência (ex.: escrita em partes) são agrupados:
+        a recarga só acontece `espera_segundos` depois do último evento.
+
+        Com `ao_mudar`, ele é chamado no lugar da recarga local (ex.: o processo
+        mestre de api/servidor.py avisando todos os workers).
+        """
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            logger.warning("watchdog não instalado; recarga automática do catálogo desativada.")
+            return
+
+        alvos = {os.path.abspath(self.caminho), os.path.abspath(caminho_colunar(self.caminho))}
+        if ao_mudar is None:
+            ao_mudar = functools.partial(self.recarregar_em_segundo_plano, forcar=False)
+
+        class _EventosArquivos(FileSystemEventHandler):
+            def __init__(self):
+                self._temporizador: Optional[threading.Timer] = None
+
+            def on_any_event(self, evento):
+                caminhos = {getattr(evento, "src_path", None), getattr(evento, "dest_path", None)}
+                if alvos.isdisjoint(os.path.abspath(c) for c in caminhos if c):
+                    return
+                if self._temporizador is not None:
+                    self._temporizador.cancel()
+                self._temporizador = threading.Timer(espera_segundos, ao_mudar)
+                self._temporizador.daemon = True
+                self._temporizador.start()
+
+        diretorio = os.path.dirname(os.path.abspath(self.caminho))
+        os.makedirs(diretorio, exist_ok=True)
+        self._observador = Observer()
+        self._observador.schedule(_EventosArquivos(), diretorio, recursive=False)
+        self._observador.daemon = True
+        self._observador.start()
+
+    def parar_observador(self):
+        if self._observador is not None:
+            self._observador.stop()
+            self._observador.join(timeout=5)
+            self._observador = None
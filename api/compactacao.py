@@ -0,0 +1,209 @@
+# api/compactacao.py
+import os
+from typing import Callable, Dict, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Catálogo em memória no formato compacto (desligue com CATALOGO_COMPACTO=0)
+CATALOGO_COMPACTO = os.getenv("CATALOGO_COMPACTO", "1").lower() not in ("0", "false", "nao", "não")
+
+# Colunas decimais guardadas como inteiros (preço em centavos), se nenhum valor tiver mais casas
+ESCALAS_PADRAO = {"preco": 100}
+# Textos com no máximo esta fração de valores distintos viram categoria (código + dicionário)
+FRACAO_MAX_CATEGORIA = 0.5
+# Prefixo comum mais curto que isso não compensa ser retirado
+PREFIXO_MINIMO = 8
+
+_ATRIBUTO = "formato_compacto"
+_TEXTO_ARROW = pd.StringDtype("pyarrow")
+
+
+class ColunaCompacta(NamedTuple):
+    """Como reconstruir os valores originais de uma coluna compactada."""
+    tipo_original: str
+    escala: Optional[int] = None
+    prefixo: str = ""
+
+
+class FormatoCompacto(NamedTuple):
+    """Colunas compactadas de um DataFrame; viaja em `DataFrame.attrs` pelos recortes (iloc, sort, head...)."""
+    colunas: Dict[str, ColunaCompacta]
+
+    def __deepcopy__(self, _memo) -> "FormatoCompacto":
+        # O pandas copia `attrs` a cada operação; o formato nunca é alterado, então não precisa de cópia
+        return self
+
+
+def formato(dados: pd.DataFrame) -> Optional[FormatoCompacto]:
+    return dados.attrs.get(_ATRIBUTO)
+
+
+def _inteiro_estreito(valores: np.ndarray) -> Optional[np.ndarray]:
+    """Os valores (inteiros) no menor tipo inteiro que os comporta, ou None se não couberem em int32."""
+    if not len(valores):
+        return valores.astype(np.int8)
+    minimo, maximo = valores.min(), valores.max()
+    for tipo in (np.int8, np.int16, np.int32):
+        limites = np.iinfo(tipo)
+        if limites.min <= minimo and maximo <= limites.max:
+            return valores.astype(tipo)
+    return None
+
+
+def _compactar_numerica(coluna: pd.Series, escala: Optional[int]):
+    valores = coluna.to_numpy()
+    if np.issubdtype(valores.dtype, np.integer):
+        estreitos = _inteiro_estreito(valores)
+        return (estreitos, ColunaCompacta(str(valores.dtype))) if estreitos is not None else None
+
+    if not np.isfinite(valores).all():
+        return None
+    # Só quando a volta é exata: a resposta continua idêntica à do DataFrame original
+    for fator in ([1, escala] if escala else [1]):
+        inteiros = np.rint(valores * fator)
+        if np.array_equal(inteiros / fator, valores):
+            estreitos = _inteiro_estreito(inteiros.astype(np.int64))
+            if estreitos is not None:
+                escala_usada = fator if fator != 1 else None
+                return estreitos, ColunaCompacta(str(valores.dtype), escala=escala_usada)
+    return None
+
+
+def _compactar_texto(coluna: pd.Series):
+    distintos = coluna.nunique(dropna=False)
+    if distintos <= max(1, FRACAO_MAX_CATEGORIA * len(coluna)):
+        return pd.Categorical(coluna), ColunaCompacta("object")
+
+    prefixo = os.path.commonprefix(coluna.tolist()) if len(coluna) > 1 else ""
+    if len(prefixo) < PREFIXO_MINIMO:
+        prefixo = ""
+    valores = coluna.str.slice(len(prefixo)) if prefixo else coluna
+    return valores.astype(_TEXTO_ARROW), ColunaCompacta("object", prefixo=prefixo)
+
+
+def compactar(dados: pd.DataFrame, escalas: Optional[Dict[str, int]] = None) -> pd.DataFrame:
+    """
+    Representação compacta do DataFrame de livros (já validado com `validar_esquema`):
+
+    - textos repetidos (ex.: categoria, ~50 valores) viram `category`: um código
+      de 1 byte por linha + o dicionário;
+    - os demais textos viram strings Arrow (um buffer contínuo em vez de um
+      objeto Python por linha), sem o prefixo comum a todas as linhas (ex.: a
+      URL base das imagens);
+    - números usam o menor tipo inteiro que os comporta: avaliação em int8,
+      estoque em int16/int32 e preço em centavos (`escalas`), quando nenhum valor
+      tiver mais casas decimais.
+
+    O formato de cada coluna fica em `attrs`. Os valores originais voltam com
+    `LeitorColunas` (recortes para as respostas), `expandir` (chamado na
+    serialização) e `valores_coluna` (para quem monta índices).
+    """
+    escalas = ESCALAS_PADRAO if escalas is None else escalas
+    colunas, formatos = {}, {}
+    for nome in dados.columns:
+        coluna = dados[nome]
+        if pd.api.types.is_bool_dtype(coluna):
+            compacta = None
+        elif pd.api.types.is_numeric_dtype(coluna):
+            compacta = _compactar_numerica(coluna, escalas.get(nome))
+        elif pd.api.types.is_object_dtype(coluna) and coluna.map(type).eq(str).all():
+            compacta = _compactar_texto(coluna)
+        else:
+            compacta = None
+        if compacta is None:
+            colunas[nome] = coluna
+        else:
+            colunas[nome], formatos[nome] = compacta
+    compactos = pd.DataFrame(colunas, index=dados.index, copy=False)
+    compactos.attrs[_ATRIBUTO] = FormatoCompacto(formatos)
+    return compactos
+
+
+def substituir_coluna(dados: pd.DataFrame, nome: str, valores) -> pd.DataFrame:
+    """
+    `dados` com a coluna `nome` trocada por `valores`, sem copiar as demais
+    colunas. Num DataFrame compacto, a coluna nova também é compactada.
+    """
+    nova = pd.Series(valores, index=dados.index, name=nome)
+    formato_dados = formato(dados)
+    if formato_dados is not None:
+        compacta = compactar(nova.to_frame())
+        nova = compacta[nome]
+        formatos = {coluna: f for coluna, f in formato_dados.colunas.items() if coluna != nome}
+        formatos.update(formato(compacta).colunas)
+    colunas = {coluna: nova if coluna == nome else dados[coluna] for coluna in dados.columns}
+    resultado = pd.DataFrame(colunas, index=dados.index, copy=False)
+    if formato_dados is not None:
+        resultado.attrs[_ATRIBUTO] = FormatoCompacto(formatos)
+    return resultado
+
+
+def _extrator(coluna: pd.Series, coluna_compacta: Optional[ColunaCompacta]) -> Callable[[np.ndarray], np.ndarray]:
+    """Função posições -> valores originais da coluna, lendo direto do array numpy/Arrow."""
+    if isinstance(coluna.dtype, pd.CategoricalDtype) and not coluna.isna().any():
+        categorias = np.asarray(coluna.cat.categories, dtype=object)
+        codigos = coluna.cat.codes.to_numpy()
+        return lambda posicoes: categorias[codigos[posicoes]]
+
+    if isinstance(coluna.dtype, pd.StringDtype) and coluna.dtype.storage == "pyarrow":
+        textos = pa.array(coluna.array)
+        prefixo = coluna_compacta.prefixo if coluna_compacta is not None else ""
+
+        def extrair_textos(posicoes: np.ndarray) -> np.ndarray:
+            recorte = textos.take(posicoes).to_numpy(zero_copy_only=False)
+            # Em arrays de objetos, "+" concatena elemento a elemento
+            return prefixo + recorte if prefixo else recorte
+        return extrair_textos
+
+    valores = coluna.to_numpy()
+    if coluna_compacta is None:
+        return lambda posicoes: valores[posicoes]
+    if coluna_compacta.escala is not None:
+        escala = coluna_compacta.escala
+        return lambda posicoes: valores[posicoes] / escala
+    tipo = np.dtype(coluna_compacta.tipo_original)
+    return lambda posicoes: valores[posicoes].astype(tipo)
+
+
+class LeitorColunas:
+    """
+    Recortes de um DataFrame (compacto ou não) já com os tipos e valores
+    originais. As colunas são lidas uma vez na construção (arrays numpy,
+    códigos de categoria, strings Arrow); cada recorte é um `take` por coluna e
+    um único DataFrame novo, sem `iloc` sobre o DataFrame compacto nem uma
+    Series intermediária por coluna, que nas páginas pequenas custariam mais
+    que a própria codificação em JSON.
+    """
+
+    def __init__(self, dados: pd.DataFrame):
+        colunas = formato(dados).colunas if formato(dados) is not None else {}
+        self._n = len(dados)
+        self._indice = dados.index
+        self._extratores = [(nome, _extrator(dados[nome], colunas.get(nome))) for nome in dados.columns]
+
+    def linhas(self, posicoes) -> pd.DataFrame:
+        """As linhas nas posições (array de posições ou slice), decodificadas."""
+        if isinstance(posicoes, slice):
+            posicoes = np.arange(*posicoes.indices(self._n))
+        posicoes = np.asarray(posicoes, dtype=np.intp)
+        colunas = {nome: extrair(posicoes) for nome, extrair in self._extratores}
+        return pd.DataFrame(colunas, index=self._indice[posicoes], copy=False)
+
+
+def expandir(dados: pd.DataFrame) -> pd.DataFrame:
+    """As colunas com os tipos e valores originais (o próprio DataFrame, se ele não for compacto)."""
+    if formato(dados) is None:
+        return dados
+    return LeitorColunas(dados).linhas(slice(None))
+
+
+def valores_coluna(dados: pd.DataFrame, coluna: str) -> np.ndarray:
+    """Uma coluna numérica como float, nos valores originais (ex.: preço em reais, não em centavos)."""
+    numeros = dados[coluna].to_numpy(dtype=float)
+    formato_dados = formato(dados)
+    coluna_compacta = formato_dados.colunas.get(coluna) if formato_dados is not None else None
+    if coluna_compacta is not None and coluna_compacta.escala is not None:
+        numeros /= coluna_compacta.escala
+    return numeros
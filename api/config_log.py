@@ -1,51 +1,132 @@
 # api/config_log.py
-import logging, time, uuid
+import atexit, itertools, logging, logging.handlers, os, queue, random, time, uuid
+from typing import Optional
+
 from pythonjsonlogger import jsonlogger
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import Request, Response
 
-def configure_logging():
+# Fração das respostas 2xx que são logadas (erros e demais status são sempre logados)
+LOG_AMOSTRA_2XX = float(os.getenv("LOG_AMOSTRA_2XX", "1"))
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class _QueueHandlerLeve(logging.handlers.QueueHandler):
+    """
+    QueueHandler que só resolve a mensagem antes de enfileirar; a formatação
+    em JSON (e a de exceções) fica para a thread que escreve no stdout.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def configure_logging(stream=None, assincrono: bool = True) -> Optional[logging.handlers.QueueListener]:
     """
     Configura logs JSON para stdout (Render captura automaticamente).
+
+    Com `assincrono`, quem loga só coloca o registro numa fila; uma thread em
+    segundo plano (QueueListener) formata e escreve, então o event loop nunca
+    espera pela escrita no stdout.
     """
-    
+    global _listener
+
     root = logging.getLogger()
     root.setLevel(logging.INFO)
     for h in list(root.handlers):
         root.removeHandler(h)
-    handler = logging.StreamHandler()
+    _parar_listener()
+
+    handler = logging.StreamHandler(stream)
     handler.setFormatter(jsonlogger.JsonFormatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
-    root.addHandler(handler)
+    if assincrono:
+        fila: queue.SimpleQueue = queue.SimpleQueue()
+        root.addHandler(_QueueHandlerLeve(fila))
+        _listener = logging.handlers.QueueListener(fila, handler, respect_handler_level=True)
+        _listener.start()
+    else:
+        root.addHandler(handler)
     for name in ["uvicorn", "uvicorn.access", "uvicorn.error", "fastapi"]:
         logging.getLogger(name).handlers = []
         logging.getLogger(name).propagate = True
+    return _listener
+
+
+@atexit.register
+def _parar_listener():
+    # Escreve o que ainda estiver na fila e para a thread (também antes de o processo terminar)
+    global _listener
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+    _listener = None
+
 
 logger = logging.getLogger("api")
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+# Ids de requisição baratos e únicos por processo: prefixo aleatório + contador
+_PREFIXO_ID = uuid.uuid4().hex[:12]
+_contador_ids = itertools.count(1)
+
+
+def _cabecalho(scope, nome: bytes) -> Optional[str]:
+    for chave, valor in scope.get("headers", ()):
+        if chave == nome:
+            return valor.decode("latin-1")
+    return None
+
+
+class RequestLoggingMiddleware:
     """
-    Loga uma linha em JSON por requisição
+    Loga uma linha em JSON por requisição.
+
+    Middleware ASGI puro: só observa a mensagem `http.response.start` para
+    saber o status, sem envolver o corpo da resposta (streaming continua
+    funcionando). As respostas 2xx são amostradas com `amostra_2xx`; o registro
+    (id, cabeçalhos) só é montado para as requisições que vão ser logadas.
     """
-    async def dispatch(self, request: Request, call_next):
+
+    def __init__(self, app, amostra_2xx: Optional[float] = None):
+        self.app = app
+        self.amostra_2xx = LOG_AMOSTRA_2XX if amostra_2xx is None else amostra_2xx
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         start = time.perf_counter()
-        req_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
-        path_template = request.scope.get("route").path if request.scope.get("route") else request.url.path
+        status_code = None
+
+        async def send_com_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
         try:
-            response: Response = await call_next(request)
-            return response
+            await self.app(scope, receive, send_com_status)
+        except Exception:
+            status_code = status_code or 500
+            raise
         finally:
-            latency_ms = round((time.perf_counter() - start) * 1000, 2)
-            logger.info(
-                "http_request",
-                extra={
-                    "event": "http_request",
-                    "request_id": req_id,
-                    "method": request.method,
-                    "path": path_template,
-                    "status_code": getattr(locals().get("response", None), "status_code", None),
-                    "latency_ms": latency_ms,
-                    "client_ip": request.client.host if request.client else None,
-                    "user_agent": request.headers.get("user-agent"),
-                },
-            )
+            if status_code is None or not 200 <= status_code < 300 or random.random() < self.amostra_2xx:
+                self._logar(scope, status_code, start)
+
+    def _logar(self, scope, status_code: Optional[int], start: float) -> None:
+        latency_ms = round((time.perf_counter() - start) * 1000, 2)
+        rota = scope.get("route")
+        client = scope.get("client")
+        logger.info(
+            "http_request",
+            extra={
+                "event": "http_request",
+                "request_id": _cabecalho(scope, b"x-request-id") or f"{_PREFIXO_ID}-{next(_contador_ids)}",
+                "method": scope["method"],
+                "path": getattr(rota, "path", None) or scope["path"],
+                "status_code": status_code,
+                "latency_ms": latency_ms,
+                "client_ip": client[0] if client else None,
+                "user_agent": _cabecalho(scope, b"user-agent"),
+            },
+        )
@@ -0,0 +1,284 @@
+# api/consulta_livros.py
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from api.busca_titulos import IndiceTitulos, normalizar
+from api.compactacao import valores_coluna
+from api.indice_catalogo import IndiceCatalogo
+
+TAMANHO_LOTE = 4_096
+# Acima desse número de candidatos, ordenar por uma coluna indexada percorrendo
+# o próprio índice (e parando quando a página enche) sai mais barato que filtrar tudo e ordenar
+LIMIAR_VARREDURA_ORDENADA = 5_000
+
+_VAZIO = np.empty(0, dtype=np.int64)
+
+
+class ConsultaLivros(NamedTuple):
+    """Predicados combinados (todos precisam valer), ordenação e página de uma consulta."""
+    titulo: Optional[str] = None
+    categorias: Tuple[str, ...] = ()
+    preco_min: Optional[float] = None
+    preco_max: Optional[float] = None
+    avaliacao_min: Optional[float] = None
+    avaliacao_max: Optional[float] = None
+    disponivel: Optional[bool] = None
+    estoque_min: Optional[int] = None
+    ordenacao: Tuple[Tuple[str, bool], ...] = ()    # (campo, decrescente)
+    limite: Optional[int] = None
+    deslocamento: int = 0
+
+
+class PlanoConsulta(NamedTuple):
+    """Índice escolhido para gerar os candidatos, sua estimativa de linhas e a estratégia."""
+    fonte: str
+    estimativa: int
+    estrategia: str
+
+    def descrever(self) -> str:
+        estimativa = "?" if self.estimativa < 0 else self.estimativa
+        return f"{self.fonte}({estimativa});{self.estrategia}"
+
+
+def interpretar_ordenacao(texto: Optional[str], campos: List[str]) -> Tuple[Tuple[str, bool], ...]:
+    """
+    Converte "preco,-avaliacao" em ((preco, crescente), (avaliacao, decrescente)).
+
+    Raises:
+        ValueError: Se algum campo não puder ser usado na ordenação.
+    """
+    if not texto:
+        return ()
+    chaves = []
+    for parte in texto.split(","):
+        parte = parte.strip()
+        decrescente = parte.startswith("-")
+        campo = parte.lstrip("+-")
+        if campo not in campos:
+            raise ValueError(f"Não é possível ordenar por '{campo}'. Campos válidos: {', '.join(campos)}.")
+        chaves.append((campo, decrescente))
+    return tuple(chaves)
+
+
+class MotorConsultas:
+    """
+    Executa consultas com vários predicados sobre um Catalogo.
+
+    O planejador estima, sem percorrer as linhas, quantos livros cada índice
+    devolveria (faixas de preço, avaliação e estoque por busca binária;
+    categorias pelo tamanho das listas; título pelas listas de trigramas e de
+    prefixos) e gera os candidatos pelo mais seletivo.
+    Os demais predicados são aplicados como máscaras vetorizadas sobre os
+    candidatos, em lotes, e a execução para assim que a página está cheia quando
+    a ordem de saída permite (sem ordenação ou ordenando por uma coluna indexada).
+    """
+
+    def __init__(self, dados: pd.DataFrame, indice: IndiceCatalogo, busca: IndiceTitulos):
+        self._n = len(dados)
+        self._indice = indice
+        self._busca = busca
+        self._ids = dados["id"].to_numpy(dtype=np.int64)
+        # Com ids iguais às posições (o caso do catálogo carregado do CSV), converter é desnecessário
+        self._ids_contiguos = bool(np.array_equal(self._ids, np.arange(self._n)))
+        self._colunas = {
+            "preco": valores_coluna(dados, "preco"),
+            "avaliacao": valores_coluna(dados, "avaliacao"),
+            "estoque": valores_coluna(dados, "estoque"),
+        }
+        self._disponivel = dados["disponibilidade"].to_numpy(dtype=bool)
+        self._codigos_categoria, nomes = pd.factorize(dados["categoria"].astype(str).str.lower())
+        self._nomes_categoria = list(nomes)
+        self._contagem_categoria = np.bincount(self._codigos_categoria, minlength=len(nomes))
+
+        # Chaves de ordenação numéricas para todos os campos (textos viram a posição em ordem alfabética)
+        self.campos_ordenacao = list(dados.columns)
+        self._chaves = {}
+        for campo in self.campos_ordenacao:
+            coluna = dados[campo]
+            if pd.api.types.is_numeric_dtype(coluna):
+                self._chaves[campo] = coluna.to_numpy(dtype=float)
+            else:
+                self._chaves[campo] = pd.factorize(coluna.astype(str), sort=True)[0]
+
+    # --- planejamento -----------------------------------------------------
+
+    def _faixas(self, consulta: ConsultaLivros) -> dict:
+        """Predicados de faixa sobre colunas indexadas: coluna -> (mínimo, máximo)."""
+        faixas = {}
+        if consulta.preco_min is not None or consulta.preco_max is not None:
+            faixas["preco"] = (consulta.preco_min, consulta.preco_max)
+        if consulta.avaliacao_min is not None or consulta.avaliacao_max is not None:
+            faixas["avaliacao"] = (consulta.avaliacao_min, consulta.avaliacao_max)
+        if consulta.estoque_min is not None:
+            faixas["estoque"] = (consulta.estoque_min, None)
+        return faixas
+
+    def _codigos_das_categorias(self, termos: Tuple[str, ...]) -> np.ndarray:
+        """Códigos das categorias cujo nome contém algum dos termos (como em /books/search)."""
+        termos = [t.lower() for t in termos]
+        return np.array(
+            [codigo for codigo, nome in enumerate(self._nomes_categoria) if any(t in nome for t in termos)],
+            dtype=np.int64,
+        )
+
+    def planejar(self, consulta: ConsultaLivros) -> PlanoConsulta:
+        estimativas = {"varredura": self._n}
+        for coluna, (minimo, maximo) in self._faixas(consulta).items():
+            inicio, fim = self._indice.intervalo_ordenado(coluna, minimo, maximo)
+            estimativas[coluna] = fim - inicio
+        if consulta.categorias:
+            estimativas["categoria"] = int(self._contagem_categoria[self._codigos_das_categorias(consulta.categorias)].sum())
+        fonte = min(estimativas, key=estimativas.get)
+
+        if consulta.titulo:
+            # O título vira filtro (antes do ranqueamento) quando outro índice devolve menos candidatos
+            estimativas["titulo"] = self._busca.estimar(consulta.titulo)
+            if estimativas["titulo"] <= estimativas[fonte]:
+                fonte = "titulo"
+            estrategia = "titulo"
+        elif not consulta.ordenacao:
+            estrategia = "parada_antecipada" if consulta.limite is not None else "filtro"
+        elif (consulta.limite is not None and consulta.ordenacao[0][0] in self._colunas
+              and estimativas[fonte] > LIMIAR_VARREDURA_ORDENADA):
+            # Percorre o índice da chave de ordenação (já na ordem certa) em vez do mais seletivo
+            fonte = consulta.ordenacao[0][0]
+            estimativas.setdefault(fonte, self._n)
+            estrategia = "indice_ordenado"
+        else:
+            estrategia = "ordenacao"
+        return PlanoConsulta(fonte, estimativas[fonte], estrategia)
+
+    # --- execução ---------------------------------------------------------
+
+    def executar(self, consulta: ConsultaLivros) -> Tuple[np.ndarray, bool, PlanoConsulta]:
+        """
+        Returns:
+            tuple: Posições das linhas da página, se há mais resultados depois dela, e o plano usado.
+        """
+        if consulta.titulo is not None and not normalizar(consulta.titulo):
+            # Título em branco (só espaços, por exemplo) não filtra nada
+            consulta = consulta._replace(titulo=None)
+        plano = self.planejar(consulta)
+        # Uma linha a mais que a página indica se existe próxima página
+        necessarios = None if consulta.limite is None else consulta.deslocamento + consulta.limite + 1
+
+        if plano.estrategia == "titulo":
+            resultado = self._por_titulo(consulta, plano.fonte, necessarios)
+        elif plano.estrategia == "parada_antecipada":
+            resultado = self._filtrar_em_lotes(self._candidatos(consulta, plano.fonte), consulta, plano.fonte, necessarios)
+        elif plano.estrategia == "indice_ordenado":
+            resultado = self._pelo_indice_ordenado(consulta, necessarios)
+        else:
+            resultado = self._filtrar(self._candidatos(consulta, plano.fonte), consulta, plano.fonte)
+            if consulta.ordenacao:
+                resultado = self._ordenar(resultado, consulta.ordenacao)
+
+        fim = None if consulta.limite is None else consulta.deslocamento + consulta.limite
+        pagina = resultado[consulta.deslocamento:fim]
+        tem_mais = fim is not None and len(resultado) > fim
+        return pagina, tem_mais, plano
+
+    def _candidatos(self, consulta: ConsultaLivros, fonte: str) -> np.ndarray:
+        """Posições geradas pelo índice escolhido, na ordem do catálogo."""
+        if fonte == "varredura":
+            return np.arange(self._n, dtype=np.int64)
+        if fonte == "categoria":
+            listas = [self._indice.posicoes_por_categoria(t) for t in consulta.categorias]
+            return np.unique(np.concatenate(listas)) if listas else _VAZIO
+        minimo, maximo = self._faixas(consulta)[fonte]
+        return self._indice.posicoes_por_faixa(fonte, minimo, maximo)
+
+    def _filtrar(self, posicoes: np.ndarray, consulta: ConsultaLivros, fonte: str) -> np.ndarray:
+        """Aplica às posições todos os predicados que o índice de origem ainda não garantiu."""
+        mascara = np.ones(len(posicoes), dtype=bool)
+        for coluna, (minimo, maximo) in self._faixas(consulta).items():
+            if coluna == fonte:
+                continue
+            valores = self._colunas[coluna][posicoes]
+            if minimo is not None:
+                mascara &= valores >= minimo
+            if maximo is not None:
+                mascara &= valores <= maximo
+        if consulta.categorias and fonte != "categoria":
+            mascara &= np.isin(self._codigos_categoria[posicoes], self._codigos_das_categorias(consulta.categorias))
+        if consulta.disponivel is not None:
+            mascara &= self._disponivel[posicoes] == consulta.disponivel
+        return posicoes[mascara]
+
+    def _filtrar_em_lotes(self, posicoes: np.ndarray, consulta: ConsultaLivros, fonte: str,
+                          necessarios: int) -> np.ndarray:
+        """Filtra lote a lote, na ordem recebida, até juntar `necessarios` posições."""
+        encontrados, total = [], 0
+        for inicio in range(0, len(posicoes), TAMANHO_LOTE):
+            lote = self._filtrar(posicoes[inicio:inicio + TAMANHO_LOTE], consulta, fonte)
+            encontrados.append(lote)
+            total += len(lote)
+            if total >= necessarios:
+                break
+        return np.concatenate(encontrados)[:necessarios] if encontrados else _VAZIO
+
+    def _pelo_indice_ordenado(self, consulta: ConsultaLivros, necessarios: int) -> np.ndarray:
+        """
+        Percorre o índice da primeira chave de ordenação na direção pedida até
+        juntar `necessarios` linhas, completa o grupo de empate da última delas
+        (para que as demais chaves desempatem corretamente) e ordena só isso.
+        """
+        coluna, decrescente = consulta.ordenacao[0]
+        minimo, maximo = self._faixas(consulta).get(coluna, (None, None))
+        inicio, fim = self._indice.intervalo_ordenado(coluna, minimo, maximo)
+        valores, ordem = self._indice.ordenados(coluna)
+        if decrescente:
+            valores, ordem = valores[inicio:fim][::-1], ordem[inicio:fim][::-1]
+        else:
+            valores, ordem = valores[inicio:fim], ordem[inicio:fim]
+
+        encontrados, total, cursor = [], 0, 0
+        while cursor < len(ordem) and total < necessarios:
+            lote = self._filtrar(ordem[cursor:cursor + TAMANHO_LOTE], consulta, coluna)
+            encontrados.append(lote)
+            total += len(lote)
+            cursor += TAMANHO_LOTE
+        if total >= necessarios:
+            coletados = np.concatenate(encontrados)
+            ultimo = self._colunas[coluna][coletados[necessarios - 1]]
+            # Fim do grupo de empate do último valor necessário (valores em ordem crescente ou decrescente)
+            lado = -valores if decrescente else valores
+            fim_empate = int(np.searchsorted(lado, -ultimo if decrescente else ultimo, side="right"))
+            if fim_empate > cursor:
+                encontrados.append(self._filtrar(ordem[cursor:fim_empate], consulta, coluna))
+        if not encontrados:
+            return _VAZIO
+        return self._ordenar(np.concatenate(encontrados), consulta.ordenacao)
+
+    def _por_titulo(self, consulta: ConsultaLivros, fonte: str, necessarios: Optional[int]) -> np.ndarray:
+        """
+        O índice de títulos (ou outro mais seletivo, com o título aplicado como
+        filtro) gera os candidatos sem ranquear, os demais predicados filtram em
+        bloco e só os que sobram são ranqueados por relevância (ou ordenados
+        pelas chaves pedidas).
+        """
+        if fonte == "titulo":
+            encontrados = self._busca.encontrar(consulta.titulo)
+            posicoes = self._filtrar(self._posicoes_dos_ids(encontrados), consulta, "titulo")
+        else:
+            posicoes = self._filtrar(self._candidatos(consulta, fonte), consulta, fonte)
+            posicoes = posicoes[self._busca.casam(consulta.titulo, self._ids[posicoes])]
+        if consulta.ordenacao:
+            return self._ordenar(posicoes, consulta.ordenacao)
+        ids = self._busca.ranquear(consulta.titulo, self._ids[posicoes], limite=necessarios)
+        return self._posicoes_dos_ids(np.asarray(ids, dtype=np.int64))
+
+    def _posicoes_dos_ids(self, ids: np.ndarray) -> np.ndarray:
+        if self._ids_contiguos:
+            return ids
+        return np.asarray(self._indice.posicoes_por_ids(ids.tolist()), dtype=np.int64)
+
+    def _ordenar(self, posicoes: np.ndarray, ordenacao: Tuple[Tuple[str, bool], ...]) -> np.ndarray:
+        """Ordena pelas chaves pedidas, desempatando pelo id."""
+        chaves = [self._ids[posicoes]]
+        for campo, decrescente in reversed(ordenacao):
+            valores = self._chaves[campo][posicoes]
+            chaves.append(-valores if decrescente else valores)
+        return posicoes[np.lexsort(chaves)]
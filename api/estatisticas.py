@@ -0,0 +1,215 @@
+# api/estatisticas.py
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from api.compactacao import valores_coluna
+
+COLUNAS_COMPARADAS = ["categoria", "preco", "avaliacao", "estoque"]
+PERCENTIS = (10, 25, 50, 75, 90, 99)
+NOTAS = range(0, 6)
+_COLUNAS_HISTOGRAMA = [f"avaliacao_{nota}" for nota in NOTAS]
+_COLUNAS_ACUMULADORES = ["total_livros", "centavos", "soma_avaliacao", "estoque_total", *_COLUNAS_HISTOGRAMA]
+
+
+def _codificar(dados: pd.DataFrame) -> Tuple[np.ndarray, pd.Index]:
+    """Código inteiro de cada linha e as categorias em ordem alfabética (NaN = -1)."""
+    categoria = dados["categoria"]
+    if isinstance(categoria.dtype, pd.CategoricalDtype) and categoria.cat.categories.is_monotonic_increasing:
+        # Catálogo compacto: os códigos já existem (categorias sem livros são descartadas por quem usa)
+        return categoria.cat.codes.to_numpy(dtype=np.int64), pd.Index(categoria.cat.categories, dtype=object)
+    codigos, categorias = pd.factorize(categoria, sort=True)
+    return codigos, categorias
+
+
+def _contribuicoes(dados: pd.DataFrame) -> pd.DataFrame:
+    """
+    Soma das linhas por categoria: quantidade, preço (em centavos, para que
+    somar e subtrair repetidamente não acumule erro), avaliação, estoque e
+    quantos livros há em cada nota. As somas são `np.bincount` sobre os códigos
+    das categorias, sem agrupar as strings.
+    """
+    if dados.empty:
+        return pd.DataFrame(columns=_COLUNAS_ACUMULADORES)
+    codigos, categorias = _codificar(dados)
+    validos = codigos >= 0
+    codigos = codigos[validos]
+    quantidade = len(categorias)
+
+    def somar(valores: np.ndarray) -> np.ndarray:
+        return np.bincount(codigos, weights=valores[validos], minlength=quantidade)
+
+    avaliacao = valores_coluna(dados, "avaliacao")
+    notas = np.clip(np.rint(avaliacao), 0, 5).astype(np.int64)
+    colunas = {
+        "total_livros": np.bincount(codigos, minlength=quantidade),
+        "centavos": somar(np.rint(valores_coluna(dados, "preco") * 100)).round().astype(np.int64),
+        "soma_avaliacao": somar(avaliacao),
+        "estoque_total": somar(valores_coluna(dados, "estoque")).round().astype(np.int64),
+    }
+    for coluna, nota in zip(_COLUNAS_HISTOGRAMA, NOTAS):
+        colunas[coluna] = np.bincount(codigos[notas[validos] == nota], minlength=quantidade)
+    acumuladores = pd.DataFrame(colunas, index=pd.Index(categorias, name="categoria"))
+    return acumuladores[acumuladores["total_livros"] > 0]
+
+
+def _comparavel(dados: pd.DataFrame, coluna: str) -> np.ndarray:
+    # Valores originais: duas gerações podem guardar a mesma coluna em formatos diferentes
+    if pd.api.types.is_numeric_dtype(dados[coluna]):
+        return valores_coluna(dados, coluna)
+    return dados[coluna].to_numpy()
+
+
+def linhas_alteradas(antigos: pd.DataFrame, novos: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Compara duas versões do catálogo pelo id, coluna a coluna em numpy.
+
+    Returns:
+        tuple: (linhas que saíram, linhas que entraram), contando as alteradas
+        nos dois lados (a versão antiga sai, a nova entra).
+    """
+    ids_antigos = antigos["id"].to_numpy(dtype=np.int64)
+    ids_novos = novos["id"].to_numpy(dtype=np.int64)
+    mesmas_linhas = np.array_equal(ids_antigos, ids_novos)  # caso comum: mesmos ids, na mesma ordem
+    if mesmas_linhas:
+        alinhar_antigos = alinhar_novos = slice(None)  # compara as colunas sem copiá-las
+    else:
+        _, alinhar_antigos, alinhar_novos = np.intersect1d(ids_antigos, ids_novos, assume_unique=True,
+                                                           return_indices=True)
+
+    diferentes = np.zeros(len(ids_novos) if mesmas_linhas else len(alinhar_novos), dtype=bool)
+    for coluna in COLUNAS_COMPARADAS:
+        diferentes |= _comparavel(antigos, coluna)[alinhar_antigos] != _comparavel(novos, coluna)[alinhar_novos]
+
+    if mesmas_linhas:
+        saindo = entrando = diferentes
+    else:
+        saindo = np.ones(len(antigos), dtype=bool)
+        saindo[alinhar_antigos[~diferentes]] = False
+        entrando = np.ones(len(novos), dtype=bool)
+        entrando[alinhar_novos[~diferentes]] = False
+    return antigos.iloc[np.flatnonzero(saindo)], novos.iloc[np.flatnonzero(entrando)]
+
+
+def percentis_preco(dados: pd.DataFrame, ordem_preco: Optional[np.ndarray] = None) -> dict:
+    """
+    Percentis de preço (interpolação linear, como `np.percentile`) do acervo e
+    de cada categoria, calculados de uma vez. Parte das posições em ordem de
+    preço (a do IndiceCatalogo, se informada) e as reagrupa por categoria com
+    uma ordenação estável dos códigos, que mantém cada grupo ordenado por preço.
+    """
+    if dados.empty:
+        return {"geral": {}, "por_categoria": {}}
+    codigos, categorias = _codificar(dados)
+    precos = valores_coluna(dados, "preco")
+    if ordem_preco is None:
+        ordem_preco = np.argsort(precos, kind="stable")
+    codigos_por_preco = codigos[ordem_preco]
+    codigos_por_preco = codigos_por_preco.astype(np.int16 if len(categorias) < 2 ** 15 else np.int64)
+    agrupados = ordem_preco[np.argsort(codigos_por_preco, kind="stable")]
+    agrupados = agrupados[codigos[agrupados] >= 0]
+    ordenados = precos[agrupados]
+    contagens = np.bincount(codigos[codigos >= 0], minlength=len(categorias))
+    inicios = np.concatenate([[0], np.cumsum(contagens)[:-1]])
+    presentes = contagens > 0
+
+    fracoes = np.asarray(PERCENTIS, dtype=float) / 100
+    nomes = [f"p{p}" for p in PERCENTIS]
+    geral = np.percentile(precos, PERCENTIS)
+    posicoes = (contagens[presentes, None] - 1) * fracoes[None, :]  # dentro de cada categoria
+    abaixo = np.floor(posicoes)
+    peso = posicoes - abaixo
+    abaixo = inicios[presentes, None] + abaixo.astype(np.int64)
+    acima = inicios[presentes, None] + np.ceil(posicoes).astype(np.int64)
+    inferior, superior = ordenados[abaixo], ordenados[acima]
+    # Mesma interpolação do numpy (a partir do vizinho mais próximo), para bater com np.percentile
+    valores = np.where(peso < 0.5, inferior + (superior - inferior) * peso,
+                       superior - (superior - inferior) * (1 - peso))
+
+    return {
+        "geral": {nome: round(float(v), 2) for nome, v in zip(nomes, geral)},
+        "por_categoria": {
+            categoria: {nome: round(float(v), 2) for nome, v in zip(nomes, linha)}
+            for categoria, linha in zip(categorias[presentes], valores)
+        },
+    }
+
+
+class EstatisticasCatalogo:
+    """
+    Acumuladores por categoria (quantidade, soma de preços e de avaliações,
+    estoque e histograma de notas) de onde saem /stats/overview e
+    /stats/categories em O(número de categorias).
+
+    Numa recarga, `atualizado()` parte dos acumuladores da versão anterior e só
+    processa as linhas que entraram, saíram ou mudaram, em vez de reagrupar o
+    catálogo inteiro. Os percentis de preço, que precisam da distribuição
+    completa, só são calculados em `distribuicao()`, a partir da ordem de preços
+    que o IndiceCatalogo já mantém (`ordem_preco`).
+    """
+
+    def __init__(self, acumuladores: pd.DataFrame, dados: pd.DataFrame, ordem_preco: Optional[np.ndarray] = None):
+        self._acumuladores = acumuladores
+        self._dados = dados
+        self._ordem_preco = ordem_preco
+
+    @classmethod
+    def de_dados(cls, dados: pd.DataFrame, ordem_preco: Optional[np.ndarray] = None) -> "EstatisticasCatalogo":
+        return cls(_contribuicoes(dados), dados, ordem_preco)
+
+    def atualizado(self, antigos: pd.DataFrame, novos: pd.DataFrame,
+                   ordem_preco: Optional[np.ndarray] = None) -> "EstatisticasCatalogo":
+        """Novos acumuladores para `novos`, aplicando só a diferença em relação a `antigos`."""
+        saindo, entrando = linhas_alteradas(antigos, novos)
+        acumuladores = self._acumuladores.sub(_contribuicoes(saindo), fill_value=0)
+        acumuladores = acumuladores.add(_contribuicoes(entrando), fill_value=0)
+        acumuladores = acumuladores[acumuladores["total_livros"] > 0].astype(
+            {coluna: np.int64 for coluna in acumuladores.columns if coluna != "soma_avaliacao"}
+        )
+        return EstatisticasCatalogo(acumuladores, novos, ordem_preco)
+
+    def overview(self) -> dict:
+        """Resumo estatístico de todo o acervo de livros."""
+        total = int(self._acumuladores["total_livros"].sum())
+        if not total:
+            return {"total_livros": 0, "preco_medio": 0, "avaliacao_media": 0, "estoque_total": 0}
+        return {
+            "total_livros": total,
+            "preco_medio": round(int(self._acumuladores["centavos"].sum()) / 100 / total, 2),
+            "avaliacao_media": round(float(self._acumuladores["soma_avaliacao"].sum()) / total, 2),
+            "estoque_total": int(self._acumuladores["estoque_total"].sum()),
+        }
+
+    def por_categoria(self) -> List[dict]:
+        """Estatísticas de cada categoria, em ordem alfabética."""
+        acumuladores = self._acumuladores.sort_index()
+        totais = acumuladores["total_livros"]
+        return [
+            {
+                "categoria": categoria,
+                "total_livros": int(total),
+                "preco_medio": round(int(centavos) / 100 / int(total), 2),
+                "avaliacao_media": round(float(soma_avaliacao) / int(total), 2),
+                "estoque_total": int(estoque),
+            }
+            for categoria, total, centavos, soma_avaliacao, estoque in zip(
+                acumuladores.index, totais, acumuladores["centavos"],
+                acumuladores["soma_avaliacao"], acumuladores["estoque_total"],
+            )
+        ]
+
+    def distribuicao(self) -> dict:
+        """Percentis de preço e histograma de notas, do acervo e de cada categoria."""
+        percentis = percentis_preco(self._dados, ordem_preco=self._ordem_preco)
+        histograma = self._acumuladores[_COLUNAS_HISTOGRAMA].sum()
+        por_categoria = self._acumuladores[_COLUNAS_HISTOGRAMA].sort_index()
+        return {
+            "percentis_preco": percentis["geral"],
+            "percentis_preco_por_categoria": percentis["por_categoria"],
+            "histograma_avaliacao": {str(nota): int(histograma[c]) for nota, c in zip(NOTAS, _COLUNAS_HISTOGRAMA)},
+            "histograma_avaliacao_por_categoria": {
+                categoria: {str(nota): int(contagem) for nota, contagem in zip(NOTAS, linha)}
+                for categoria, linha in zip(por_categoria.index, por_categoria.to_numpy())
+            },
+        }
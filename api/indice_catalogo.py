@@ -0,0 +1,112 @@
+# api/indice_catalogo.py
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from api.compactacao import LeitorColunas, valores_coluna
+
+
+class IndiceCatalogo:
+    """
+    Índices em memória sobre o DataFrame de livros, construídos uma única vez
+    quando o CSV é carregado. Evitam varrer o DataFrame inteiro a cada requisição:
+
+    - id -> posição da linha (dicionário, O(1));
+    - preço, avaliação e estoque ordenados + posições correspondentes
+      (busca binária, O(log n + k));
+    - categoria (minúsculas) -> posições das linhas.
+    """
+
+    COLUNAS_ORDENADAS = ("preco", "avaliacao", "estoque")
+
+    def __init__(self, dados: pd.DataFrame):
+        self.dados = dados
+        self._leitor = LeitorColunas(dados)
+
+        self._ids = dados["id"].to_numpy(dtype=np.int64)
+        self._posicao_por_id: Dict[int, int] = {i: pos for pos, i in enumerate(self._ids.tolist())}
+
+        # coluna -> (valores ordenados, posições das linhas nessa ordem)
+        self._ordenados: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for coluna in self.COLUNAS_ORDENADAS:
+            valores = valores_coluna(dados, coluna)
+            ordem = np.argsort(valores, kind="stable")
+            self._ordenados[coluna] = (valores[ordem], ordem)
+
+        self._posicoes_por_categoria: Dict[str, np.ndarray] = {}
+        if "categoria" in dados.columns and len(dados):
+            grupos = dados.groupby(dados["categoria"].astype(str).str.lower(), sort=True).indices
+            self._posicoes_por_categoria = {cat: np.asarray(pos) for cat, pos in grupos.items()}
+
+    def __len__(self) -> int:
+        return len(self.dados)
+
+    def posicao_por_id(self, id_livro: int) -> Optional[int]:
+        """Retorna a posição da linha do livro com o ID informado, ou None."""
+        return self._posicao_por_id.get(id_livro)
+
+    def posicoes_por_ids(self, ids) -> List[int]:
+        """Converte ids de livros (existentes) nas posições das linhas, mantendo a ordem."""
+        return [self._posicao_por_id[i] for i in ids]
+
+    def ids(self, posicoes) -> np.ndarray:
+        """Ids dos livros nas posições informadas."""
+        return self._ids[posicoes]
+
+    def intervalo_ordenado(self, coluna: str, minimo: Optional[float] = None,
+                           maximo: Optional[float] = None) -> Tuple[int, int]:
+        """
+        Trecho [inicio, fim) de `ordenados(coluna)` com valores em [minimo, maximo]
+        (inclusivo; None = sem limite). O tamanho do trecho é a quantidade de
+        livros na faixa, obtida sem percorrer as linhas.
+        """
+        valores, _ = self._ordenados[coluna]
+        inicio = 0 if minimo is None else int(np.searchsorted(valores, minimo, side="left"))
+        fim = len(valores) if maximo is None else int(np.searchsorted(valores, maximo, side="right"))
+        return inicio, max(inicio, fim)
+
+    def ordenados(self, coluna: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Valores da coluna em ordem crescente e as posições das linhas correspondentes."""
+        return self._ordenados[coluna]
+
+    def posicoes_por_faixa(self, coluna: str, minimo: Optional[float] = None,
+                           maximo: Optional[float] = None) -> np.ndarray:
+        """
+        Posições dos livros com `coluna` em [minimo, maximo] (inclusivo),
+        na ordem original do catálogo.
+        """
+        inicio, fim = self.intervalo_ordenado(coluna, minimo, maximo)
+        return np.sort(self._ordenados[coluna][1][inicio:fim])
+
+    def posicoes_por_faixa_preco(self, min_preco: float, max_preco: float) -> np.ndarray:
+        """
+        Posições dos livros com preço em [min_preco, max_preco] (inclusivo),
+        na ordem original do catálogo.
+        """
+        return self.posicoes_por_faixa("preco", min_preco, max_preco)
+
+    def categorias(self) -> List[str]:
+        """Categorias indexadas (em minúsculas), em ordem alfabética."""
+        return list(self._posicoes_por_categoria)
+
+    def posicoes_por_categoria(self, termo: str) -> np.ndarray:
+        """
+        Posições dos livros cuja categoria contém `termo` (sem diferenciar
+        maiúsculas de minúsculas), na ordem original do catálogo. Só as
+        categorias distintas são comparadas, não as linhas.
+        """
+        termo = termo.lower()
+        encontrados = [pos for cat, pos in self._posicoes_por_categoria.items() if termo in cat]
+        if not encontrados:
+            return np.empty(0, dtype=np.int64)
+        if len(encontrados) == 1:
+            return encontrados[0]
+        return np.sort(np.concatenate(encontrados))
+
+    def linhas(self, posicoes) -> pd.DataFrame:
+        """
+        Recorta o DataFrame nas posições informadas (array de posições ou slice),
+        já com os tipos e valores originais se o catálogo estiver compacto.
+        """
+        return self._leitor.linhas(posicoes)
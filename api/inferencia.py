@@ -0,0 +1,181 @@
+# api/inferencia.py
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from api.instrumentacao import medido
+
+logger = logging.getLogger("api.inferencia")
+
+MAX_LOTE_PADRAO = int(os.getenv("ML_MAX_LOTE", "64"))
+ESPERA_MAX_MS_PADRAO = float(os.getenv("ML_ESPERA_MAX_MS", "2"))
+TRABALHADORES_PADRAO = int(os.getenv("ML_TRABALHADORES", "2"))
+
+
+class MotorInferencia:
+    """
+    Agrupa previsões concorrentes em micro-lotes. Cada chamada a `prever` entra
+    numa fila; um coletor junta as entradas que chegarem até completar
+    `max_lote` linhas ou até `espera_max_ms` depois da primeira, e roda uma
+    única chamada vetorizada de `prever_lote` no pool de workers, fora do event
+    loop. Enquanto um lote roda, o coletor já monta o seguinte.
+    """
+
+    def __init__(self, prever_lote: Callable[[np.ndarray], np.ndarray], executor: Executor,
+                 max_lote: int = MAX_LOTE_PADRAO, espera_max_ms: float = ESPERA_MAX_MS_PADRAO):
+        # A duração medida é a do modelo no worker, sem a espera na fila do executor
+        self._prever_lote = medido("ml.lote")(prever_lote)
+        self._executor = executor
+        self.max_lote = max_lote
+        self.espera_max = espera_max_ms / 1000
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._fila: Optional[asyncio.Queue] = None
+        self._coletor: Optional[asyncio.Task] = None
+
+    async def prever(self, entradas: np.ndarray) -> np.ndarray:
+        """Previsões para as linhas de `entradas` (uma por linha), agrupadas com as de outras requisições."""
+        self._garantir_coletor()
+        futuro = self._loop.create_future()
+        await self._fila.put((entradas, futuro))
+        return await futuro
+
+    def _garantir_coletor(self):
+        # A fila pertence ao event loop em que foi criada; um loop novo (ex.: outro
+        # servidor no mesmo processo) ganha fila e coletor próprios
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._coletor is None or self._coletor.done():
+            self._loop = loop
+            self._fila = asyncio.Queue()
+            self._coletor = loop.create_task(self._coletar())
+
+    async def _coletar(self):
+        while True:
+            pedidos = [await self._fila.get()]
+            linhas = len(pedidos[0][0])
+            prazo = self._loop.time() + self.espera_max
+            while linhas < self.max_lote:
+                restante = prazo - self._loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    pedido = await asyncio.wait_for(self._fila.get(), restante)
+                except asyncio.TimeoutError:
+                    break
+                pedidos.append(pedido)
+                linhas += len(pedido[0])
+            self._loop.create_task(self._executar(pedidos))
+
+    async def _executar(self, pedidos: List[Tuple[np.ndarray, asyncio.Future]]):
+        entradas = np.concatenate([entrada for entrada, _ in pedidos])
+        try:
+            saidas = await self._loop.run_in_executor(self._executor, self._prever_lote, entradas)
+        except Exception as erro:
+            logger.exception("inferencia_falhou", extra={"event": "inferencia_falhou", "linhas": len(entradas)})
+            for _, futuro in pedidos:
+                if not futuro.done():
+                    futuro.set_exception(erro)
+            return
+
+        inicio = 0
+        for entrada, futuro in pedidos:
+            fim = inicio + len(entrada)
+            if not futuro.done():  # o cliente pode ter desistido (requisição cancelada)
+                futuro.set_result(saidas[inicio:fim])
+            inicio = fim
+
+    def parar(self):
+        if self._coletor is not None:
+            self._coletor.cancel()
+            self._coletor = None
+
+
+class ServicoModelos:
+    """
+    Modelos treinados por `scripts/treinar_modelo.py`, carregados uma vez, com
+    um MotorInferencia por alvo. Os motores dividem o mesmo pool de workers.
+    """
+
+    def __init__(self, artefato: dict, max_lote: int = MAX_LOTE_PADRAO,
+                 espera_max_ms: float = ESPERA_MAX_MS_PADRAO, trabalhadores: int = TRABALHADORES_PADRAO):
+        self.versao: str = artefato["versao"]
+        self.colunas: Dict[str, List[str]] = {alvo: m["colunas"] for alvo, m in artefato["modelos"].items()}
+        self._executor = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix="inferencia")
+        self._motores = {
+            alvo: MotorInferencia(m["estimador"].predict, self._executor, max_lote, espera_max_ms)
+            for alvo, m in artefato["modelos"].items()
+        }
+
+    @classmethod
+    def carregar(cls, caminho: str, **opcoes) -> Optional["ServicoModelos"]:
+        """Carrega o artefato do disco; retorna None se ele ainda não foi treinado."""
+        import joblib
+
+        try:
+            artefato = joblib.load(caminho)
+        except FileNotFoundError:
+            logger.warning(
+                "Modelo não encontrado em %s; rode `python -m scripts.treinar_modelo` para habilitar as predições.",
+                caminho,
+            )
+            return None
+        return cls(artefato, **opcoes)
+
+    def alvos(self) -> List[str]:
+        return list(self._motores)
+
+    async def prever(self, alvo: str, entradas: np.ndarray) -> np.ndarray:
+        """
+        Raises:
+            KeyError: Se não houver modelo para o alvo.
+        """
+        return await self._motores[alvo].prever(entradas)
+
+    def encerrar(self):
+        for motor in self._motores.values():
+            motor.parar()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class CarregadorModelos:
+    """
+    Carrega o ServicoModelos só quando ele é pedido pela primeira vez (a
+    predição ou o aquecimento depois da subida): o artefato traz o scikit-learn,
+    que é o import mais caro da API e não é usado pelos demais endpoints.
+    """
+
+    def __init__(self, caminho: str, **opcoes):
+        self.caminho = caminho
+        self._opcoes = opcoes
+        self._trava = threading.Lock()
+        self._carregado = False
+        self._servico: Optional[ServicoModelos] = None
+
+    @property
+    def carregado(self) -> bool:
+        return self._carregado
+
+    def obter(self) -> Optional[ServicoModelos]:
+        """O serviço de modelos (None se não houver modelo treinado); carrega na primeira chamada."""
+        if not self._carregado:
+            with self._trava:
+                if not self._carregado:
+                    self._servico = ServicoModelos.carregar(self.caminho, **self._opcoes)
+                    self._carregado = True
+        return self._servico
+
+    async def obter_async(self) -> Optional[ServicoModelos]:
+        """Como `obter`, sem bloquear o event loop enquanto o artefato é lido."""
+        if self._carregado:
+            return self._servico
+        return await asyncio.to_thread(self.obter)
+
+    def encerrar(self):
+        with self._trava:
+            if self._servico is not None:
+                self._servico.encerrar()
+            self._servico = None
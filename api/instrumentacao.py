@@ -0,0 +1,118 @@
+# api/instrumentacao.py
+import functools
+import inspect
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from prometheus_client import Gauge, Histogram
+
+# Buckets finos embaixo (etapas de microssegundos nos endpoints) e largos em cima
+# (carga do catálogo, fases do scraping)
+BUCKETS_ETAPAS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 1800,
+)
+
+ETAPA_DURACAO = Histogram(
+    "etapa_duracao_segundos",
+    "Duração de cada etapa do processamento (filtro, conversão, validação, JSON, carga, scraping...).",
+    ["etapa"],
+    buckets=BUCKETS_ETAPAS,
+)
+# `multiprocess_mode` só vale no modo com vários workers (api/servidor.py): o
+# /metrics de qualquer worker mostra o valor mais recente entre todos eles
+RESULTADO_ITENS = Gauge("resultado_itens", "Itens na última resposta de cada endpoint.", ["endpoint"],
+                        multiprocess_mode="mostrecent")
+RESULTADO_BYTES = Gauge("resultado_bytes", "Tamanho do corpo da última resposta de cada endpoint.", ["endpoint"],
+                        multiprocess_mode="mostrecent")
+
+CATALOGO_CARGA_DURACAO = Gauge("catalogo_carga_duracao_segundos", "Duração da última carga do catálogo.",
+                               multiprocess_mode="livemostrecent")
+CATALOGO_GERACAO = Gauge("catalogo_geracao", "Geração do catálogo em uso.", multiprocess_mode="livemostrecent")
+CATALOGO_LIVROS = Gauge("catalogo_livros", "Livros no catálogo em uso.", multiprocess_mode="livemostrecent")
+CATALOGO_CATEGORIAS = Gauge("catalogo_categorias", "Categorias no catálogo em uso.", multiprocess_mode="livemostrecent")
+CATALOGO_BYTES_JSON = Gauge("catalogo_livros_json_bytes", "Tamanho da resposta pré-serializada de /api/v1/books.",
+                            multiprocess_mode="livemostrecent")
+
+# Filhos do histograma por etapa: `labels()` custa um lock e um dicionário a cada
+# chamada; guardando o filho, medir uma etapa é só `perf_counter` + `observe`
+_histogramas: Dict[str, Histogram] = {}
+_trava = threading.Lock()
+
+
+def _histograma(etapa: str):
+    filho = _histogramas.get(etapa)
+    if filho is None:
+        with _trava:
+            filho = _histogramas.setdefault(etapa, ETAPA_DURACAO.labels(etapa=etapa))
+    return filho
+
+
+class _Medicao:
+    __slots__ = ("_histograma", "_inicio", "segundos")
+
+    def __init__(self, etapa: str):
+        self._histograma = _histograma(etapa)
+        self.segundos: Optional[float] = None
+
+    def __enter__(self) -> "_Medicao":
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *_excecao) -> bool:
+        self.segundos = time.perf_counter() - self._inicio
+        self._histograma.observe(self.segundos)
+        return False
+
+
+def medir(etapa: str) -> _Medicao:
+    """
+    Mede o bloco `with` e registra a duração no histograma da `etapa` (também
+    quando o bloco levanta uma exceção). Depois do bloco, a duração fica em
+    `.segundos`:
+
+        with medir("busca.filtro"):
+            posicoes = ...
+    """
+    return _Medicao(etapa)
+
+
+def medido(etapa: str) -> Callable[[Callable], Callable]:
+    """Decorador: como `medir`, para cada chamada da função (síncrona ou `async`)."""
+    def decorar(funcao: Callable) -> Callable:
+        if inspect.iscoroutinefunction(funcao):
+            @functools.wraps(funcao)
+            async def medida_async(*args, **kwargs):
+                with _Medicao(etapa):
+                    return await funcao(*args, **kwargs)
+            return medida_async
+
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            with _Medicao(etapa):
+                return funcao(*args, **kwargs)
+        return medida
+    return decorar
+
+
+def observar(etapa: str, segundos: float) -> None:
+    """Registra uma duração já medida por outro código (ex.: as fases do scraping)."""
+    _histograma(etapa).observe(segundos)
+
+
+def registrar_resultado(endpoint: str, itens: Optional[int] = None, tamanho_bytes: Optional[int] = None) -> None:
+    """Tamanho da resposta que `endpoint` acabou de montar (linhas e/ou bytes, o que for conhecido)."""
+    if itens is not None:
+        RESULTADO_ITENS.labels(endpoint=endpoint).set(itens)
+    if tamanho_bytes is not None:
+        RESULTADO_BYTES.labels(endpoint=endpoint).set(tamanho_bytes)
+
+
+def registrar_catalogo(catalogo, duracao_segundos: float) -> None:
+    """Publica a duração da carga e o tamanho do catálogo que acabou de entrar em uso."""
+    CATALOGO_CARGA_DURACAO.set(duracao_segundos)
+    CATALOGO_GERACAO.set(catalogo.geracao)
+    CATALOGO_LIVROS.set(len(catalogo.dados))
+    CATALOGO_CATEGORIAS.set(len(catalogo.categorias))
+    CATALOGO_BYTES_JSON.set(len(catalogo.respostas.obter("livros").corpo))
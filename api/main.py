@@ -1,23 +1,25 @@
 # main.py
+import asyncio
+import numpy as np
 import pandas as pd
 import time
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from fastapi import FastAPI, Query, HTTPException, status, Path
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Query, HTTPException, status, Path, Request
+from fastapi.responses import JSONResponse, RedirectResponse, Response
 from pydantic import BaseModel, Field
 
 # JWT Authentication
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from api.auth import authenticate_user, create_access_token, get_current_user
-from api.auth import get_db
+from api.auth import autenticar_usuario, claims_usuario, create_access_token, get_current_user, UsuarioAutenticado
 from datetime import timedelta
 
 # Observar métricas
-from prometheus_fastapi_instrumentator import Instrumentator
+from prometheus_fastapi_instrumentator import Instrumentator, metrics
+from database.db import atualizar_metricas_pool
 
 # ---------------------------------------------------------------------------
 # 1. Importação de funções essenciais
@@ -28,28 +30,110 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))  
 
-# scripts/webscraping_livros.py | função rodar_scraping
+# scripts/webscraping_livros.py | função rodar_scraping (Selenium só é importado se for usado)
 from scripts.webscraping_livros import rodar_scraping
 
-# scripts/processamento_dados_ml.py | funções ml_features, ml_training_data
-from scripts.processamento_dados_ml import ml_features, ml_training_data
+# scripts/processamento_dados_ml.py | funções ml_features, ml_training_data e armazém de features
+# (scikit-learn só é importado na primeira divisão treino/teste)
+from scripts.processamento_dados_ml import armazem_features, ml_features, ml_training_data
 from fastapi import Body
 
 # api/config_log.py | funções configure_logging, RequestLoggingMiddleware
 from api.config_log import configure_logging, RequestLoggingMiddleware
 
+# api/catalogo.py | classe GerenciadorCatalogo (catálogo em memória com recarga a quente)
+from api.catalogo import GerenciadorCatalogo
+
+# api/paginacao.py | paginação por deslocamento/cursor e streaming NDJSON
+from api.paginacao import aceita_ndjson, resposta_ndjson, paginar, paginar_por_cursor
+
+# api/cache_respostas.py | ETag derivado do conteúdo
+from api.cache_respostas import etag_confere, etag_do_corpo
+
+# api/compactacao.py | valores originais das colunas do catálogo compacto (ex.: preço em reais)
+from api.compactacao import valores_coluna
+
+# api/serializacao.py | codificação JSON direta das colunas (sem validar linha a linha)
+from api.serializacao import resposta_registros
+
+# api/instrumentacao.py | duração de cada etapa e tamanho das respostas no /metrics
+from api.instrumentacao import medir, registrar_resultado
+
+# api/inferencia.py | modelos de ML carregados sob demanda, com micro-lotes de predição fora do event loop
+from api.inferencia import CarregadorModelos
+
+# scripts/treinar_modelo.py | caminho do artefato dos modelos
+from scripts.treinar_modelo import CAMINHO_MODELO
+
+# api/consulta_livros.py | consultas com filtros combinados, ordenação e paginação
+from api.consulta_livros import ConsultaLivros, interpretar_ordenacao
+
+# api/similaridade.py | limite de vizinhos por consulta
+from api.similaridade import K_MAXIMO
+
+# api/servidor.py | recarga coordenada entre os workers do modo multiprocesso
+from api.servidor import instalar_sinais_recarga, pedir_recarga, pid_mestre
+
+# api/tarefas_scraping.py | classe GerenciadorScraping (scraping em segundo plano)
+from api.tarefas_scraping import GerenciadorScraping
+
+# api/verificacao_senhas.py | verificação de senhas fora do threadpool e limite de tentativas de login
+from api.verificacao_senhas import LimitadorTentativas, PoolSaturado, VerificadorSenhas
+
+# api/capas.py e scripts/capas_livros.py | capas servidas do armazém local, com cache e miniaturas
+from api.capas import CACHE_CONTROL_CAPA_POR_ID, armazem_capas, resposta_capa, url_capa_por_hash
+from scripts.capas_livros import MINIATURAS_PADRAO
+
 # ---------------------------------------------------------------------------
 # 2. Importação dos modelos de dados com Pydantic
 # ---------------------------------------------------------------------------
 
-from models.book_models import Book, StatsOverview, CategoryStats
-from models.health import HealthCheckResponse
-from models.user import User
+from models.book_models import Book, SimilarBook, StatsOverview, CategoryStats, StatsDistribuicao
+from models.health import HealthCheckResponse, ProntidaoResponse
+from models.scraping import ScrapingJob
+from models.ml import PredicaoRequest, PredicaoResponse
 
 # ---------------------------------------------------------------------------
 # 3. Inicialização do FastAPI e carregamento dos dados
 # ---------------------------------------------------------------------------
 
+def _ativado(variavel: str, padrao: str = "1") -> bool:
+    return os.getenv(variavel, padrao).lower() not in ("0", "false", "nao", "não")
+
+# Carga do catálogo numa thread: a API aceita conexões antes de ela terminar (desligue com CATALOGO_CARGA_ASSINCRONA=0)
+CATALOGO_CARGA_ASSINCRONA = _ativado("CATALOGO_CARGA_ASSINCRONA")
+# Carrega os modelos de ML logo depois do catálogo, em vez de na primeira predição (desligue com ML_AQUECER=0)
+ML_AQUECER = _ativado("ML_AQUECER")
+# Recarga automática quando o CSV é alterado por fora da API (desligue com CATALOGO_OBSERVAR_ARQUIVO=0)
+CATALOGO_OBSERVAR_ARQUIVO = _ativado("CATALOGO_OBSERVAR_ARQUIVO")
+
+@asynccontextmanager
+async def ciclo_de_vida(app: FastAPI):
+    """
+    Subida e parada da API. Nada pesado acontece no import do módulo: o
+    catálogo é carregado aqui, numa thread, enquanto /api/v1/health/live já
+    responde; /api/v1/health/ready só responde 200 quando a carga termina. Em
+    seguida, na mesma thread, os modelos de ML são aquecidos. Requisições que
+    chegarem antes do fim da carga esperam por ela.
+
+    Num worker de api/servidor.py, catálogo e modelos já vêm carregados do
+    mestre; quem observa o CSV é o mestre, e o worker só confere se o arquivo
+    mudou depois do fork.
+    """
+    gerenciador_catalogo.carregar_em_segundo_plano(depois=modelos.obter if ML_AQUECER else None)
+    if not CATALOGO_CARGA_ASSINCRONA:
+        # Espera só o catálogo (quem chegar primeiro carrega, o outro espera a trava); o aquecimento segue sozinho
+        await asyncio.to_thread(gerenciador_catalogo.carregar)
+    instalar_sinais_recarga(gerenciador_catalogo.recarregar_em_segundo_plano)
+    if pid_mestre() is not None:
+        gerenciador_catalogo.recarregar_em_segundo_plano(forcar=False)
+    elif CATALOGO_OBSERVAR_ARQUIVO:
+        gerenciador_catalogo.iniciar_observador()
+    yield
+    gerenciador_catalogo.parar_observador()
+    modelos.encerrar()
+    verificador_senhas.encerrar()
+
 app = FastAPI(
     title="API de Livros",
     description="Uma API para consultar informações sobre livros de uma livraria fictícia.",
@@ -59,6 +143,7 @@ app = FastAPI(
         "url": "http://seusite.com",
         "email": "seu@email.com",
     },
+    lifespan=ciclo_de_vida,
 )
 
 # --- Estruturando logs ---
@@ -66,34 +151,37 @@ app = FastAPI(
 configure_logging()
 app.add_middleware(RequestLoggingMiddleware)
 
-# --- Expondo métricas Prometheus ---
+# --- Expondo métricas Prometheus (inclui a ocupação do pool do banco de usuários) ---
 
 Instrumentator(
     should_group_status_codes=True,
     should_ignore_untemplated=True, 
     excluded_handlers={"/metrics"},
+).add(
+    metrics.default(),
+    atualizar_metricas_pool,
 ).instrument(app).expose(app, endpoint="/metrics", include_in_schema=False)
 
 # --- Carregamento e Preparação dos Dados ---
 
-try:
-    # O caminho para o CSV deve ser relativo ao local onde você executa o uvicorn
-    dados_livros = pd.read_csv("data/info_livros.csv", sep=";")
-    
-    # Adiciona uma coluna 'id' baseada no índice do DataFrame
-    dados_livros.reset_index(inplace=True)
-    dados_livros.rename(columns={'index': 'id'}, inplace=True)
-    
-    # Conversão de tipos para garantir consistência
-    dados_livros['preco'] = pd.to_numeric(dados_livros['preco'], errors='coerce').fillna(0)
-    dados_livros['avaliacao'] = pd.to_numeric(dados_livros['avaliacao'], errors='coerce').fillna(0)
-    dados_livros['estoque'] = pd.to_numeric(dados_livros['estoque'], errors='coerce').fillna(0).astype(int)
-    dados_livros['disponibilidade'] = dados_livros['disponibilidade'].astype(bool)
-
-except FileNotFoundError:
-    print("ERRO: O arquivo 'info_livros.csv' não foi encontrado. Certifique-se de que ele está na mesma pasta que o 'main.py'.")
-    # Cria um DataFrame vazio para evitar que a API quebre ao iniciar
-    dados_livros = pd.DataFrame(columns=['id', 'titulo', 'preco', 'avaliacao', 'disponibilidade', 'estoque', 'categoria', 'imagem'])
+# Dados, índices em memória e respostas pré-serializadas. Cada recarga monta um
+# catálogo novo fora do caminho das requisições e troca a referência
+# `gerenciador_catalogo.atual`; os endpoints leem essa referência uma única vez.
+gerenciador_catalogo = GerenciadorCatalogo()
+
+# Scraping roda em segundo plano; ao terminar, o catálogo é recarregado (se o CSV mudou),
+# em todos os workers no modo multiprocesso
+gerenciador_scraping = GerenciadorScraping(
+    rodar_scraping, ao_concluir=lambda: pedir_recarga(gerenciador_catalogo.recarregar, forcar=False)
+)
+
+# Modelos de ML carregados uma vez, no aquecimento ou na primeira predição; None até o
+# primeiro treino (python -m scripts.treinar_modelo)
+modelos = CarregadorModelos(CAMINHO_MODELO)
+
+# Senhas verificadas num pool de processos limitado, com limite de tentativas por usuário e por IP
+verificador_senhas = VerificadorSenhas()
+limitador_tentativas = LimitadorTentativas()
 
 
 # ---------------------------------------------------------------------------
@@ -113,8 +201,9 @@ def health_check():
     """
     try:
         start = time.time()
-        num_livros = len(dados_livros)
-        categorias = sorted(dados_livros["categoria"].dropna().unique().tolist())
+        catalogo = gerenciador_catalogo.atual
+        num_livros = len(catalogo.dados)
+        categorias = catalogo.categorias
         duracao = round((time.time() - start) * 1000, 2)
 
         content = {
@@ -123,6 +212,8 @@ def health_check():
             "livros_carregados": num_livros,
             "categorias_disponiveis": categorias,
             "quantidade_categorias": len(categorias),
+            "versao_dados": catalogo.geracao,
+            "dados_carregados_em": catalogo.carregado_em,
             "verificado_em": datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
             "tempo_resposta_ms": duracao
         }
@@ -134,42 +225,135 @@ def health_check():
             detail={"mensagem": "Erro ao verificar a saúde da API 😞", "erro": str(e)}
         )
 
+def _prontidao(status_api: str) -> dict:
+    # Só lê flags: nunca dispara (nem espera) a carga do catálogo ou dos modelos
+    return {
+        "status": status_api,
+        "catalogo_carregado": gerenciador_catalogo.pronto,
+        "modelos_carregados": modelos.carregado,
+        "versao_dados": gerenciador_catalogo.atual.geracao if gerenciador_catalogo.pronto else None,
+    }
+
+@app.get(
+    "/api/v1/health/live",
+    response_model=ProntidaoResponse,
+    summary="Verifica se o processo está de pé (liveness)",
+    tags=["Status"]
+)
+async def health_live():
+    """Responde assim que o servidor aceita conexões, mesmo com o catálogo ainda carregando."""
+    return _prontidao("vivo")
+
+@app.get(
+    "/api/v1/health/ready",
+    response_model=ProntidaoResponse,
+    summary="Verifica se a API já pode receber tráfego (readiness)",
+    responses={503: {"description": "Catálogo ainda carregando."}},
+    tags=["Status"]
+)
+async def health_ready():
+    """200 depois que o catálogo foi carregado; 503 (com Retry-After) enquanto a carga não termina."""
+    if not gerenciador_catalogo.pronto:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=_prontidao("carregando"),
+            headers={"Retry-After": "1"},
+        )
+    return _prontidao("pronto")
+
 @app.get(
     "/api/v1/books",
     response_model=List[Book],
     summary="Obter todos os livros",
-    description="Retorna uma lista de todos os livros disponíveis na base de dados.",
+    description=(
+        "Retorna uma lista de todos os livros disponíveis na base de dados. "
+        "Aceita paginação por `limit` + `offset` ou `cursor` (cabeçalhos X-Total-Count, "
+        "X-Next-Offset e X-Next-Cursor) e streaming com `Accept: application/x-ndjson`."
+    ),
     tags=["Livros"]
 )
-def get_livros():
+def get_livros(
+    request: Request,
+    limit: Optional[int] = Query(None, description="Número máximo de livros por página.", gt=0),
+    offset: int = Query(0, description="Quantos livros pular.", ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor retornado em X-Next-Cursor pela página anterior.")
+):
     """Endpoint para obter a lista completa de livros."""
-    if dados_livros.empty:
-        return []
-    return dados_livros.to_dict(orient="records")
+    snapshot = gerenciador_catalogo.atual
+    paginado = limit is not None or offset or cursor is not None
+
+    if not paginado and not aceita_ndjson(request):
+        return snapshot.respostas.responder("livros", request)
+
+    ndjson = aceita_ndjson(request)
+    with medir("livros.paginacao"):
+        # NDJSON: recorte do DataFrame compacto (iloc), decodificado bloco a bloco por gerar_ndjson,
+        # com memória constante; JSON: a página já decodificada de uma vez
+        recortar = None if ndjson else snapshot.indice.linhas
+        pagina, cabecalhos = paginar_por_cursor(snapshot.dados, cursor, offset, limit, recortar)
+    if ndjson:
+        return resposta_ndjson(pagina, cabecalhos, endpoint="livros")
+    return resposta_registros(pagina, cabecalhos, endpoint="livros")
 
 
 
 @app.get(
     "/api/v1/books/search",
     response_model=List[Book],
-    summary="Buscar livros por título e/ou categoria",
+    summary="Buscar livros combinando filtros",
+    description=(
+        "Combina título, categorias, faixas de preço e de avaliação, disponibilidade e "
+        "estoque mínimo numa única consulta, com ordenação por qualquer campo (`sort`) "
+        "e paginação por `limit` + `offset` (cabeçalho X-Next-Offset)."
+    ),
     tags=["Livros"]
 )
 def search_livros(
     title: Optional[str] = Query(None, description="Parte do título do livro para buscar."),
-    category: Optional[str] = Query(None, description="Categoria do livro para filtrar.")
+    category: Optional[List[str]] = Query(None, description="Categoria do livro para filtrar (repita para aceitar várias)."),
+    min_price: Optional[float] = Query(None, description="Preço mínimo.", ge=0),
+    max_price: Optional[float] = Query(None, description="Preço máximo.", ge=0),
+    min_rating: Optional[float] = Query(None, description="Avaliação mínima.", ge=0, le=5),
+    max_rating: Optional[float] = Query(None, description="Avaliação máxima.", ge=0, le=5),
+    available: Optional[bool] = Query(None, description="Filtra por disponibilidade."),
+    min_stock: Optional[int] = Query(None, description="Estoque mínimo.", ge=0),
+    sort: Optional[str] = Query(
+        None, description="Campos de ordenação separados por vírgula; prefixo '-' para decrescente (ex.: -avaliacao,preco)."
+    ),
+    limit: Optional[int] = Query(None, description="Número máximo de livros a retornar.", gt=0),
+    offset: int = Query(0, description="Quantos livros pular (paginação).", ge=0)
 ):
     """
-    Permite a busca de livros filtrando por título e/ou categoria.
-    A busca não diferencia maiúsculas de minúsculas.
+    Permite a busca de livros combinando filtros; um livro precisa atender a todos.
+    A busca não diferencia maiúsculas de minúsculas nem acentos. Um título casa
+    se contém o texto buscado ou se cada palavra buscada é início de alguma
+    palavra dele (ex.: "lit wom" encontra "Little Women"); um `title` em branco
+    não filtra. Sem `sort`, os resultados de uma busca por título vêm ordenados
+    por relevância e os demais na ordem do catálogo. O plano escolhido é informado no cabeçalho X-Query-Plan.
     """
-    resultado = dados_livros
-    if title:
-        resultado = resultado[resultado["titulo"].str.contains(title, case=False, na=False)]
-    if category:
-        resultado = resultado[resultado["categoria"].str.contains(category, case=False, na=False)]
-    
-    return resultado.to_dict(orient="records")
+    catalogo = gerenciador_catalogo.atual
+    try:
+        ordenacao = interpretar_ordenacao(sort, catalogo.consultas.campos_ordenacao)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    consulta = ConsultaLivros(
+        titulo=title or None,
+        categorias=tuple(c for c in category or () if c),
+        preco_min=min_price, preco_max=max_price,
+        avaliacao_min=min_rating, avaliacao_max=max_rating,
+        disponivel=available, estoque_min=min_stock,
+        ordenacao=ordenacao, limite=limit, deslocamento=offset,
+    )
+    with medir("busca.filtro"):
+        posicoes, tem_mais, plano = catalogo.consultas.executar(consulta)
+
+    cabecalhos = {"X-Query-Plan": plano.descrever()}
+    if tem_mais:
+        cabecalhos["X-Next-Offset"] = str(offset + limit)
+    with medir("busca.linhas"):
+        resultado = catalogo.indice.linhas(posicoes)
+    return resposta_registros(resultado, cabecalhos, endpoint="busca")
 
 @app.get(
     "/api/v1/books/top-rated",
@@ -179,8 +363,12 @@ def search_livros(
 )
 def livros_top_avaliados(quantidade: int = Query(10, description="Número de livros a retornar.", gt=0, le=100)):
     """Retorna os livros com as maiores notas de avaliação, em ordem decrescente."""
-    top = dados_livros.sort_values(by="avaliacao", ascending=False).head(quantidade)
-    return top.to_dict(orient="records")
+    catalogo = gerenciador_catalogo.atual
+    with medir("top_avaliados.ordenacao"):
+        # Ordena só a coluna, nos valores originais (float): o desempate entre notas iguais continua o mesmo
+        avaliacoes = pd.Series(valores_coluna(catalogo.dados, "avaliacao"))
+        posicoes = avaliacoes.sort_values(ascending=False).index[:quantidade]
+    return resposta_registros(catalogo.indice.linhas(posicoes), endpoint="top_avaliados")
 
 @app.get(
     "/api/v1/books/price-range",
@@ -193,10 +381,10 @@ def livros_por_preco(
     max_price: float = Query(10000.0, description="Preço máximo.", ge=0)
 ):
     """Busca livros que estão dentro de uma faixa de preço específica (inclusivo)."""
-    filtrado = dados_livros[
-        (dados_livros["preco"] >= min_price) & (dados_livros["preco"] <= max_price)
-    ]
-    return filtrado.to_dict(orient="records")
+    catalogo = gerenciador_catalogo.atual
+    with medir("faixa_preco.filtro"):
+        filtrado = catalogo.indice.linhas(catalogo.indice.posicoes_por_faixa_preco(min_price, max_price))
+    return resposta_registros(filtrado, endpoint="faixa_preco")
 
 @app.get(
     "/api/v1/categories",
@@ -204,10 +392,9 @@ def livros_por_preco(
     summary="Listar todas as categorias",
     tags=["Categorias"]
 )
-def get_categorias():
+def get_categorias(request: Request):
     """Retorna uma lista ordenada com todas as categorias de livros únicas."""
-    categorias = dados_livros["categoria"].dropna().unique().tolist()
-    return sorted(categorias)
+    return gerenciador_catalogo.atual.respostas.responder("categorias", request)
 
 @app.get(
     "/api/v1/stats/overview",
@@ -215,22 +402,9 @@ def get_categorias():
     summary="Obter estatísticas gerais",
     tags=["Estatísticas"]
 )
-def stats_overview():
+def stats_overview(request: Request):
     """Fornece um resumo estatístico de todo o acervo de livros."""
-    if dados_livros.empty:
-        return {"total_livros": 0, "preco_medio": 0, "avaliacao_media": 0, "estoque_total": 0}
-        
-    total_livros = len(dados_livros)
-    preco_medio = round(dados_livros["preco"].mean(), 2)
-    avaliacao_media = round(dados_livros["avaliacao"].mean(), 2)
-    total_estoque = int(dados_livros["estoque"].sum())
-
-    return {
-        "total_livros": total_livros,
-        "preco_medio": preco_medio,
-        "avaliacao_media": avaliacao_media,
-        "estoque_total": total_estoque
-    }
+    return gerenciador_catalogo.atual.respostas.responder("stats_overview", request)
 
 @app.get(
     "/api/v1/stats/categories",
@@ -238,88 +412,315 @@ def stats_overview():
     summary="Obter estatísticas por categoria",
     tags=["Estatísticas"]
 )
-def stats_por_categoria():
+def stats_por_categoria(request: Request):
     """Agrupa os livros por categoria e calcula estatísticas para cada uma."""
-    if dados_livros.empty or 'categoria' not in dados_livros.columns:
-        return []
-        
-    stats = dados_livros.groupby("categoria").agg(
-        total_livros=("titulo", "count"),
-        preco_medio=("preco", "mean"),
-        avaliacao_media=("avaliacao", "mean"),
-        estoque_total=("estoque", "sum")
-    ).reset_index()
-
-    stats["preco_medio"] = stats["preco_medio"].round(2)
-    stats["avaliacao_media"] = stats["avaliacao_media"].round(2)
-    stats["estoque_total"] = stats["estoque_total"].astype(int)
-
-    return stats.to_dict(orient="records")
+    return gerenciador_catalogo.atual.respostas.responder("stats_categorias", request)
+
+@app.get(
+    "/api/v1/stats/distribution",
+    response_model=StatsDistribuicao,
+    summary="Obter distribuição de preços e notas",
+    tags=["Estatísticas"]
+)
+def stats_distribuicao(request: Request):
+    """Percentis de preço e histograma de notas, do acervo inteiro e de cada categoria."""
+    return gerenciador_catalogo.atual.respostas.responder("stats_distribuicao", request)
 
 @app.post("/api/v1/auth/login", tags=["Autenticação"])
-def login(
+async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
 ):
     """
     Realiza login e retorna um token JWT se as credenciais estiverem corretas.
+    A senha é verificada num pool de processos à parte (429 se o usuário ou o
+    IP passou do limite de tentativas que falharam, 503 se o pool estiver saturado).
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    # Atrás de um proxy confiável (FORWARDED_ALLOW_IPS), o uvicorn já trocou o endereço pelo do X-Forwarded-For
+    ip = request.client.host if request.client else "desconhecido"
+    espera = limitador_tentativas.registrar(form_data.username, ip)
+    if espera is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Muitas tentativas de login. Tente novamente mais tarde.",
+            headers={"Retry-After": str(int(espera))},
+        )
+
+    try:
+        user = await autenticar_usuario(form_data.username, form_data.password, verificador_senhas)
+    except PoolSaturado:
+        limitador_tentativas.cancelar(form_data.username, ip)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado verificando outros logins. Tente novamente em instantes.",
+            headers={"Retry-After": "1"},
+        )
     if not user:
         raise HTTPException(status_code=400, detail="Credenciais inválidas")
-    
-    token = create_access_token(data={"sub": user.username}, expires_delta=timedelta(minutes=30))
+
+    limitador_tentativas.sucesso(form_data.username, ip)
+    token = create_access_token(data=claims_usuario(user), expires_delta=timedelta(minutes=30))
     return {"access_token": token, "token_type": "bearer"}
 
 @app.post("/api/v1/auth/refresh", tags=["Autenticação"])
-def refresh_token(current_user: User = Depends(get_current_user)):
+def refresh_token(current_user: UsuarioAutenticado = Depends(get_current_user)):
     """
     Gera um novo token JWT para o usuário logado.
     """
-    new_token = create_access_token(data={"sub": current_user.username})
+    new_token = create_access_token(data=claims_usuario(current_user))
     return {"access_token": new_token, "token_type": "bearer"}
 
-@app.post("/api/v1/scraping/trigger", tags=["Admin"])
-def executar_scraping(current_user: User = Depends(get_current_user)):
+@app.post("/api/v1/scraping/trigger", tags=["Admin"], status_code=status.HTTP_202_ACCEPTED)
+def executar_scraping(
+    completo: bool = Query(False, description="Ignora as impressões salvas e refaz o scraping completo."),
+    current_user: UsuarioAutenticado = Depends(get_current_user)
+):
     """
-    Executa o scraping de livros. Disponível apenas para usuários administradores.
+    Dispara o scraping de livros em segundo plano e retorna o id do job na hora.
+    Por padrão o scraping é incremental: só as páginas que mudaram desde a última
+    execução são lidas de novo. Se já houver um scraping em andamento, mesmo em
+    outro worker, retorna o job existente. Disponível apenas para usuários administradores.
     """
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Acesso negado: você não é admin.")
-    
-    try:
-        rodar_scraping()
-        return {"mensagem": "Scraping executado com sucesso e dados atualizados!"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erro ao executar o scraping: {str(e)}")
+
+    tarefa, nova = gerenciador_scraping.disparar(incremental=False) if completo else gerenciador_scraping.disparar()
+    return {
+        "mensagem": "Scraping iniciado." if nova else "Já existe um scraping em andamento.",
+        "job_id": tarefa.id,
+        "status": tarefa.status,
+        "acompanhar_em": f"/api/v1/scraping/jobs/{tarefa.id}",
+    }
+
+@app.get("/api/v1/scraping/jobs/{job_id}", response_model=ScrapingJob, tags=["Admin"])
+def status_scraping(job_id: str, current_user: UsuarioAutenticado = Depends(get_current_user)):
+    """
+    Consulta o andamento de um job de scraping (páginas, livros e erros).
+    Disponível apenas para usuários administradores.
+    """
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Acesso negado: você não é admin.")
+
+    tarefa = gerenciador_scraping.obter(job_id)
+    if tarefa is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} não encontrado.")
+    return tarefa.para_dict()
+
+@app.post("/api/v1/admin/catalog/reload", tags=["Admin"], status_code=status.HTTP_202_ACCEPTED)
+def recarregar_catalogo(current_user: UsuarioAutenticado = Depends(get_current_user)):
+    """
+    Relê o CSV em segundo plano e troca o catálogo em uso assim que o novo
+    estiver pronto. Requisições em andamento terminam sobre a versão anterior.
+    Acompanhe a troca pelo campo `versao_dados` de /api/v1/health. Com vários
+    workers (api/servidor.py), todos recarregam.
+    Disponível apenas para usuários administradores.
+    """
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Acesso negado: você não é admin.")
+
+    versao_atual = gerenciador_catalogo.atual.geracao
+    pedir_recarga(gerenciador_catalogo.recarregar_em_segundo_plano)
+    return {
+        "mensagem": "Recarga do catálogo iniciada.",
+        "versao_atual": versao_atual,
+        "acompanhar_em": "/api/v1/health",
+    }
 
 @app.get("/api/v1/ml/features", tags=["ML"])
-def retorna_features():
+def retorna_features(
+    request: Request,
+    limit: Optional[int] = Query(None, description="Número máximo de linhas por página.", gt=0),
+    offset: int = Query(0, description="Quantas linhas pular.", ge=0)
+):
     """
     Retorna os dados formatados para features.
+    Aceita paginação (`limit`/`offset`) e streaming com `Accept: application/x-ndjson`.
     """
-    df = ml_features()
-    return df.to_dict(orient="records")
+    with medir("ml_features.dados"):
+        df, cabecalhos = paginar(ml_features(), offset, limit)
+    if aceita_ndjson(request):
+        return resposta_ndjson(df, cabecalhos, endpoint="ml_features")
+    return resposta_registros(df, cabecalhos, endpoint="ml_features")
 
 @app.get("/api/v1/ml/training-data", tags=["ML"])
-def dados_treino_ml():
+def dados_treino_ml(
+    request: Request,
+    limit: Optional[int] = Query(None, description="Número máximo de linhas por página.", gt=0),
+    offset: int = Query(0, description="Quantas linhas pular.", ge=0)
+):
     """
     Retorna os dados para treino de modelos.
+    Aceita paginação (`limit`/`offset`) e streaming com `Accept: application/x-ndjson`.
     """
-    df = ml_training_data()
-    return df.to_dict(orient="records")
+    with medir("ml_treino.dados"):
+        df, cabecalhos = paginar(ml_training_data(), offset, limit)
+    if aceita_ndjson(request):
+        return resposta_ndjson(df, cabecalhos, endpoint="ml_treino")
+    return resposta_registros(df, cabecalhos, endpoint="ml_treino")
+
+@app.get("/api/v1/ml/export", tags=["ML"])
+def exportar_features_ml(
+    request: Request,
+    conjunto: Literal["todos", "treino", "teste"] = Query("todos", description="Quais linhas exportar."),
+    test_size: float = Query(0.2, description="Fração dos dados reservada para teste.", gt=0, lt=1),
+    semente: int = Query(40, description="Semente da divisão treino/teste (mesma semente, mesma divisão).")
+):
+    """
+    Exporta as features numéricas em um arquivo NumPy (.npz) com os arrays `X`
+    (float32), `colunas` e `ids`, pronto para `numpy.load` sem passar por JSON.
+    Com os valores padrão, `treino` traz as mesmas linhas de /api/v1/ml/training-data.
+    """
+    with medir("ml_exportar.npz"):
+        corpo = armazem_features.exportar(conjunto, test_size, semente)
+    registrar_resultado("ml_exportar", tamanho_bytes=len(corpo))
+    cabecalhos = {
+        "ETag": etag_do_corpo(corpo),
+        "Cache-Control": "no-cache",
+        "Content-Disposition": f'attachment; filename="features_{conjunto}.npz"',
+    }
+    if etag_confere(request, cabecalhos["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabecalhos)
+    return Response(content=corpo, media_type="application/octet-stream", headers=cabecalhos)
 
-@app.post("/api/v1/ml/predictions", tags=["ML"])
-def predicoes_ml(payload: dict = Body(...)):
+@app.post("/api/v1/ml/predictions", response_model=PredicaoResponse, tags=["ML"])
+async def predicoes_ml(payload: PredicaoRequest = Body(...)):
     """
-    Recebe os dados e responde com uma mensagem genérica.
+    Prevê a avaliação (ou o preço) de um lote de livros com o modelo treinado.
+    Requisições simultâneas são agrupadas em micro-lotes e processadas juntas
+    numa única chamada vetorizada do modelo, fora do event loop.
     """
+    servico_modelos = await modelos.obter_async()
+    if servico_modelos is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Nenhum modelo treinado. Rode `python -m scripts.treinar_modelo` e reinicie a API.",
+        )
+
+    colunas = servico_modelos.colunas[payload.alvo]
+    faltando = sorted({c for livro in payload.livros for c in colunas if getattr(livro, c) is None})
+    if faltando:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Para prever '{payload.alvo}' informe {faltando} em todos os livros.",
+        )
+
+    with medir("ml_predicoes.entradas"):
+        entradas = np.array([[getattr(livro, c) for c in colunas] for livro in payload.livros], dtype=float)
+    with medir("ml_predicoes.espera"):
+        predicoes = await servico_modelos.prever(payload.alvo, entradas)
+    registrar_resultado("ml_predicoes", len(predicoes))
+    return {"alvo": payload.alvo, "modelo": servico_modelos.versao, "predicoes": predicoes.tolist()}
+@app.get(
+    "/api/v1/books/{id_livro}/similar",
+    response_model=List[SimilarBook],
+    summary="Obter livros similares",
+    tags=["Livros"]
+)
+def get_livros_similares(
+    id_livro: int = Path(..., description="O ID do livro de referência.", gt=-1),
+    k: int = Query(10, description="Quantos livros similares retornar.", gt=0, le=K_MAXIMO)
+):
+    """
+    Retorna os `k` livros mais parecidos com o livro informado, considerando
+    preço, avaliação, estoque, categoria e palavras do título, do mais parecido
+    ao menos parecido. Retorna 404 se o livro não for encontrado.
+    """
+    catalogo = gerenciador_catalogo.atual
+    posicao = catalogo.indice.posicao_por_id(id_livro)
+    if posicao is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Livro com ID {id_livro} não encontrado.")
+
+    with medir("similares.vizinhos"):
+        posicoes, distancias = catalogo.similares.vizinhos(posicao, k)
+    with medir("similares.linhas"):
+        similares = catalogo.indice.linhas(posicoes).assign(distancia=np.round(distancias.astype(float), 4))
+    return resposta_registros(similares, endpoint="similares")
+
+def _validar_largura_capa(largura: Optional[int]):
+    if largura is not None and largura not in MINIATURAS_PADRAO:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Largura inválida. Valores aceitos: {', '.join(map(str, MINIATURAS_PADRAO))}.",
+        )
+
+_DESCRICAO_LARGURA_CAPA = (
+    f"Largura da miniatura em pixels ({', '.join(map(str, MINIATURAS_PADRAO))}); sem ela, a capa original."
+)
+
+@app.get(
+    "/api/v1/covers/{hash_capa}",
+    response_class=Response,
+    summary="Obter uma capa pelo hash do conteúdo",
+    responses={
+        200: {"content": {"image/jpeg": {}}, "description": "A imagem da capa (ou da miniatura)."},
+        304: {"description": "O cliente já tem esta versão (If-None-Match)."},
+    },
+    tags=["Livros"]
+)
+def get_capa(
+    request: Request,
+    hash_capa: str = Path(..., description="SHA-256 do conteúdo da capa.", pattern="^[0-9a-f]{64}$"),
+    largura: Optional[int] = Query(None, description=_DESCRICAO_LARGURA_CAPA),
+):
+    """
+    Retorna a capa guardada no armazém local. O conteúdo de uma URL por hash
+    nunca muda, então a resposta vai com cache imutável de um ano (e ETag).
+    Retorna 404 se a capa não estiver no armazém.
+    """
+    _validar_largura_capa(largura)
+    capa = armazem_capas.localizar_hash(hash_capa)
+    try:
+        if capa is None:
+            raise FileNotFoundError(hash_capa)
+        if largura is None:
+            return resposta_capa(request, capa.caminho, f'"{capa.hash}"')
+        # Miniatura que não foi gerada junto com o download é gerada agora (uma vez) e fica no armazém
+        with medir("capa.miniatura"):
+            miniatura = armazem_capas.miniatura(capa, largura)
+        if miniatura is None:
+            return resposta_capa(request, capa.caminho, f'"{capa.hash}"')
+        return resposta_capa(request, miniatura, f'"{capa.hash}-{largura}"')
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Capa {hash_capa} não encontrada.")
+
+@app.get(
+    "/api/v1/books/{id_livro}/cover",
+    response_class=Response,
+    summary="Obter a capa de um livro",
+    responses={
+        307: {"description": "Redireciona para a capa por hash ou, se ela ainda não foi baixada, para a URL original."},
+    },
+    tags=["Livros"]
+)
+def get_capa_livro(
+    id_livro: int = Path(..., description="O ID do livro.", gt=-1),
+    largura: Optional[int] = Query(None, description=_DESCRICAO_LARGURA_CAPA),
+):
+    """
+    Redireciona (307) para a capa do livro em /api/v1/covers/{hash}, que tem
+    cache imutável, ou para a imagem no site original se a capa ainda não foi
+    baixada pelo scraping. Como o id pode apontar para outro livro depois de uma
+    recarga, o redirecionamento vai com `Cache-Control: no-cache`. Retorna 404
+    se o livro não existir ou não tiver capa.
+    """
+    _validar_largura_capa(largura)
+    catalogo = gerenciador_catalogo.atual
+    posicao = catalogo.indice.posicao_por_id(id_livro)
+    if posicao is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Livro com ID {id_livro} não encontrado.")
+
+    original = catalogo.imagem_original(posicao)
+    if not original:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Livro com ID {id_livro} não tem capa.")
+    capa = armazem_capas.localizar(original)
+    if capa is None or not os.path.exists(capa.caminho):
+        destino = original
+    else:
+        destino = url_capa_por_hash(capa.hash) + ("" if largura is None else f"?largura={largura}")
+    return RedirectResponse(
+        destino, status_code=status.HTTP_307_TEMPORARY_REDIRECT, headers={"Cache-Control": CACHE_CONTROL_CAPA_POR_ID}
+    )
 
-    return {
-        "mensagem": "Predição recebida com sucesso!",
-        "dados_recebidos": payload,
-        "nota": "Este endpoint está pronto para integrar com um modelo ML no futuro."
-    }
 @app.get(
     "/api/v1/books/{id_livro}",
     response_model=Book,
@@ -330,8 +731,10 @@ def get_livro_id(id_livro: int = Path(..., description="O ID do livro a ser busc
     """
     Busca um livro específico pelo seu ID. Retorna 404 se o livro não for encontrado.
     """
-    livro = dados_livros[dados_livros['id'] == id_livro]
-    if livro.empty:
+    catalogo = gerenciador_catalogo.atual
+    posicao = catalogo.indice.posicao_por_id(id_livro)
+    if posicao is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Livro com ID {id_livro} não encontrado.")
     # .to_dict() retorna uma lista, pegamos o primeiro (e único) item
-    return livro.to_dict(orient="records")[0]
\ No newline at end of file
+    with medir("livro.to_dict"):
+        return catalogo.indice.linhas([posicao]).to_dict(orient="records")[0]
\ No newline at end of file
@@ -0,0 +1,96 @@
+# api/paginacao.py
+import base64
+import binascii
+from typing import Callable, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from api.compactacao import LeitorColunas, formato
+from api.instrumentacao import registrar_resultado
+from api.serializacao import codificar_registros
+
+MEDIA_TYPE_NDJSON = "application/x-ndjson"
+TAMANHO_BLOCO_NDJSON = 1000
+
+
+def aceita_ndjson(request: Request) -> bool:
+    """Indica se o cliente pediu NDJSON no cabeçalho Accept."""
+    return MEDIA_TYPE_NDJSON in request.headers.get("accept", "")
+
+
+def gerar_ndjson(dados: pd.DataFrame, tamanho_bloco: int = TAMANHO_BLOCO_NDJSON) -> Iterator[bytes]:
+    """
+    Gera o DataFrame como NDJSON (um objeto JSON por linha), em blocos de
+    `tamanho_bloco` linhas. Só um bloco é serializado por vez, então a memória
+    usada não depende do tamanho do DataFrame. Um DataFrame compacto é
+    decodificado bloco a bloco.
+    """
+    recortar = LeitorColunas(dados).linhas if formato(dados) is not None else dados.iloc.__getitem__
+    for inicio in range(0, len(dados), tamanho_bloco):
+        bloco = codificar_registros(recortar(slice(inicio, inicio + tamanho_bloco)), linhas=True)
+        if not bloco.endswith("\n"):
+            bloco += "\n"
+        yield bloco.encode("utf-8")
+
+
+def resposta_ndjson(dados: pd.DataFrame, cabecalhos: Optional[dict] = None,
+                    endpoint: Optional[str] = None) -> StreamingResponse:
+    """Resposta HTTP em streaming com as linhas do DataFrame em NDJSON."""
+    if endpoint is not None:
+        registrar_resultado(endpoint, len(dados))
+    return StreamingResponse(gerar_ndjson(dados), media_type=MEDIA_TYPE_NDJSON, headers=cabecalhos)
+
+
+def codificar_cursor(id_livro: int) -> str:
+    """Cursor opaco que aponta para o livro seguinte a `id_livro`."""
+    return base64.urlsafe_b64encode(str(id_livro).encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> int:
+    try:
+        preenchido = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(preenchido.encode()).decode())
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor de paginação inválido.")
+
+
+def paginar(dados: pd.DataFrame, offset: int = 0, limit: Optional[int] = None,
+            recortar: Optional[Callable[[slice], pd.DataFrame]] = None) -> Tuple[pd.DataFrame, dict]:
+    """
+    Recorta o DataFrame por deslocamento e limite. `recortar` substitui o
+    `iloc` na hora de montar a página (ex.: `IndiceCatalogo.linhas`, que já
+    devolve as linhas decodificadas do catálogo compacto).
+
+    Returns:
+        tuple: A página e os cabeçalhos de paginação (X-Total-Count e, se houver
+        mais linhas, X-Next-Offset).
+    """
+    fim = len(dados) if limit is None else min(offset + limit, len(dados))
+    cabecalhos = {"X-Total-Count": str(len(dados))}
+    if fim < len(dados):
+        cabecalhos["X-Next-Offset"] = str(fim)
+    return (recortar or dados.iloc.__getitem__)(slice(offset, fim)), cabecalhos
+
+
+def paginar_por_cursor(dados: pd.DataFrame, cursor: Optional[str], offset: int = 0, limit: Optional[int] = None,
+                       recortar: Optional[Callable[[slice], pd.DataFrame]] = None) -> Tuple[pd.DataFrame, dict]:
+    """
+    Paginação por cursor sobre um DataFrame ordenado pela coluna 'id'. O cursor
+    marca o último id entregue, então continua válido mesmo que o catálogo seja
+    recarregado entre uma página e outra. Sem cursor, usa `offset`.
+
+    Returns:
+        tuple: A página e os cabeçalhos de paginação (X-Total-Count e, se houver
+        mais linhas, X-Next-Cursor e X-Next-Offset).
+    """
+    if cursor is not None:
+        ids = dados["id"].to_numpy()
+        offset = int(np.searchsorted(ids, decodificar_cursor(cursor), side="right"))
+
+    pagina, cabecalhos = paginar(dados, offset, limit, recortar)
+    if "X-Next-Offset" in cabecalhos and len(pagina):
+        cabecalhos["X-Next-Cursor"] = codificar_cursor(int(pagina["id"].iloc[-1]))
+    return pagina, cabecalhos
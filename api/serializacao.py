@@ -0,0 +1,95 @@
+# api/serializacao.py
+from typing import Optional, Type
+
+import pandas as pd
+from fastapi import Response
+from pydantic import BaseModel
+
+from api.compactacao import expandir
+from api.instrumentacao import medir, registrar_resultado
+
+# Tipo pandas usado para cada tipo de campo dos modelos Pydantic
+_DTYPES = {int: "int64", float: "float64", bool: "bool", str: "object"}
+
+
+def validar_esquema(dados: pd.DataFrame, modelo: Type[BaseModel]) -> pd.DataFrame:
+    """
+    Valida o DataFrame contra o modelo Pydantic uma única vez, no carregamento:
+    confere se todas as colunas existem, converte cada uma para o tipo do campo
+    e valida a primeira linha com o próprio modelo. Depois disso as respostas
+    podem ser codificadas direto das colunas, sem validar linha a linha.
+
+    Returns:
+        pd.DataFrame: As colunas do modelo, na ordem do modelo e com os tipos convertidos.
+
+    Raises:
+        ValueError: Se faltar alguma coluna exigida pelo modelo.
+    """
+    faltando = [campo for campo in modelo.model_fields if campo not in dados.columns]
+    if faltando:
+        raise ValueError(f"Colunas ausentes para o modelo {modelo.__name__}: {faltando}")
+
+    colunas = {}
+    for campo, info in modelo.model_fields.items():
+        coluna = dados[campo]
+        if info.annotation is str:
+            coluna = coluna.fillna("").astype(str)
+        elif info.annotation in _DTYPES:
+            # copy=False: colunas que já têm o tipo certo (ex.: lidas por memory-map) não são copiadas
+            coluna = coluna.astype(_DTYPES[info.annotation], copy=False)
+        colunas[campo] = coluna
+    dados = pd.DataFrame(colunas, copy=False)
+
+    if len(dados):
+        modelo.model_validate(dados.iloc[:1].to_dict(orient="records")[0])
+    return dados
+
+
+# Casas decimais dos floats no codificador do pandas. Com 10, floats abaixo de
+# 100 000 com até 10 casas (preços, avaliações, distâncias arredondadas) saem
+# como no json.dumps; com 15 (o máximo), 24.89 sairia 24.890000000000001. Os
+# demais saem arredondados em 10 casas: 0.1 + 0.2 vira 0.3 e 683983.93 vira 683983.9300000001.
+PRECISAO_DECIMAIS = 10
+
+
+def codificar_registros(dados: pd.DataFrame, linhas: bool = False) -> str:
+    """
+    Os registros de um DataFrame já decodificado em JSON, pelo codificador em C
+    do pandas: uma lista de objetos ou, com `linhas`, um objeto por linha
+    (NDJSON). As respostas JSON e NDJSON passam por aqui e saem com os mesmos valores.
+    """
+    texto = dados.to_json(
+        orient="records", lines=linhas, force_ascii=False, date_format="iso", double_precision=PRECISAO_DECIMAIS
+    )
+    # O pandas escapa "/" como "\/"; desfazer mantém a saída igual à do json.dumps
+    return texto.replace("\\/", "/")
+
+
+def registros_json(dados: pd.DataFrame) -> bytes:
+    """
+    Codifica o DataFrame como uma lista JSON de objetos usando o codificador em C
+    do pandas, coluna a coluna. Para colunas já validadas com `validar_esquema`
+    o resultado é idêntico ao do `response_model` do FastAPI quando os floats
+    estão abaixo de 100 000 e têm até PRECISAO_DECIMAIS casas decimais (o caso
+    das colunas do catálogo); os demais saem arredondados nessas casas. Colunas no
+    formato compacto (api/compactacao.py) são decodificadas aqui.
+    """
+    return codificar_registros(expandir(dados)).encode("utf-8")
+
+
+def resposta_registros(dados: pd.DataFrame, cabecalhos: Optional[dict] = None,
+                       endpoint: Optional[str] = None) -> Response:
+    """
+    Resposta HTTP com os registros do DataFrame já codificados. Retornar um
+    Response faz o FastAPI pular a validação do `response_model`, que continua
+    descrevendo o esquema no OpenAPI.
+
+    Com `endpoint`, a codificação é medida na etapa "<endpoint>.json" e o tamanho
+    da resposta (linhas e bytes) é publicado nas métricas.
+    """
+    if endpoint is None:
+        return Response(content=registros_json(dados), media_type="application/json", headers=cabecalhos)
+    with medir(f"{endpoint}.json"):
+        corpo = registros_json(dados)
+    registrar_resultado(endpoint, len(dados), len(corpo))
+    return Response(content=corpo, media_type="application/json", headers=cabecalhos)
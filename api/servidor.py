@@ -0,0 +1,250 @@
+# api/servidor.py
+"""
+Modo com vários workers. O processo mestre importa a API e carrega o
+catálogo (e os modelos de ML) uma única vez. Depois abre o socket e faz fork
+dos workers, que herdam o catálogo já pronto. As páginas de memória ficam
+compartilhadas por copy-on-write, em vez de uma carga por worker como no
+`uvicorn --workers`, que sobe cada worker do zero.
+
+- Métricas: com mais de um worker, o Prometheus roda no modo multiprocesso
+  (PROMETHEUS_MULTIPROC_DIR). O /metrics de qualquer worker agrega todos.
+- Recargas: o pedido de recarga de um worker (POST /admin/catalog/reload, fim
+  do scraping) e a observação do CSV, que aqui só roda no mestre, viram um
+  sinal para o mestre. Ele repassa o sinal a todos os workers, e cada um troca
+  o seu catálogo.
+- Worker que morre é substituído; SIGTERM/SIGINT encerram todos.
+- IP do cliente: atrás de um proxy listado em FORWARDED_ALLOW_IPS, vem do
+  X-Forwarded-For (é ele que o limite de tentativas de login usa).
+
+Uso (a partir da raiz do projeto):
+    python -m api.servidor --workers 4 --port 10000
+    WEB_CONCURRENCY=4 python -m api.servidor
+"""
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger("api.servidor")
+
+# Mesmo nome de variável usado por gunicorn/uvicorn para o número de workers
+WORKERS_PADRAO = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+# Proxies cujo X-Forwarded-For vale como IP do cliente (mesma variável e padrão do uvicorn; aceita redes
+# CIDR). O IP vem do último endereço da cadeia que não é de um proxy confiável, então não dá para forjá-lo
+PROXIES_CONFIAVEIS = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+# PID do mestre, exportado para os workers; sem ele a API está num processo só
+VAR_MESTRE = "API_MESTRE_PID"
+SINAL_RECARGA = getattr(signal, "SIGUSR1", None)           # recarga forçada
+SINAL_RECARGA_SE_MUDOU = getattr(signal, "SIGUSR2", None)  # só se o CSV mudou
+
+# Worker que morre antes disso depois de subir é recriado com uma pausa (evita loop de falhas)
+VIDA_MINIMA_SEGUNDOS = 1.0
+
+
+def pid_mestre() -> Optional[int]:
+    """PID do processo mestre, se esta API for um worker de api/servidor.py."""
+    valor = os.getenv(VAR_MESTRE)
+    return int(valor) if valor and int(valor) != os.getpid() else None
+
+
+def pedir_recarga(recarregar_local: Callable[[bool], None], forcar: bool = True) -> None:
+    """
+    Pede uma recarga do catálogo: a todos os workers, via mestre, se houver um;
+    senão, só neste processo (`recarregar_local(forcar)`).
+    """
+    mestre = pid_mestre()
+    if mestre is None:
+        recarregar_local(forcar)
+        return
+    os.kill(mestre, SINAL_RECARGA if forcar else SINAL_RECARGA_SE_MUDOU)
+
+
+def instalar_sinais_recarga(recarregar_local: Callable[[bool], None]) -> None:
+    """
+    Recarga ao receber SIGUSR1 (forçada) ou SIGUSR2 (só se o CSV mudou), tratada
+    no event loop em execução. Vale também com um único processo (`kill -USR1 <pid>`).
+    """
+    if SINAL_RECARGA is None:
+        return
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(SINAL_RECARGA, recarregar_local, True)
+        loop.add_signal_handler(SINAL_RECARGA_SE_MUDOU, recarregar_local, False)
+    except (NotImplementedError, RuntimeError):
+        # Loop fora da thread principal (ex.: TestClient) ou sem suporte a sinais
+        pass
+
+
+class Mestre:
+    """Faz fork dos workers, repassa os pedidos de recarga e recria os workers que morrem."""
+
+    def __init__(self, app, sock: socket.socket, workers: int, multiproc_dir: Optional[str]):
+        self.app = app
+        self.sock = sock
+        self.quantidade = workers
+        self.multiproc_dir = multiproc_dir
+        self.workers: Dict[int, float] = {}  # pid -> início
+        self.parando = False
+
+    def iniciar_worker(self) -> int:
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = time.monotonic()
+            return pid
+        self._executar_worker()  # nunca retorna
+
+    def _executar_worker(self):
+        codigo, listener = 0, None
+        try:
+            import uvicorn
+
+            from api.config_log import configure_logging
+            from database.db import descartar_conexoes_herdadas
+
+            for sinal in (signal.SIGTERM, signal.SIGINT, SINAL_RECARGA, SINAL_RECARGA_SE_MUDOU):
+                signal.signal(sinal, signal.SIG_DFL)
+            listener = configure_logging()
+            descartar_conexoes_herdadas()
+            config = uvicorn.Config(
+                self.app, lifespan="on", log_config=None, access_log=False,
+                proxy_headers=True, forwarded_allow_ips=PROXIES_CONFIAVEIS,
+            )
+            uvicorn.Server(config).run(sockets=[self.sock])
+        except BaseException:
+            logger.exception("worker_falhou", extra={"event": "worker_falhou", "pid": os.getpid()})
+            codigo = 1
+        finally:
+            # os._exit: o worker não pode rodar a limpeza herdada do mestre (atexit, finally de `main`)
+            if listener is not None:
+                listener.stop()
+            os._exit(codigo)
+
+    def repassar(self, sinal: int) -> None:
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, sinal)
+            except ProcessLookupError:
+                pass
+
+    def _tratar_sinal(self, sinal, _frame):
+        if sinal in (signal.SIGTERM, signal.SIGINT):
+            self.parando = True
+            self.repassar(signal.SIGTERM)
+        else:
+            self.repassar(sinal)
+
+    def executar(self) -> None:
+        for sinal in (signal.SIGTERM, signal.SIGINT, SINAL_RECARGA, SINAL_RECARGA_SE_MUDOU):
+            signal.signal(sinal, self._tratar_sinal)
+        for _ in range(self.quantidade):
+            self.iniciar_worker()
+        logger.info("workers_iniciados", extra={"event": "workers_iniciados", "pids": list(self.workers)})
+
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            inicio = self.workers.pop(pid, None)
+            if inicio is None:
+                continue
+            if self.multiproc_dir:
+                from prometheus_client import multiprocess
+                multiprocess.mark_process_dead(pid)
+            if self.parando:
+                continue
+            logger.warning("worker_morreu", extra={"event": "worker_morreu", "pid": pid,
+                                                   "codigo": os.waitstatus_to_exitcode(status)})
+            if time.monotonic() - inicio < VIDA_MINIMA_SEGUNDOS:
+                time.sleep(VIDA_MINIMA_SEGUNDOS)
+            self.iniciar_worker()
+
+
+def preparar_metricas(diretorio: Optional[str]) -> str:
+    """
+    Diretório do modo multiprocesso do Prometheus, limpo. Precisa ser definido
+    antes de qualquer import do prometheus_client (ou seja, antes de importar a API).
+    """
+    diretorio = diretorio or os.getenv("PROMETHEUS_MULTIPROC_DIR") or tempfile.mkdtemp(prefix="metricas-api-")
+    if os.path.isdir(diretorio):
+        for nome in os.listdir(diretorio):
+            if nome.endswith(".db"):
+                os.remove(os.path.join(diretorio, nome))
+    os.makedirs(diretorio, exist_ok=True)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = diretorio
+    return diretorio
+
+
+def abrir_socket(host: str, porta: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, porta))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=WORKERS_PADRAO)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "10000")))
+    parser.add_argument("--metricas-dir", help="Diretório do Prometheus multiprocesso (padrão: um temporário).")
+    args = parser.parse_args(argv)
+
+    if args.workers <= 1 or not hasattr(os, "fork"):
+        import uvicorn
+        uvicorn.run(
+            "api.main:app", host=args.host, port=args.port, log_config=None,
+            proxy_headers=True, forwarded_allow_ips=PROXIES_CONFIAVEIS,
+        )
+        return
+
+    # Diretório temporário de métricas (nem --metricas-dir nem PROMETHEUS_MULTIPROC_DIR) é apagado no fim
+    temporario = args.metricas_dir is None and "PROMETHEUS_MULTIPROC_DIR" not in os.environ
+    multiproc_dir = preparar_metricas(args.metricas_dir)
+    os.environ[VAR_MESTRE] = str(os.getpid())
+
+    import api.main as api_main
+    from api.config_log import configure_logging
+
+    # Tudo que os workers vão ler, carregado antes do fork
+    inicio = time.perf_counter()
+    api_main.gerenciador_catalogo.carregar()
+    if api_main.ML_AQUECER:
+        api_main.modelos.obter()
+    logger.info("catalogo_pre_carregado", extra={"event": "catalogo_pre_carregado",
+                                                 "duracao_ms": round((time.perf_counter() - inicio) * 1000, 2)})
+    # Sem a thread de log no mestre (um fork com ela no meio de uma escrita herdaria a trava presa)
+    configure_logging(assincrono=False)
+    # Objetos da carga fora da coleta de lixo: o GC dos workers não escreve nas
+    # páginas deles, que continuam compartilhadas
+    gc.collect()
+    gc.freeze()
+
+    sock = abrir_socket(args.host, args.port)
+    mestre = Mestre(api_main.app, sock, args.workers, multiproc_dir)
+    # A thread do watchdog só lê o diretório; os workers recriados depois dela não a usam
+    if api_main.CATALOGO_OBSERVAR_ARQUIVO:
+        api_main.gerenciador_catalogo.iniciar_observador(ao_mudar=lambda: mestre.repassar(SINAL_RECARGA_SE_MUDOU))
+    try:
+        mestre.executar()
+    finally:
+        api_main.gerenciador_catalogo.parar_observador()
+        sock.close()
+        if temporario:
+            shutil.rmtree(multiproc_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
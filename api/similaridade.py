@@ -0,0 +1,143 @@
+# api/similaridade.py
+import math
+import threading
+import zlib
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+
+from api.busca_titulos import IndiceTitulos
+from api.compactacao import valores_coluna
+
+K_MAXIMO = 50
+DIMENSOES_TITULO = 32
+TAMANHO_BLOCO = 65_536          # linhas do catálogo por bloco do produto matricial
+PRECOMPUTAR_ATE = 2_000         # catálogos até esse tamanho têm todos os vizinhos calculados na carga
+
+# Peso de cada grupo de features na distância
+PESO_PRECO = 1.0
+PESO_AVALIACAO = 1.0
+PESO_ESTOQUE = 0.5
+PESO_CATEGORIA = 1.5
+PESO_TITULO = 1.0
+
+
+def _padronizar(valores: np.ndarray) -> np.ndarray:
+    desvio = valores.std()
+    return (valores - valores.mean()) / (desvio if desvio > 0 else 1.0)
+
+
+def vetores_titulos(busca: IndiceTitulos, ids: np.ndarray, dimensoes: int = DIMENSOES_TITULO) -> np.ndarray:
+    """
+    Vetor de cada título a partir do índice invertido de tokens: cada token cai
+    numa das `dimensoes` colunas (hashing com sinal), com peso IDF, e cada linha
+    é normalizada (norma 1). Títulos que dividem palavras raras ficam próximos.
+    """
+    n = len(ids)
+    vetores = np.zeros((n, dimensoes), dtype=np.float32)
+    if not n:
+        return vetores
+
+    # ids -> posições das linhas (os ids do catálogo não precisam ser contíguos)
+    ordem = np.argsort(ids, kind="stable")
+    ids_ordenados = ids[ordem]
+
+    listas, colunas, pesos, tamanhos = [], [], [], []
+    for token, ids_token in busca.tokens():
+        codigo = zlib.crc32(token.encode("utf-8"))
+        listas.append(ids_token)
+        colunas.append(codigo % dimensoes)
+        pesos.append((1.0 if codigo & 0x10000 else -1.0) * (math.log((1 + n) / (1 + len(ids_token))) + 1))
+        tamanhos.append(len(ids_token))
+    if not listas:
+        return vetores
+
+    ids_token = np.concatenate(listas)
+    posicoes = ordem[np.searchsorted(ids_ordenados, ids_token)]
+    np.add.at(
+        vetores,
+        (posicoes, np.repeat(np.asarray(colunas), tamanhos)),
+        np.repeat(np.asarray(pesos, dtype=np.float32), tamanhos),
+    )
+    normas = np.linalg.norm(vetores, axis=1, keepdims=True)
+    np.divide(vetores, normas, out=vetores, where=normas > 0)
+    return vetores
+
+
+class IndiceSimilaridade:
+    """
+    Vizinhos mais próximos de cada livro, pela distância euclidiana entre
+    vetores de features: preço, avaliação e estoque padronizados, categoria
+    (mesma categoria = distância 0 nesse componente) e o vetor do título.
+
+    A matriz de features é montada na carga do catálogo. Uma consulta compara o
+    livro com o catálogo inteiro em blocos de `TAMANHO_BLOCO` linhas (um produto
+    matriz-vetor por bloco, com memória temporária limitada) e guarda os
+    `K_MAXIMO` vizinhos do livro num cache LRU; qualquer k menor sai do cache.
+    """
+
+    def __init__(self, dados: pd.DataFrame, busca: IndiceTitulos, tamanho_cache: int = 100_000):
+        self._n = len(dados)
+        ids = dados["id"].to_numpy(dtype=np.int64)
+        numericas = np.column_stack([
+            PESO_PRECO * _padronizar(valores_coluna(dados, "preco")),
+            PESO_AVALIACAO * _padronizar(valores_coluna(dados, "avaliacao")),
+            PESO_ESTOQUE * _padronizar(valores_coluna(dados, "estoque")),
+        ]).astype(np.float32) if self._n else np.zeros((0, 3), dtype=np.float32)
+        self._features = np.hstack([numericas, PESO_TITULO * vetores_titulos(busca, ids)])
+        self._normas = np.einsum("ij,ij->i", self._features, self._features)
+        self._categorias = pd.factorize(dados["categoria"].astype(str))[0].astype(np.int32)
+        # Distância (ao quadrado) entre livros de categorias diferentes, no componente da categoria
+        self._penalidade_categoria = np.float32(2 * PESO_CATEGORIA ** 2)
+
+        self._cache: LRUCache = LRUCache(maxsize=tamanho_cache)
+        self._trava = threading.Lock()
+        if 0 < self._n <= PRECOMPUTAR_ATE:
+            for posicao in range(self._n):
+                self._cache[posicao] = self._calcular(posicao)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def vizinhos(self, posicao: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Os `k` (até K_MAXIMO) livros mais próximos do livro na `posicao`, sem ele mesmo.
+
+        Returns:
+            tuple: Posições dos vizinhos e suas distâncias, da mais próxima à mais distante.
+        """
+        with self._trava:
+            resultado = self._cache.get(posicao)
+        if resultado is None:
+            resultado = self._calcular(posicao)
+            with self._trava:
+                self._cache[posicao] = resultado
+        posicoes, distancias = resultado
+        return posicoes[:k], distancias[:k]
+
+    def _calcular(self, posicao: int) -> Tuple[np.ndarray, np.ndarray]:
+        consulta = self._features[posicao]
+        categoria = self._categorias[posicao]
+        quantidade = min(K_MAXIMO + 1, self._n)  # +1: o próprio livro sai depois
+
+        candidatos, distancias_candidatos = [], []
+        for inicio in range(0, self._n, TAMANHO_BLOCO):
+            fim = min(inicio + TAMANHO_BLOCO, self._n)
+            # |a - b|² = |a|² + |b|² - 2 a·b (+ penalidade se as categorias diferem)
+            distancias = self._normas[inicio:fim] - 2 * (self._features[inicio:fim] @ consulta)
+            distancias += self._penalidade_categoria * (self._categorias[inicio:fim] != categoria)
+            if fim - inicio > quantidade:
+                melhores = np.argpartition(distancias, quantidade - 1)[:quantidade]
+            else:
+                melhores = np.arange(fim - inicio)
+            candidatos.append(melhores + inicio)
+            distancias_candidatos.append(distancias[melhores])
+
+        candidatos = np.concatenate(candidatos)
+        distancias = np.concatenate(distancias_candidatos) + self._normas[posicao]
+        mantidos = candidatos != posicao
+        candidatos, distancias = candidatos[mantidos], distancias[mantidos]
+        ordem = np.lexsort((candidatos, distancias))[:K_MAXIMO]
+        return candidatos[ordem], np.sqrt(np.maximum(distancias[ordem], 0))
@@ -0,0 +1,300 @@
+# api/tarefas_scraping.py
+"""
+Jobs de scraping em segundo plano, coordenados entre os workers do servidor
+pré-fork (api/servidor.py) por arquivos em SCRAPING_JOBS_DIRETORIO:
+
+- `execucao.lock`: trava exclusiva (fcntl.flock) mantida durante todo o
+  scraping. Só um processo por vez roda o scraping; um disparo em outro worker
+  recebe o job em andamento.
+- `<job_id>.json`: o estado de cada job, regravado a cada mudança de status e
+  a cada INTERVALO_GRAVACAO_S durante a execução. Qualquer worker responde
+  GET /scraping/jobs/{id}, não só o que criou o job.
+- `atual`: o id do último job iniciado.
+
+O diretório precisa ser local à máquina: workers em máquinas diferentes não
+se enxergam. Sem fcntl (Windows), vale só a trava dentro do processo.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - sem flock fora do POSIX
+    fcntl = None
+
+from api.instrumentacao import observar, registrar_resultado
+from scripts.webscraping_livros import ProgressoScraping
+
+logger = logging.getLogger("api.scraping")
+
+DIRETORIO_JOBS = os.getenv("SCRAPING_JOBS_DIRETORIO", "data/scraping_jobs")
+# De quanto em quanto tempo o progresso de um job em execução vai para o disco
+INTERVALO_GRAVACAO_S = float(os.getenv("SCRAPING_JOBS_INTERVALO_S", "1"))
+# Quanto esperar, num disparo, que o processo dono da trava registre o job dele
+ESPERA_JOB_OUTRO_PROCESSO_S = 2.0
+
+_FORMATO_ID = re.compile(r"[0-9a-f]{32}")
+
+
+def _agora() -> str:
+    return datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+
+
+def _gravar_atomicamente(caminho: str, conteudo: str):
+    temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        arquivo.write(conteudo)
+    os.replace(temporario, caminho)
+
+
+class TarefaScraping:
+    """Estado de um job de scraping, atualizado pela thread que o executa."""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = "pendente"
+        self.criado_em = _agora()
+        self.iniciado_em: Optional[str] = None
+        self.finalizado_em: Optional[str] = None
+        self.mensagem: Optional[str] = None
+        self.progresso = ProgressoScraping()
+
+    @property
+    def ativa(self) -> bool:
+        return self.status in ("pendente", "executando")
+
+    def para_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "criado_em": self.criado_em,
+            "iniciado_em": self.iniciado_em,
+            "finalizado_em": self.finalizado_em,
+            "mensagem": self.mensagem,
+            "progresso": self.progresso.para_dict(),
+        }
+
+
+class TarefaRegistrada:
+    """Job lido do disco, criado por outro processo (somente leitura)."""
+
+    def __init__(self, dados: dict):
+        self._dados = dados
+        self.id: str = dados["job_id"]
+        self.status: str = dados["status"]
+
+    @property
+    def ativa(self) -> bool:
+        return self.status in ("pendente", "executando")
+
+    def para_dict(self) -> dict:
+        return self._dados
+
+
+Tarefa = Union[TarefaScraping, TarefaRegistrada]
+
+
+class GerenciadorScraping:
+    """
+    Executa o scraping em segundo plano, numa thread própria: não ocupa o event
+    loop nem o pool de threads das requisições, e segue rodando mesmo que o
+    cliente que o disparou desconecte.
+
+    Só uma execução roda por vez, também entre processos (trava em arquivo).
+    Disparos feitos enquanto há uma execução em andamento, neste ou em outro
+    worker, recebem o mesmo job em vez de iniciar outro.
+    """
+
+    def __init__(self, executar: Callable[..., None],
+                 ao_concluir: Optional[Callable[[], None]] = None, max_historico: int = 20,
+                 diretorio: str = DIRETORIO_JOBS):
+        self._executar = executar
+        self._ao_concluir = ao_concluir
+        self._max_historico = max_historico
+        self._diretorio = diretorio
+        self._trava = threading.Lock()
+        self._tarefas: "OrderedDict[str, TarefaScraping]" = OrderedDict()
+        self._atual: Optional[TarefaScraping] = None
+
+    def disparar(self, **opcoes) -> Tuple[Tarefa, bool]:
+        """
+        Inicia um novo job, ou devolve o que já está em andamento (nesse caso
+        `opcoes` é ignorado).
+
+        Args:
+            **opcoes: Repassadas à função de execução junto com o progresso.
+
+        Returns:
+            tuple: O job e um booleano indicando se ele foi criado agora.
+
+        Raises:
+            RuntimeError: Se outro processo segura a trava mas não registrou
+            o job dele a tempo.
+        """
+        with self._trava:
+            if self._atual is not None and self._atual.ativa:
+                return self._atual, False
+
+            limite = time.monotonic() + ESPERA_JOB_OUTRO_PROCESSO_S
+            while True:
+                descritor_trava = self._travar_execucao()
+                if descritor_trava is not None:
+                    break
+                # Outro worker está rodando: devolve o job dele, assim que estiver no disco
+                em_andamento = self._job_de_outro_processo()
+                if em_andamento is not None:
+                    return em_andamento, False
+                if time.monotonic() > limite:
+                    raise RuntimeError("Há um scraping em andamento em outro processo, mas o job dele não foi encontrado.")
+                time.sleep(0.02)
+
+            tarefa = TarefaScraping()
+            self._atual = tarefa
+            self._tarefas[tarefa.id] = tarefa
+            while len(self._tarefas) > self._max_historico:
+                self._tarefas.popitem(last=False)
+            self._gravar(tarefa)
+            self._gravar_atual(tarefa.id)
+            self._podar_historico()
+
+        threading.Thread(
+            target=self._rodar, args=(tarefa, opcoes, descritor_trava), name=f"scraping-{tarefa.id[:8]}", daemon=True
+        ).start()
+        return tarefa, True
+
+    def obter(self, job_id: str) -> Optional[Tarefa]:
+        tarefa = self._tarefas.get(job_id)
+        if tarefa is not None:
+            return tarefa
+        return self._ler(job_id)
+
+    def _rodar(self, tarefa: TarefaScraping, opcoes: dict, descritor_trava: int):
+        tarefa.status = "executando"
+        tarefa.iniciado_em = _agora()
+        self._gravar(tarefa)
+        logger.info("scraping_iniciado", extra={"event": "scraping_iniciado", "job_id": tarefa.id})
+        inicio = time.perf_counter()
+        parar_gravacao = threading.Event()
+        threading.Thread(
+            target=self._gravar_periodicamente, args=(tarefa, parar_gravacao), name=f"scraping-{tarefa.id[:8]}-gravacao",
+            daemon=True,
+        ).start()
+        try:
+            self._executar(tarefa.progresso, **opcoes)
+            tarefa.progresso.encerrar_etapa()  # a recarga do catálogo não conta como "salvando"
+            if self._ao_concluir:
+                self._ao_concluir()
+            tarefa.status = "concluido"
+            tarefa.mensagem = "Scraping executado com sucesso e dados atualizados!"
+        except Exception as e:
+            tarefa.status = "falhou"
+            tarefa.mensagem = f"Erro ao executar o scraping: {str(e)}"
+            logger.exception("scraping_falhou", extra={"event": "scraping_falhou", "job_id": tarefa.id})
+        finally:
+            tarefa.finalizado_em = _agora()
+            self._registrar_metricas(tarefa, time.perf_counter() - inicio)
+            parar_gravacao.set()
+            self._gravar(tarefa)
+            # Só depois do estado final no disco: quem pegar a trava em seguida não vê um job "executando" órfão
+            os.close(descritor_trava)
+            logger.info(
+                "scraping_finalizado",
+                extra={"event": "scraping_finalizado", "job_id": tarefa.id, "status": tarefa.status},
+            )
+
+    @staticmethod
+    def _registrar_metricas(tarefa: TarefaScraping, duracao: float):
+        # As fases são marcadas pelo próprio scraping (ProgressoScraping.definir_etapa);
+        # se ele falhou, a etapa em que parou é fechada aqui
+        tarefa.progresso.encerrar_etapa()
+        for etapa, segundos in tarefa.progresso.duracoes_etapas.items():
+            observar(f"scraping.{etapa}", segundos)
+        observar("scraping.total", duracao)
+        registrar_resultado("scraping", tarefa.progresso.livros_processados)
+
+    # --- coordenação entre processos ---
+
+    def _travar_execucao(self) -> Optional[int]:
+        """
+        Tenta pegar, sem esperar, a trava de execução compartilhada entre os
+        processos. Returns: o descritor que a mantém (fechá-lo a solta), ou None
+        se outro processo a segura.
+        """
+        os.makedirs(self._diretorio, exist_ok=True)
+        descritor = os.open(os.path.join(self._diretorio, "execucao.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is None:
+            return descritor
+        try:
+            fcntl.flock(descritor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(descritor)
+            return None
+        return descritor
+
+    def _execucao_livre(self) -> bool:
+        descritor = self._travar_execucao()
+        if descritor is None:
+            return False
+        os.close(descritor)
+        return True
+
+    def _job_de_outro_processo(self) -> Optional[TarefaRegistrada]:
+        try:
+            with open(os.path.join(self._diretorio, "atual"), encoding="utf-8") as arquivo:
+                job_id = arquivo.read().strip()
+        except FileNotFoundError:
+            return None
+        tarefa = self._ler(job_id, verificar_orfao=False)
+        return tarefa if tarefa is not None and tarefa.ativa else None
+
+    # --- registro em disco ---
+
+    def _caminho(self, job_id: str) -> str:
+        return os.path.join(self._diretorio, f"{job_id}.json")
+
+    def _gravar(self, tarefa: TarefaScraping):
+        try:
+            _gravar_atomicamente(self._caminho(tarefa.id), json.dumps(tarefa.para_dict(), ensure_ascii=False))
+        except OSError:
+            # O job segue rodando; só os outros workers deixam de ver o progresso mais recente
+            logger.exception("scraping_falha_registro", extra={"event": "scraping_falha_registro", "job_id": tarefa.id})
+
+    def _gravar_atual(self, job_id: str):
+        _gravar_atomicamente(os.path.join(self._diretorio, "atual"), job_id)
+
+    def _gravar_periodicamente(self, tarefa: TarefaScraping, parar: threading.Event):
+        while not parar.wait(INTERVALO_GRAVACAO_S):
+            self._gravar(tarefa)
+
+    def _ler(self, job_id: str, verificar_orfao: bool = True) -> Optional[TarefaRegistrada]:
+        # O id vem da URL: só ids no formato gerado aqui viram caminho de arquivo
+        if not _FORMATO_ID.fullmatch(job_id):
+            return None
+        try:
+            with open(self._caminho(job_id), encoding="utf-8") as arquivo:
+                dados = json.load(arquivo)
+        except (FileNotFoundError, ValueError):
+            return None
+        tarefa = TarefaRegistrada(dados)
+        if verificar_orfao and fcntl is not None and tarefa.ativa and self._execucao_livre():
+            # Ativo no disco, mas ninguém segura a trava: o processo que o rodava morreu
+            dados.update(status="falhou", mensagem="Scraping interrompido: o processo que o executava terminou.")
+            tarefa = TarefaRegistrada(dados)
+        return tarefa
+
+    def _podar_historico(self):
+        try:
+            nomes = [nome for nome in os.listdir(self._diretorio) if nome.endswith(".json")]
+            caminhos = sorted((os.path.join(self._diretorio, nome) for nome in nomes), key=os.path.getmtime)
+            for caminho in caminhos[:-self._max_historico]:
+                os.remove(caminho)
+        except OSError:
+            pass
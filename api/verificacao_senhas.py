@@ -0,0 +1,192 @@
+# api/verificacao_senhas.py
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from cachetools import TTLCache
+from passlib.context import CryptContext
+from prometheus_client import Counter, Gauge
+from starlette.concurrency import run_in_threadpool
+
+TRABALHADORES_PADRAO = int(os.getenv("LOGIN_TRABALHADORES", "2"))
+FILA_MAX_PADRAO = int(os.getenv("LOGIN_FILA_MAX", "32"))
+TENTATIVAS_USUARIO_PADRAO = int(os.getenv("LOGIN_TENTATIVAS_USUARIO", "5"))
+TENTATIVAS_IP_PADRAO = int(os.getenv("LOGIN_TENTATIVAS_IP", "20"))
+JANELA_TENTATIVAS_SEGUNDOS = float(os.getenv("LOGIN_JANELA_SEGUNDOS", "60"))
+# Prioridade menor para os workers: com poucos núcleos, o bcrypt cede a CPU às requisições do catálogo
+PRIORIDADE_WORKERS = int(os.getenv("LOGIN_NICE", "10"))
+
+VERIFICACOES_EM_ANDAMENTO = Gauge(
+    "login_verificacoes_em_andamento",
+    "Verificações de senha no pool de processos (rodando + na fila).",
+    multiprocess_mode="livesum",
+)
+VERIFICACOES_CAPACIDADE = Gauge(
+    "login_verificacoes_capacidade",
+    "Máximo de verificações de senha aceitas ao mesmo tempo (workers + fila).",
+    multiprocess_mode="livesum",
+)
+VERIFICACOES_RECUSADAS = Counter(
+    "login_verificacoes_recusadas",
+    "Logins recusados com 503 porque o pool de verificação de senhas estava cheio.",
+)
+TENTATIVAS_BLOQUEADAS = Counter(
+    "login_tentativas_bloqueadas",
+    "Logins recusados com 429 por excesso de tentativas.",
+    ["motivo"],
+)
+
+# Um contexto por processo do pool, criado na primeira verificação
+_contexto_senhas: Optional[CryptContext] = None
+
+
+def _iniciar_worker(prioridade: int) -> None:
+    if prioridade and hasattr(os, "nice"):
+        os.nice(prioridade)
+
+
+def _verificar(senha: str, hash_senha: str) -> bool:
+    """Roda dentro de um processo do pool: bcrypt fora do GIL do servidor."""
+    global _contexto_senhas
+    if _contexto_senhas is None:
+        _contexto_senhas = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _contexto_senhas.verify(senha, hash_senha)
+
+
+class PoolSaturado(Exception):
+    """O pool de verificação já tem `capacidade` verificações em andamento (ou perdeu um worker)."""
+
+
+class VerificadorSenhas:
+    """
+    Verificação de senhas (bcrypt, ~100–300 ms de CPU) num pool dedicado de
+    `trabalhadores` processos, para que uma rajada de logins não ocupe as
+    threads dos endpoints síncronos nem dispute o GIL com o pandas.
+
+    Aceita no máximo `trabalhadores + fila_max` verificações ao mesmo tempo;
+    acima disso `verificar` levanta PoolSaturado na hora, sem enfileirar.
+    Os workers rodam com `nice` (`prioridade`) para que, com poucos núcleos, o
+    bcrypt não tire CPU das outras requisições. Com `trabalhadores=0` a
+    verificação roda no threadpool do servidor, como antes (útil onde não se
+    pode criar processos).
+    """
+
+    def __init__(self, trabalhadores: int = TRABALHADORES_PADRAO, fila_max: int = FILA_MAX_PADRAO,
+                 prioridade: int = PRIORIDADE_WORKERS):
+        self.trabalhadores = trabalhadores
+        self.prioridade = prioridade
+        self.capacidade = max(trabalhadores, 1) + fila_max
+        self._em_andamento = 0
+        self._trava = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        VERIFICACOES_CAPACIDADE.set(self.capacidade)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._trava:
+            if self._executor is None:
+                # spawn: o processo do servidor tem threads (observador, pools), e fork com threads não é seguro
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.trabalhadores, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_iniciar_worker, initargs=(self.prioridade,),
+                )
+            return self._executor
+
+    async def verificar(self, senha: str, hash_senha: str) -> bool:
+        with self._trava:
+            if self._em_andamento >= self.capacidade:
+                VERIFICACOES_RECUSADAS.inc()
+                raise PoolSaturado()
+            self._em_andamento += 1
+            VERIFICACOES_EM_ANDAMENTO.set(self._em_andamento)
+        try:
+            if self.trabalhadores <= 0:
+                return await run_in_threadpool(_verificar, senha, hash_senha)
+            executor = self._pool()
+            try:
+                return await asyncio.wrap_future(executor.submit(_verificar, senha, hash_senha))
+            except BrokenProcessPool:
+                # Um worker morreu: o próximo login cria um pool novo
+                with self._trava:
+                    if self._executor is executor:
+                        self._executor = None
+                raise PoolSaturado()
+        finally:
+            with self._trava:
+                self._em_andamento -= 1
+                VERIFICACOES_EM_ANDAMENTO.set(self._em_andamento)
+
+    def encerrar(self) -> None:
+        with self._trava:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class LimitadorTentativas:
+    """
+    Limita as tentativas de login que falham, por usuário e por IP, numa janela
+    fixa de `janela_segundos`. Cada tentativa é reservada nos dois contadores
+    antes da verificação da senha, para que uma rajada de chutes simultâneos
+    não passe do limite enquanto o bcrypt roda. Um login bem-sucedido devolve a
+    reserva do IP e zera o contador do usuário, então logins legítimos vindos
+    do mesmo IP (atrás de um proxy ou NAT) não se bloqueiam. As contagens vivem
+    em TTLCaches limitados, então chaves antigas somem sozinhas.
+    """
+
+    def __init__(self, por_usuario: int = TENTATIVAS_USUARIO_PADRAO, por_ip: int = TENTATIVAS_IP_PADRAO,
+                 janela_segundos: float = JANELA_TENTATIVAS_SEGUNDOS, max_chaves: int = 100_000):
+        self.limites = {"usuario": por_usuario, "ip": por_ip}
+        self.janela = janela_segundos
+        self._contagens = {
+            "usuario": TTLCache(maxsize=max_chaves, ttl=janela_segundos),
+            "ip": TTLCache(maxsize=max_chaves, ttl=janela_segundos),
+        }
+        self._trava = threading.Lock()
+
+    def registrar(self, usuario: str, ip: str) -> Optional[float]:
+        """
+        Reserva uma tentativa (ver `sucesso` e `cancelar`). Se o usuário ou o IP
+        já passou do limite, não conta e retorna quantos segundos esperar; senão
+        retorna None.
+        """
+        agora = time.monotonic()
+        contagens = {}
+        with self._trava:
+            for motivo, chave in (("usuario", usuario), ("ip", ip)):
+                inicio, quantidade = self._contagens[motivo].get(chave, (agora, 0))
+                if agora - inicio >= self.janela:  # a janela dessa chave já acabou
+                    inicio, quantidade = agora, 0
+                if quantidade >= self.limites[motivo]:
+                    TENTATIVAS_BLOQUEADAS.labels(motivo=motivo).inc()
+                    return max(self.janela - (agora - inicio), 1.0)
+                contagens[motivo, chave] = (inicio, quantidade + 1)
+            for (motivo, chave), contagem in contagens.items():
+                self._contagens[motivo][chave] = contagem
+        return None
+
+    def sucesso(self, usuario: str, ip: str) -> None:
+        """Login aceito: a tentativa não conta para o IP, e o contador do usuário volta a zero."""
+        with self._trava:
+            self._contagens["usuario"].pop(usuario, None)
+            self._devolver("ip", ip)
+
+    def cancelar(self, usuario: str, ip: str) -> None:
+        """Devolve uma tentativa cuja senha nem chegou a ser verificada (ex.: pool saturado)."""
+        with self._trava:
+            self._devolver("usuario", usuario)
+            self._devolver("ip", ip)
+
+    def _devolver(self, motivo: str, chave: str) -> None:
+        contagem = self._contagens[motivo].get(chave)
+        if contagem is None:
+            return
+        inicio, quantidade = contagem
+        if quantidade <= 1:
+            del self._contagens[motivo][chave]
+        else:
+            self._contagens[motivo][chave] = (inicio, quantidade - 1)
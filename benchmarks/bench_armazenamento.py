@@ -0,0 +1,109 @@
+# benchmarks/bench_armazenamento.py
+"""
+Compara o carregamento do catálogo a partir do CSV com o carregamento a partir
+do Arrow por memory-map (scripts/armazenamento_livros.py): tempo de leitura e
+memória (RSS) de um processo novo, como na subida de um worker do uvicorn.
+
+A memória é separada em anônima (privada de cada processo) e mapeada de
+arquivo (páginas do Arrow, compartilhadas entre processos que leem o mesmo
+arquivo). Os números de RSS vêm de /proc e só estão disponíveis no Linux.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_armazenamento
+    python -m benchmarks.bench_armazenamento --tamanhos 10000 100000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.dados_sinteticos import salvar_csv
+
+
+def ler_memoria() -> dict:
+    """RSS total, anônimo e mapeado de arquivo do processo atual, em MB."""
+    campos = {"VmRSS": "rss", "RssAnon": "anonima", "RssFile": "arquivo"}
+    memoria = {}
+    try:
+        with open("/proc/self/status") as arquivo:
+            for linha in arquivo:
+                chave, _, valor = linha.partition(":")
+                if chave in campos:
+                    memoria[campos[chave]] = int(valor.split()[0]) / 1024
+    except FileNotFoundError:
+        pass
+    return memoria
+
+
+def medir_carregamento(caminho_csv: str) -> dict:
+    """Carrega o catálogo como a API faz na subida e mede tempo e memória."""
+    from api.catalogo import carregar_dados_livros
+
+    antes = ler_memoria()
+    inicio = time.perf_counter()
+    dados = carregar_dados_livros(caminho_csv)
+    carga_ms = (time.perf_counter() - inicio) * 1000
+    depois = ler_memoria()
+    return {
+        "linhas": len(dados),
+        "carga_ms": carga_ms,
+        **{f"{chave}_mb": depois[chave] - antes.get(chave, 0) for chave in depois},
+    }
+
+
+def medir_em_processo_novo(caminho_csv: str) -> dict:
+    """Roda `medir_carregamento` num interpretador novo (sem páginas já em cache no processo)."""
+    saida = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_armazenamento", "--interno", caminho_csv],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def preparar_arquivos(diretorio: str, tamanho: int):
+    """Cria um diretório só com o CSV e outro só com o Arrow gerado a partir dele."""
+    from scripts.armazenamento_livros import caminho_colunar, salvar_livros
+    import pandas as pd
+
+    pasta_csv = os.path.join(diretorio, "csv")
+    pasta_arrow = os.path.join(diretorio, "arrow")
+    os.makedirs(pasta_csv)
+    os.makedirs(pasta_arrow)
+
+    caminho_csv = salvar_csv(tamanho, os.path.join(pasta_csv, "info_livros.csv"))
+    caminho_arrow_csv = os.path.join(pasta_arrow, "info_livros.csv")
+    salvar_livros(pd.read_csv(caminho_csv, sep=";"), caminho_arrow_csv)
+    os.remove(caminho_arrow_csv)  # sem o CSV ao lado, o carregador usa o Arrow
+    return caminho_csv, caminho_arrow_csv, os.path.getsize(caminho_colunar(caminho_arrow_csv))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--interno", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno:
+        print(json.dumps(medir_carregamento(args.interno)))
+        return
+
+    print(f"{'linhas':>9} | {'formato':>7} | {'arquivo_mb':>10} | {'carga_ms':>9} | "
+          f"{'rss_mb':>7} | {'anonima_mb':>10} | {'arquivo_rss_mb':>14}")
+    for tamanho in args.tamanhos:
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho_csv, caminho_arrow, tamanho_arrow = preparar_arquivos(diretorio, tamanho)
+            for formato, caminho, tamanho_arquivo in (
+                ("csv", caminho_csv, os.path.getsize(caminho_csv)),
+                ("arrow", caminho_arrow, tamanho_arrow),
+            ):
+                r = medir_em_processo_novo(caminho)
+                assert r["linhas"] == tamanho
+                print(f"{tamanho:>9} | {formato:>7} | {tamanho_arquivo / 2**20:>10.1f} | {r['carga_ms']:>9.1f} | "
+                      f"{r.get('rss_mb', 0):>7.1f} | {r.get('anonima_mb', 0):>10.1f} | {r.get('arquivo_mb', 0):>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/bench_autenticacao.py
+"""
+Teste de carga de /api/v1/auth/refresh, o endpoint autenticado mais simples:
+compara a vazão com o cache de usuários autenticados de api/auth.py
+desligado (uma consulta ao SQLite por requisição, como antes) e ligado
+(o banco só é consultado na primeira vez que o token aparece).
+
+As requisições vão direto para o app ASGI (sem rede), várias ao mesmo tempo,
+todas com o mesmo token de um usuário de database/users.db.
+
+Uso (a partir da raiz do projeto, com o banco criado por database/init_db.py):
+    python -m benchmarks.bench_autenticacao
+    python -m benchmarks.bench_autenticacao --requisicoes 5000 --concorrencia 64 --usuario admin
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+import httpx
+import numpy as np
+from cachetools import TTLCache
+
+os.environ.setdefault("CATALOGO_OBSERVAR_ARQUIVO", "0")
+
+import api.auth as auth  # noqa: E402
+from api.main import app  # noqa: E402
+
+
+async def disparar(token: str, requisicoes: int, concorrencia: int) -> dict:
+    limite = asyncio.Semaphore(concorrencia)
+    latencias = []
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+        cabecalhos = {"Authorization": f"Bearer {token}"}
+
+        async def requisicao():
+            async with limite:
+                inicio = time.perf_counter()
+                resposta = await cliente.post("/api/v1/auth/refresh", headers=cabecalhos)
+                latencias.append((time.perf_counter() - inicio) * 1000)
+                assert resposta.status_code == 200, resposta.text
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(requisicao() for _ in range(requisicoes)))
+        duracao = time.perf_counter() - inicio
+    return {
+        "req_por_s": requisicoes / duracao,
+        "p50_ms": float(np.percentile(latencias, 50)),
+        "p99_ms": float(np.percentile(latencias, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requisicoes", type=int, default=2000)
+    parser.add_argument("--concorrencia", type=int, default=32)
+    parser.add_argument("--usuario", default="admin")
+    args = parser.parse_args()
+
+    db = auth.SessionLocal()
+    try:
+        user = auth.get_user_by_username(db, args.usuario)
+    finally:
+        db.close()
+    if user is None:
+        raise SystemExit(f"Usuário '{args.usuario}' não existe; rode database/init_db.py antes.")
+    token = auth.create_access_token(auth.claims_usuario(user))
+    # O log de cada requisição (stdout) pesaria igual nos dois cenários e esconderia a diferença
+    logging.getLogger("api").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    print(f"{args.requisicoes} requisições a /auth/refresh, {args.concorrencia} simultâneas")
+    print(f"{'cache':>9} | {'req/s':>8} | {'p50_ms':>7} | {'p99_ms':>7}")
+    cenarios = {
+        "desligado": TTLCache(maxsize=1, ttl=0),  # toda entrada expira na hora: sempre consulta o banco
+        "ligado": TTLCache(maxsize=auth.AUTH_CACHE_MAX, ttl=auth.AUTH_CACHE_TTL_SEGUNDOS),
+    }
+    for nome, cache in cenarios.items():
+        auth._usuarios_cache = cache
+        asyncio.run(disparar(token, 50, args.concorrencia))  # aquecimento
+        r = asyncio.run(disparar(token, args.requisicoes, args.concorrencia))
+        print(f"{nome:>9} | {r['req_por_s']:>8.0f} | {r['p50_ms']:>7.2f} | {r['p99_ms']:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
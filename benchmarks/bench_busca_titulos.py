@@ -0,0 +1,63 @@
+# benchmarks/bench_busca_titulos.py
+"""
+Compara a busca por título com `str.contains` do pandas (varredura completa,
+como o antigo `search_livros`) com a busca no IndiceTitulos. Mede também o
+tempo de construção do índice e o de uma atualização incremental com 1% dos
+títulos alterados.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_busca_titulos
+    python -m benchmarks.bench_busca_titulos --tamanhos 10000 100000
+"""
+import argparse
+import time
+
+from api.busca_titulos import IndiceTitulos
+from benchmarks.bench_indice_catalogo import cronometrar
+from benchmarks.dados_sinteticos import gerar_livros, preparar_livros
+
+CONSULTAS = ["light", "little life", "sonn", "attic 12", "zzz"]
+
+
+def rodar(tamanho: int, repeticoes: int = 20) -> dict:
+    dados = preparar_livros(gerar_livros(tamanho))
+    titulos = dict(zip(dados["id"].tolist(), dados["titulo"].tolist()))
+
+    inicio = time.perf_counter()
+    indice = IndiceTitulos(titulos)
+    construcao_ms = (time.perf_counter() - inicio) * 1000
+
+    alterados = dict(titulos)
+    for id_livro in range(0, tamanho, 100):
+        alterados[id_livro] = titulos[id_livro] + " revised edition"
+    inicio = time.perf_counter()
+    indice.atualizado(alterados)
+    atualizacao_ms = (time.perf_counter() - inicio) * 1000
+
+    resultado = {"tamanho": tamanho, "construcao_ms": construcao_ms, "atualizacao_1pct_ms": atualizacao_ms}
+    for consulta in CONSULTAS:
+        resultado[f"pandas_ms[{consulta}]"] = cronometrar(
+            lambda: dados[dados["titulo"].str.contains(consulta, case=False, na=False)], 3
+        ) / 1000
+        # Primeira página de 20 resultados, como faria um cliente paginado
+        resultado[f"indice_ms[{consulta}]"] = cronometrar(
+            lambda: indice.buscar(consulta, limite=20), repeticoes
+        ) / 1000
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for tamanho in args.tamanhos:
+        resultado = rodar(tamanho)
+        print(f"--- {tamanho} livros ---")
+        for chave, valor in resultado.items():
+            if chave != "tamanho":
+                print(f"{chave:>28}: {valor:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/bench_consultas.py
+"""
+Carga mista de consultas com filtros combinados: compara o MotorConsultas
+(api/consulta_livros.py) com a mesma consulta feita com máscaras booleanas e
+`sort_values` do pandas sobre o catálogo inteiro, e confere que os dois
+devolvem as mesmas páginas.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_consultas
+    python -m benchmarks.bench_consultas --tamanhos 100000 --repeticoes 20
+"""
+import argparse
+
+import numpy as np
+
+from api.busca_titulos import IndiceTitulos
+from api.consulta_livros import ConsultaLivros, MotorConsultas
+from api.indice_catalogo import IndiceCatalogo
+from api.serializacao import validar_esquema
+from benchmarks.bench_indice_catalogo import cronometrar
+from benchmarks.dados_sinteticos import gerar_livros, preparar_livros
+from models.book_models import Book
+
+CARGA = {
+    "categoria+preco": ConsultaLivros(categorias=("poetry", "travel"), preco_min=20, preco_max=30, limite=20),
+    "faixa estreita+disp.": ConsultaLivros(preco_min=30, preco_max=30.2, disponivel=True, limite=20),
+    "top avaliados caros": ConsultaLivros(preco_min=40, ordenacao=(("avaliacao", True), ("preco", False)), limite=20),
+    "estoque+nota, pág. 5": ConsultaLivros(estoque_min=10, avaliacao_min=4, limite=20, deslocamento=80),
+    "mais baratos": ConsultaLivros(ordenacao=(("preco", False),), limite=20),
+    "categoria por título": ConsultaLivros(categorias=("fantasy",), ordenacao=(("titulo", False),), limite=20),
+    "título+nota": ConsultaLivros(titulo="little", avaliacao_min=3, limite=20),
+    "título+faixa estreita": ConsultaLivros(titulo="little", preco_min=30, preco_max=30.2, limite=20),
+}
+
+
+def consulta_pandas(dados, consulta: ConsultaLivros):
+    """A consulta feita do jeito direto: máscaras sobre todas as linhas, ordenação completa e fatia."""
+    mascara = np.ones(len(dados), dtype=bool)
+    if consulta.titulo:
+        mascara &= dados["titulo"].str.lower().str.contains(consulta.titulo.lower(), regex=False)
+    if consulta.categorias:
+        categoria = dados["categoria"].str.lower()
+        mascara &= np.logical_or.reduce([categoria.str.contains(t, regex=False) for t in consulta.categorias])
+    if consulta.preco_min is not None:
+        mascara &= dados["preco"] >= consulta.preco_min
+    if consulta.preco_max is not None:
+        mascara &= dados["preco"] <= consulta.preco_max
+    if consulta.avaliacao_min is not None:
+        mascara &= dados["avaliacao"] >= consulta.avaliacao_min
+    if consulta.avaliacao_max is not None:
+        mascara &= dados["avaliacao"] <= consulta.avaliacao_max
+    if consulta.disponivel is not None:
+        mascara &= dados["disponibilidade"] == consulta.disponivel
+    if consulta.estoque_min is not None:
+        mascara &= dados["estoque"] >= consulta.estoque_min
+    resultado = dados[mascara]
+    if consulta.ordenacao:
+        campos = [campo for campo, _ in consulta.ordenacao] + ["id"]
+        crescente = [not decrescente for _, decrescente in consulta.ordenacao] + [True]
+        resultado = resultado.sort_values(campos, ascending=crescente, kind="stable")
+    fim = None if consulta.limite is None else consulta.deslocamento + consulta.limite
+    return resultado.iloc[consulta.deslocamento:fim]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeticoes", type=int, default=10)
+    args = parser.parse_args()
+
+    for tamanho in args.tamanhos:
+        dados = validar_esquema(preparar_livros(gerar_livros(tamanho)), Book)
+        indice = IndiceCatalogo(dados)
+        busca = IndiceTitulos(dict(zip(dados["id"].tolist(), dados["titulo"].tolist())))
+        motor = MotorConsultas(dados, indice, busca)
+
+        print(f"\n{tamanho} livros")
+        print(f"{'consulta':>22} | {'plano':>30} | {'pandas_ms':>9} | {'motor_ms':>8} | {'ganho':>6}")
+        for nome, consulta in CARGA.items():
+            posicoes, _, plano = motor.executar(consulta)
+            if consulta.titulo is None:  # a busca por título ordena por relevância, que o pandas não reproduz
+                esperado = consulta_pandas(dados, consulta)["id"].tolist()
+                assert dados["id"].to_numpy()[posicoes].tolist() == esperado, nome
+            lento = cronometrar(lambda: consulta_pandas(dados, consulta), args.repeticoes) / 1000
+            rapido = cronometrar(lambda: motor.executar(consulta), args.repeticoes) / 1000
+            print(f"{nome:>22} | {plano.descrever():>30} | {lento:>9.2f} | {rapido:>8.3f} | {lento / rapido:>5.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# benchmarks/bench_escalabilidade.py
+"""
+Vazão da API com 1, 2, 4 e 8 workers (api/servidor.py): para cada quantidade,
+sobe o servidor num processo novo, espera /api/v1/health/ready e dispara uma
+mistura de leituras do catálogo (página, busca, top-rated, livro por id e
+similares) por alguns segundos, a partir de processos clientes separados.
+
+Também mostra a memória do conjunto de processos: o RSS somado conta as
+páginas compartilhadas (catálogo carregado antes do fork) uma vez por worker;
+o PSS divide cada página compartilhada entre os processos que a usam, então é
+o custo real. RSS/PSS vêm de /proc e só estão disponíveis no Linux.
+
+Com menos núcleos que workers, a vazão para de crescer: o número de núcleos
+da máquina aparece no cabeçalho do resultado.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_escalabilidade
+    python -m benchmarks.bench_escalabilidade --workers 1 2 4 --duracao 10 --clientes 4 --concorrencia 32
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+import numpy as np
+
+from benchmarks.bench_inicializacao import ambiente, porta_livre
+
+ROTAS = [
+    "/api/v1/books?limit=20&offset=100",
+    "/api/v1/books/search?category=Poetry&max_price=40&limit=20",
+    "/api/v1/books/top-rated?quantidade=10",
+    "/api/v1/books/7",
+    "/api/v1/books/7/similar?k=10",
+]
+
+
+async def _disparar(base_url: str, duracao: float, concorrencia: int) -> list:
+    latencias = []
+    fim = time.perf_counter() + duracao
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as cliente:
+        async def usuario(indice: int):
+            while time.perf_counter() < fim:
+                rota = ROTAS[indice % len(ROTAS)]
+                indice += 1
+                inicio = time.perf_counter()
+                resposta = await cliente.get(rota)
+                latencias.append((time.perf_counter() - inicio) * 1000)
+                assert resposta.status_code == 200, (rota, resposta.status_code)
+
+        await asyncio.gather(*(usuario(i) for i in range(concorrencia)))
+    return latencias
+
+
+def disparar(base_url: str, duracao: float, concorrencia: int) -> list:
+    """Roda num processo cliente: `concorrencia` requisições simultâneas durante `duracao` segundos."""
+    return asyncio.run(_disparar(base_url, duracao, concorrencia))
+
+
+def memoria_kb(pid: int) -> dict:
+    """RSS e PSS (kB) do processo e dos filhos diretos dele (os workers)."""
+    total = {"rss": 0, "pss": 0}
+    try:
+        filhos = subprocess.run(["pgrep", "-P", str(pid)], capture_output=True, text=True).stdout.split()
+    except FileNotFoundError:
+        filhos = []
+    for processo in [str(pid), *filhos]:
+        try:
+            with open(f"/proc/{processo}/smaps_rollup") as arquivo:
+                for linha in arquivo:
+                    chave, _, valor = linha.partition(":")
+                    if chave in ("Rss", "Pss"):
+                        total[chave.lower()] += int(valor.split()[0])
+        except (FileNotFoundError, PermissionError):
+            pass
+    return total
+
+
+def esperar_pronto(base_url: str, limite_s: float = 120) -> None:
+    inicio = time.perf_counter()
+    while time.perf_counter() - inicio < limite_s:
+        try:
+            if httpx.get(f"{base_url}/api/v1/health/ready", timeout=1).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    raise TimeoutError("a API não ficou pronta")
+
+
+def medir(workers: int, duracao: float, clientes: int, concorrencia: int) -> dict:
+    porta = porta_livre()
+    base_url = f"http://127.0.0.1:{porta}"
+    servidor = subprocess.Popen(
+        [sys.executable, "-m", "api.servidor", "--workers", str(workers), "--host", "127.0.0.1", "--port", str(porta)],
+        env=ambiente(ML_AQUECER="0"), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        esperar_pronto(base_url)
+        disparar(base_url, 1.0, concorrencia)  # aquecimento
+        with ProcessPoolExecutor(max_workers=clientes) as pool:
+            inicio = time.perf_counter()
+            partes = list(pool.map(disparar, [base_url] * clientes, [duracao] * clientes, [concorrencia] * clientes))
+            decorrido = time.perf_counter() - inicio
+        latencias = np.concatenate([np.asarray(parte) for parte in partes])
+        return {
+            "req_por_s": len(latencias) / decorrido,
+            "p50_ms": float(np.percentile(latencias, 50)),
+            "p99_ms": float(np.percentile(latencias, 99)),
+            **memoria_kb(servidor.pid),
+        }
+    finally:
+        servidor.terminate()
+        servidor.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--duracao", type=float, default=5.0, help="Segundos de carga por medição.")
+    parser.add_argument("--clientes", type=int, default=2, help="Processos gerando carga.")
+    parser.add_argument("--concorrencia", type=int, default=16, help="Requisições simultâneas por cliente.")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} núcleos | {args.clientes} clientes x {args.concorrencia} simultâneas | "
+          f"{args.duracao:.0f}s por medição")
+    print(f"{'workers':>7} | {'req/s':>8} | {'p50_ms':>7} | {'p99_ms':>7} | {'RSS_MB':>7} | {'PSS_MB':>7}")
+    for workers in args.workers:
+        r = medir(workers, args.duracao, args.clientes, args.concorrencia)
+        print(f"{workers:>7} | {r['req_por_s']:>8.1f} | {r['p50_ms']:>7.1f} | {r['p99_ms']:>7.1f} | "
+              f"{r['rss'] / 1024:>7.0f} | {r['pss'] / 1024:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
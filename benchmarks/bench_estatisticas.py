@@ -0,0 +1,79 @@
+# benchmarks/bench_estatisticas.py
+"""
+Custo das estatísticas de /stats/overview e /stats/categories numa recarga
+do catálogo: o `groupby` completo usado antes, a reconstrução completa dos
+acumuladores (EstatisticasCatalogo.de_dados) e a atualização incremental a
+partir da versão anterior (EstatisticasCatalogo.atualizado), com uma fração
+das linhas alterada. Confere também que os três dão o mesmo resultado e mede
+/stats/distribution, gerada sob demanda uma vez por versão.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_estatisticas
+    python -m benchmarks.bench_estatisticas --tamanhos 1000000 --alterados 0.001
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from api.estatisticas import EstatisticasCatalogo
+from benchmarks.bench_indice_catalogo import cronometrar
+from benchmarks.dados_sinteticos import gerar_livros, preparar_livros
+
+
+def stats_groupby(dados: pd.DataFrame) -> list:
+    """As estatísticas por categoria do jeito anterior: um groupby sobre o catálogo inteiro."""
+    stats = dados.groupby("categoria").agg(
+        total_livros=("titulo", "count"),
+        preco_medio=("preco", "mean"),
+        avaliacao_media=("avaliacao", "mean"),
+        estoque_total=("estoque", "sum"),
+    ).reset_index()
+    stats["preco_medio"] = stats["preco_medio"].round(2)
+    stats["avaliacao_media"] = stats["avaliacao_media"].round(2)
+    stats["estoque_total"] = stats["estoque_total"].astype(int)
+    return stats.to_dict(orient="records")
+
+
+def alterar(dados: pd.DataFrame, fracao: float, semente: int = 0) -> pd.DataFrame:
+    """Nova versão do catálogo com `fracao` das linhas com preço, nota ou estoque diferentes."""
+    rng = np.random.default_rng(semente)
+    novos = dados.copy()
+    linhas = rng.choice(len(novos), size=max(1, int(len(novos) * fracao)), replace=False)
+    novos.loc[linhas, "preco"] = np.round(rng.uniform(10, 60, len(linhas)), 2)
+    novos.loc[linhas, "avaliacao"] = rng.integers(1, 6, len(linhas)).astype(float)
+    novos.loc[linhas, "estoque"] = rng.integers(0, 25, len(linhas))
+    return novos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--alterados", type=float, default=0.01, help="fração das linhas alterada na recarga")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'livros':>9} | {'groupby_ms':>10} | {'completo_ms':>11} | {'incremental_ms':>14} | {'distribuicao_ms':>15}")
+    for tamanho in args.tamanhos:
+        antigos = preparar_livros(gerar_livros(tamanho))
+        novos = alterar(antigos, args.alterados)
+        # A ordem de preços vem pronta do IndiceCatalogo em cada versão do catálogo
+        ordem_antiga = np.argsort(antigos["preco"].to_numpy(), kind="stable")
+        ordem_nova = np.argsort(novos["preco"].to_numpy(), kind="stable")
+        anterior = EstatisticasCatalogo.de_dados(antigos, ordem_antiga)
+
+        incremental = anterior.atualizado(antigos, novos, ordem_nova)
+        completo = EstatisticasCatalogo.de_dados(novos, ordem_nova)
+        assert incremental.por_categoria() == completo.por_categoria() == stats_groupby(novos)
+        assert incremental.distribuicao() == completo.distribuicao()
+
+        groupby_ms = cronometrar(lambda: stats_groupby(novos), args.repeticoes) / 1000
+        completo_ms = cronometrar(lambda: EstatisticasCatalogo.de_dados(novos, ordem_nova), args.repeticoes) / 1000
+        incremental_ms = cronometrar(lambda: anterior.atualizado(antigos, novos, ordem_nova), args.repeticoes) / 1000
+        # Percentis e histogramas, gerados na primeira requisição de /stats/distribution da versão
+        distribuicao_ms = cronometrar(incremental.distribuicao, args.repeticoes) / 1000
+        print(f"{tamanho:>9} | {groupby_ms:>10.1f} | {completo_ms:>11.1f} | {incremental_ms:>14.1f} | {distribuicao_ms:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
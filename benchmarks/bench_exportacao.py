@@ -0,0 +1,95 @@
+# benchmarks/bench_exportacao.py
+"""
+Mede pico de memória (tracemalloc) e latência da exportação do catálogo
+completo em dois caminhos:
+
+- lista JSON: `to_dict(orient="records")` + validação em `List[Book]` +
+  codificação JSON, como o FastAPI faz com o `response_model`;
+- NDJSON em streaming: consumo do gerador de `api.paginacao.gerar_ndjson`;
+- NDJSON pelo endpoint: `get_livros` de api/main.py com `Accept:
+  application/x-ndjson` sobre o catálogo carregado (compacto, com o recorte
+  da paginação), consumindo o corpo da StreamingResponse. É o caminho real
+  das requisições, e o pico dele deve ficar no mesmo patamar do gerador.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_exportacao
+    python -m benchmarks.bench_exportacao --tamanhos 10000 100000
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import List
+
+from pydantic import TypeAdapter
+from starlette.requests import Request
+
+os.environ.setdefault("CATALOGO_OBSERVAR_ARQUIVO", "0")
+os.environ.setdefault("LOG_AMOSTRA_2XX", "0")
+
+from api.paginacao import MEDIA_TYPE_NDJSON, gerar_ndjson
+from benchmarks.dados_sinteticos import gerar_livros, preparar_livros, salvar_csv
+from models.book_models import Book
+
+
+def exportar_lista_json(dados) -> int:
+    adaptador = TypeAdapter(List[Book])
+    registros = adaptador.dump_python(adaptador.validate_python(dados.to_dict(orient="records")), mode="json")
+    return len(json.dumps(registros, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def exportar_ndjson(dados) -> int:
+    # Simula o envio: cada bloco é descartado depois de "escrito" no socket
+    return sum(len(bloco) for bloco in gerar_ndjson(dados))
+
+
+def exportar_endpoint(api_main) -> int:
+    request = Request({"type": "http", "method": "GET", "path": "/api/v1/books", "query_string": b"",
+                       "headers": [(b"accept", MEDIA_TYPE_NDJSON.encode())]})
+    resposta = api_main.get_livros(request, None, 0, None)
+
+    async def consumir() -> int:
+        # A StreamingResponse entrega o gerador como iterador assíncrono
+        return sum([len(bloco) async for bloco in resposta.body_iterator])
+    return asyncio.run(consumir())
+
+
+def medir(funcao, dados) -> dict:
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    tamanho_bytes = funcao(dados)
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"latencia_ms": duracao * 1000, "pico_mb": pico / 2**20, "corpo_mb": tamanho_bytes / 2**20}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    import api.main as api_main
+    from api.catalogo import GerenciadorCatalogo
+
+    print(f"{'tamanho':>10} | {'caminho':>10} | {'latencia_ms':>12} | {'pico_mb':>9} | {'corpo_mb':>9}")
+    for tamanho in args.tamanhos:
+        dados = preparar_livros(gerar_livros(tamanho))
+        for nome, funcao in (("lista", exportar_lista_json), ("ndjson", exportar_ndjson)):
+            r = medir(funcao, dados)
+            print(f"{tamanho:>10} | {nome:>10} | {r['latencia_ms']:>12.1f} | {r['pico_mb']:>9.1f} | {r['corpo_mb']:>9.1f}")
+
+        with tempfile.TemporaryDirectory(prefix="exportacao-") as diretorio:
+            api_main.gerenciador_catalogo = GerenciadorCatalogo(
+                salvar_csv(tamanho, os.path.join(diretorio, "info_livros.csv"))
+            )
+            api_main.gerenciador_catalogo.carregar()
+            r = medir(exportar_endpoint, api_main)
+            print(f"{tamanho:>10} | {'endpoint':>10} | {r['latencia_ms']:>12.1f} | {r['pico_mb']:>9.1f} | {r['corpo_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/bench_indice_catalogo.py
+"""
+Compara as buscas por id, faixa de preço e categoria feitas com máscaras
+booleanas do pandas (varredura completa) com as feitas pelo IndiceCatalogo.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_indice_catalogo
+    python -m benchmarks.bench_indice_catalogo --tamanhos 10000 100000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from api.indice_catalogo import IndiceCatalogo
+from benchmarks.dados_sinteticos import gerar_livros, preparar_livros
+
+
+def cronometrar(funcao, repeticoes: int) -> float:
+    """Executa `funcao` `repeticoes` vezes e retorna o tempo médio em microssegundos."""
+
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1e6
+
+
+def rodar(tamanho: int, repeticoes: int = 50) -> dict:
+    dados = preparar_livros(gerar_livros(tamanho))
+    inicio = time.perf_counter()
+    indice = IndiceCatalogo(dados)
+    construcao_ms = (time.perf_counter() - inicio) * 1000
+
+    rng = np.random.default_rng(0)
+    ids = rng.integers(0, tamanho, size=repeticoes)
+    it_pandas, it_indice = iter(ids.tolist()), iter(ids.tolist())
+
+    # Faixa estreita de preço (~0,2% do catálogo): o custo do índice deve
+    # depender do tamanho da resposta, não do catálogo.
+    min_preco, max_preco = 30.0, 30.1
+
+    return {
+        "tamanho": tamanho,
+        "construcao_ms": construcao_ms,
+        "id_pandas_us": cronometrar(lambda: dados[dados["id"] == next(it_pandas)], repeticoes),
+        "id_indice_us": cronometrar(lambda: indice.posicao_por_id(next(it_indice)), repeticoes),
+        "preco_pandas_us": cronometrar(
+            lambda: dados[(dados["preco"] >= min_preco) & (dados["preco"] <= max_preco)], repeticoes
+        ),
+        "preco_indice_us": cronometrar(
+            lambda: indice.posicoes_por_faixa_preco(min_preco, max_preco), repeticoes
+        ),
+        "categoria_pandas_us": cronometrar(
+            lambda: dados[dados["categoria"].str.contains("poetry", case=False, na=False)], 5
+        ),
+        "categoria_indice_us": cronometrar(lambda: indice.posicoes_por_categoria("poetry"), repeticoes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    colunas = [
+        "tamanho", "construcao_ms", "id_pandas_us", "id_indice_us", "preco_pandas_us",
+        "preco_indice_us", "categoria_pandas_us", "categoria_indice_us",
+    ]
+    print(" | ".join(f"{c:>19}" for c in colunas))
+    for tamanho in args.tamanhos:
+        resultado = rodar(tamanho)
+        print(" | ".join(f"{resultado[c]:>19.1f}" if c != "tamanho" else f"{resultado[c]:>19}" for c in colunas))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/bench_inferencia.py
+"""
+Mede vazão e latência do MotorInferencia (api/inferencia.py) com diferentes
+tamanhos máximos de micro-lote: muitas requisições simultâneas de um livro
+cada, como clientes independentes chamando /api/v1/ml/predictions.
+
+Com `--max-lote 1` cada requisição vira uma chamada do modelo; com lotes
+maiores as requisições que chegam juntas dividem uma chamada vetorizada.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_inferencia
+    python -m benchmarks.bench_inferencia --requisicoes 8192 --concorrencia 1024
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+
+from api.inferencia import ServicoModelos
+from benchmarks.dados_sinteticos import gerar_livros
+from scripts.treinar_modelo import COLUNAS_POR_ALVO, treinar_modelos
+
+
+def features_sinteticas(quantidade: int) -> pd.DataFrame:
+    livros = gerar_livros(quantidade)
+    return pd.DataFrame({
+        "preco": livros["preco"],
+        "avaliacao": livros["avaliacao"],
+        "estoque": livros["estoque"],
+        "disponibilidade": 1,
+        "categoria_codificada": pd.Categorical(livros["categoria"]).codes.astype(np.int64),
+    })
+
+
+def percentil(valores, p: float) -> float:
+    return float(np.percentile(valores, p))
+
+
+async def disparar(servico: ServicoModelos, entradas: np.ndarray, concorrencia: int) -> dict:
+    limite = asyncio.Semaphore(concorrencia)
+    latencias = []
+
+    async def requisicao(linha: np.ndarray):
+        async with limite:
+            inicio = time.perf_counter()
+            await servico.prever("avaliacao", linha)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(requisicao(entradas[i:i + 1]) for i in range(len(entradas))))
+    duracao = time.perf_counter() - inicio
+    return {
+        "req_por_s": len(entradas) / duracao,
+        "p50_ms": percentil(latencias, 50),
+        "p99_ms": percentil(latencias, 99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-lote", type=int, nargs="+", default=[1, 8, 64, 512])
+    parser.add_argument("--requisicoes", type=int, default=4096)
+    parser.add_argument("--concorrencia", type=int, default=512)
+    parser.add_argument("--espera-max-ms", type=float, default=2.0)
+    parser.add_argument("--trabalhadores", type=int, default=2)
+    args = parser.parse_args()
+
+    features = features_sinteticas(10_000)
+    artefato = treinar_modelos(features)
+    entradas = features[COLUNAS_POR_ALVO["avaliacao"]].to_numpy(dtype=float)[:args.requisicoes]
+    entradas = np.resize(entradas, (args.requisicoes, entradas.shape[1]))
+
+    print(f"{args.requisicoes} requisições de 1 livro, {args.concorrencia} simultâneas, "
+          f"espera máx. {args.espera_max_ms} ms, {args.trabalhadores} workers")
+    print(f"{'max_lote':>8} | {'req/s':>9} | {'p50_ms':>8} | {'p99_ms':>8}")
+    for max_lote in args.max_lote:
+        servico = ServicoModelos(artefato, max_lote=max_lote, espera_max_ms=args.espera_max_ms,
+                                 trabalhadores=args.trabalhadores)
+        asyncio.run(disparar(servico, entradas[:64], args.concorrencia))  # aquecimento
+        r = asyncio.run(disparar(servico, entradas, args.concorrencia))
+        servico.encerrar()
+        print(f"{max_lote:>8} | {r['req_por_s']:>9.0f} | {r['p50_ms']:>8.1f} | {r['p99_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
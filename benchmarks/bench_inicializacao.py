@@ -0,0 +1,114 @@
+# benchmarks/bench_inicializacao.py
+"""
+Tempo de subida da API, como na criação de um worker (deploy ou autoscaling):
+
+- import de `api.main` num interpretador novo, e quais bibliotecas pesadas
+  (scikit-learn, Selenium, joblib) já foram carregadas depois dele;
+- com o uvicorn num processo novo, o tempo desde o início do processo até o
+  primeiro byte de /api/v1/health/live (processo de pé), de
+  /api/v1/health/ready (catálogo carregado) e de uma página de /api/v1/books.
+
+A subida é medida com a carga do catálogo em segundo plano (padrão) e
+esperando a carga antes de aceitar conexões (CATALOGO_CARGA_ASSINCRONA=0).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_inicializacao
+    python -m benchmarks.bench_inicializacao --repeticoes 5 --porta 8765
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+
+MODULOS_PESADOS = ["sklearn", "scipy", "joblib", "selenium", "webdriver_manager"]
+ROTAS = {
+    "live": "/api/v1/health/live",
+    "ready": "/api/v1/health/ready",
+    "books": "/api/v1/books?limit=20",
+}
+
+_CODIGO_IMPORT = f"""
+import json, sys, time
+inicio = time.perf_counter()
+import api.main
+duracao = time.perf_counter() - inicio
+print(json.dumps({{"import_ms": duracao * 1000, "pesados": [m for m in {MODULOS_PESADOS!r} if m in sys.modules]}}))
+"""
+
+
+def ambiente(**extras) -> dict:
+    env = dict(os.environ, CATALOGO_OBSERVAR_ARQUIVO="0", LOG_AMOSTRA_2XX="0", **extras)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+    return env
+
+
+def medir_import() -> dict:
+    saida = subprocess.run([sys.executable, "-c", _CODIGO_IMPORT], capture_output=True, text=True,
+                           env=ambiente(), check=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def porta_livre() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def primeiro_byte(cliente: httpx.Client, rota: str, inicio: float, limite_s: float) -> float:
+    """Tenta a rota até ela responder 200; retorna o tempo (ms desde `inicio`) até os cabeçalhos da resposta."""
+    while time.perf_counter() - inicio < limite_s:
+        try:
+            with cliente.stream("GET", rota) as resposta:
+                if resposta.status_code == 200:
+                    return (time.perf_counter() - inicio) * 1000
+        except httpx.TransportError:
+            pass
+        time.sleep(0.005)
+    raise TimeoutError(f"{rota} não respondeu em {limite_s}s")
+
+
+def medir_subida(porta: int, assincrona: bool, limite_s: float) -> dict:
+    """Sobe o uvicorn e mede, a partir do início do processo, o primeiro byte de cada rota."""
+    env = ambiente(CATALOGO_CARGA_ASSINCRONA="1" if assincrona else "0")
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(porta), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{porta}", timeout=limite_s) as cliente:
+            # Em ordem: "live" responde antes da carga terminar; "books" espera por ela
+            return {nome: primeiro_byte(cliente, rota, inicio, limite_s) for nome, rota in ROTAS.items()}
+    finally:
+        processo.terminate()
+        processo.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--porta", type=int, default=0, help="Porta do uvicorn (padrão: uma livre).")
+    parser.add_argument("--limite", type=float, default=60.0, help="Segundos de espera por rota.")
+    args = parser.parse_args()
+
+    imports = [medir_import() for _ in range(args.repeticoes)]
+    print(f"import api.main: {np.median([i['import_ms'] for i in imports]):.0f} ms (mediana de {args.repeticoes})")
+    print(f"bibliotecas pesadas carregadas no import: {', '.join(imports[0]['pesados']) or 'nenhuma'}")
+
+    print(f"\nprimeiro byte desde o início do processo (ms, mediana de {args.repeticoes})")
+    print(f"{'carga do catálogo':>18} | " + " | ".join(f"{nome:>7}" for nome in ROTAS))
+    for assincrona in (True, False):
+        medicoes = [medir_subida(args.porta or porta_livre(), assincrona, args.limite) for _ in range(args.repeticoes)]
+        medianas = {nome: np.median([m[nome] for m in medicoes]) for nome in ROTAS}
+        modo = "segundo plano" if assincrona else "antes de aceitar"
+        print(f"{modo:>18} | " + " | ".join(f"{medianas[nome]:>7.0f}" for nome in ROTAS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# benchmarks/bench_log.py
+"""
+Requisições por segundo de um endpoint barato (resposta pré-serializada, como
+/api/v1/categories) com diferentes formas de logar cada requisição:
+
+- sem middleware de log;
+- o middleware anterior (BaseHTTPMiddleware, escrita síncrona do JSON);
+- o RequestLoggingMiddleware atual (ASGI puro) com escrita síncrona;
+- o atual com fila (QueueHandler + thread de escrita), logando tudo;
+- o atual com fila e amostragem de 10% das respostas 2xx.
+
+As requisições chamam o app ASGI direto, sem rede e sem cliente HTTP, para que
+o custo medido seja o do app e do log. Os logs vão para /dev/null.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_log
+    python -m benchmarks.bench_log --requisicoes 50000 --concorrencia 64
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+import uuid
+
+from fastapi import FastAPI, Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from api.config_log import RequestLoggingMiddleware, configure_logging
+
+CORPO = b'["Art","Biography","Business","Childrens","Christian","Classics","Fantasy","Fiction"]'
+logger = logging.getLogger("api")
+
+
+class MiddlewareLegado(BaseHTTPMiddleware):
+    """O RequestLoggingMiddleware anterior, para comparação."""
+
+    async def dispatch(self, request: Request, call_next):
+        start = time.perf_counter()
+        req_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
+        response = None
+        try:
+            response = await call_next(request)
+            return response
+        finally:
+            logger.info("http_request", extra={
+                "event": "http_request",
+                "request_id": req_id,
+                "method": request.method,
+                "path": request.url.path,
+                "status_code": getattr(response, "status_code", None),
+                "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+                "client_ip": request.client.host if request.client else None,
+                "user_agent": request.headers.get("user-agent"),
+            })
+
+
+def criar_app(middleware=None, **opcoes) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/categories")
+    async def categorias():
+        return Response(content=CORPO, media_type="application/json")
+
+    if middleware is not None:
+        app.add_middleware(middleware, **opcoes)
+    return app
+
+
+async def chamar(app) -> None:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/api/v1/categories", "raw_path": b"/api/v1/categories",
+        "root_path": "", "query_string": b"", "server": ("bench", 80), "client": ("127.0.0.1", 5000),
+        "headers": [(b"host", b"bench"), (b"user-agent", b"bench/1.0")],
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def disparar(app, requisicoes: int, concorrencia: int) -> float:
+    async def trabalhador(quantidade: int):
+        for _ in range(quantidade):
+            await chamar(app)
+
+    por_trabalhador = requisicoes // concorrencia
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador(por_trabalhador) for _ in range(concorrencia)))
+    return por_trabalhador * concorrencia / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requisicoes", type=int, default=20_000)
+    parser.add_argument("--concorrencia", type=int, default=32)
+    args = parser.parse_args()
+
+    destino = open(os.devnull, "w")
+    cenarios = [
+        ("sem log", False, criar_app()),
+        ("BaseHTTPMiddleware (anterior)", False, criar_app(MiddlewareLegado)),
+        ("ASGI puro, escrita síncrona", False, criar_app(RequestLoggingMiddleware, amostra_2xx=1.0)),
+        ("ASGI puro + fila", True, criar_app(RequestLoggingMiddleware, amostra_2xx=1.0)),
+        ("ASGI puro + fila, 10% dos 2xx", True, criar_app(RequestLoggingMiddleware, amostra_2xx=0.1)),
+    ]
+
+    print(f"{args.requisicoes} requisições, {args.concorrencia} simultâneas")
+    print(f"{'cenário':>30} | {'req/s':>8}")
+    for nome, assincrono, app in cenarios:
+        listener = configure_logging(stream=destino, assincrono=assincrono)
+        asyncio.run(disparar(app, 1000, args.concorrencia))  # aquecimento
+        req_por_s = asyncio.run(disparar(app, args.requisicoes, args.concorrencia))
+        if listener is not None:
+            listener.stop()  # inclui esvaziar a fila; fora da medição
+        print(f"{nome:>30} | {req_por_s:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# benchmarks/bench_login.py
+"""
+Teste de carga misto: uma rajada de logins (bcrypt) ao mesmo tempo que
+leituras do catálogo, com a verificação de senhas no threadpool do servidor
+(`trabalhadores=0`, como antes) e no pool de processos dedicado
+(api/verificacao_senhas.py). Mostra a latência das leituras do catálogo
+sozinhas e durante os logins, e a vazão de logins.
+
+As requisições vão direto para o app ASGI (sem rede). O limite de tentativas
+é desligado para que todos os logins cheguem ao bcrypt.
+
+Uso (a partir da raiz do projeto, com o banco criado por database/init_db.py):
+    python -m benchmarks.bench_login
+    python -m benchmarks.bench_login --logins 64 --leituras 400 --trabalhadores 0 2 4
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+import httpx
+import numpy as np
+
+os.environ.setdefault("CATALOGO_OBSERVAR_ARQUIVO", "0")
+
+LEITURA = "/api/v1/books/search?min_price=20&max_price=30&sort=-avaliacao&limit=20"
+
+
+def resumo(latencias) -> str:
+    if not latencias:
+        return f"{'-':>7} | {'-':>7}"
+    return f"{np.percentile(latencias, 50):>7.1f} | {np.percentile(latencias, 99):>7.1f}"
+
+
+async def rodar(app, logins: int, leituras: int, concorrencia_leituras: int, senha: str, usuario: str) -> dict:
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=120) as cliente:
+        latencias_leitura, duracoes_login = [], []
+        limite = asyncio.Semaphore(concorrencia_leituras)
+
+        async def ler():
+            async with limite:
+                inicio = time.perf_counter()
+                resposta = await cliente.get(LEITURA)
+                latencias_leitura.append((time.perf_counter() - inicio) * 1000)
+                assert resposta.status_code == 200, resposta.text
+
+        async def logar():
+            inicio = time.perf_counter()
+            resposta = await cliente.post("/api/v1/auth/login", data={"username": usuario, "password": senha})
+            duracoes_login.append(time.perf_counter() - inicio)
+            assert resposta.status_code in (200, 503), resposta.text
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(logar() for _ in range(logins)), *(ler() for _ in range(leituras)))
+        duracao = time.perf_counter() - inicio
+    return {
+        "leituras": latencias_leitura,
+        "logins_por_s": logins / max(duracoes_login) if logins else 0.0,
+        "duracao_s": duracao,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--leituras", type=int, default=300)
+    parser.add_argument("--concorrencia-leituras", type=int, default=8)
+    parser.add_argument("--trabalhadores", type=int, nargs="+", default=[0, 2])
+    parser.add_argument("--usuario", default="admin")
+    parser.add_argument("--senha", default="admin123")
+    args = parser.parse_args()
+
+    # Importado aqui: os processos do pool (spawn) reimportam este módulo e não precisam do app
+    import api.main as api_main
+    from api.verificacao_senhas import LimitadorTentativas, VerificadorSenhas
+
+    logging.getLogger("api").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    api_main.limitador_tentativas = LimitadorTentativas(por_usuario=10 ** 9, por_ip=10 ** 9)
+
+    print(f"{args.logins} logins + {args.leituras} leituras ({args.concorrencia_leituras} simultâneas) de {LEITURA}")
+    print(f"{'trabalhadores':>13} | {'cenário':>14} | {'p50_ms':>7} | {'p99_ms':>7} | {'logins/s':>8}")
+    for trabalhadores in args.trabalhadores:
+        anterior = api_main.verificador_senhas
+        api_main.verificador_senhas = VerificadorSenhas(trabalhadores=trabalhadores, fila_max=args.logins)
+        anterior.encerrar()
+
+        asyncio.run(rodar(api_main.app, 2, 20, args.concorrencia_leituras, args.senha, args.usuario))  # aquecimento
+        sozinho = asyncio.run(rodar(api_main.app, 0, args.leituras, args.concorrencia_leituras,
+                                    args.senha, args.usuario))
+        misto = asyncio.run(rodar(api_main.app, args.logins, args.leituras, args.concorrencia_leituras,
+                                  args.senha, args.usuario))
+        print(f"{trabalhadores:>13} | {'só leituras':>14} | {resumo(sozinho['leituras'])} | {'-':>8}")
+        print(f"{trabalhadores:>13} | {'com logins':>14} | {resumo(misto['leituras'])} | {misto['logins_por_s']:>8.1f}")
+        api_main.verificador_senhas.encerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_memoria_catalogo.py
+"""
+Relatório de memória do catálogo em memória: bytes por livro em cada coluna,
+no formato original (validar_esquema) e no compacto (api/compactacao.py), e
+quanto custa decodificar uma página de 20 livros em cada formato.
+
+Os bytes contam o conteúdo das strings (`memory_usage(deep=True)`), que é o que
+pesa no RSS de cada worker.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_memoria_catalogo
+    python -m benchmarks.bench_memoria_catalogo --tamanhos 1000 100000 --csv data/info_livros.csv
+"""
+import argparse
+
+import pandas as pd
+
+from api.compactacao import compactar
+from api.indice_catalogo import IndiceCatalogo
+from api.serializacao import registros_json, validar_esquema
+from benchmarks.bench_indice_catalogo import cronometrar
+from benchmarks.dados_sinteticos import gerar_livros, preparar_livros
+from models.book_models import Book
+
+
+def bytes_por_coluna(dados: pd.DataFrame) -> pd.Series:
+    return dados.memory_usage(deep=True, index=False)
+
+
+def relatorio(nome: str, dados: pd.DataFrame, repeticoes: int) -> None:
+    original = validar_esquema(dados, Book)
+    compacto = compactar(original)
+    antes, depois = bytes_por_coluna(original), bytes_por_coluna(compacto)
+    n = max(len(original), 1)
+
+    print(f"\n{nome}: {len(original)} livros")
+    print(f"{'coluna':>16} | {'tipo compacto':>16} | {'antes B/livro':>13} | {'depois B/livro':>14}")
+    for coluna in original.columns:
+        print(f"{coluna:>16} | {str(compacto[coluna].dtype):>16} | "
+              f"{antes[coluna] / n:>13.1f} | {depois[coluna] / n:>14.1f}")
+    print(f"{'total':>16} | {'':>16} | {antes.sum() / n:>13.1f} | {depois.sum() / n:>14.1f}"
+          f"  ({antes.sum() / 2**20:.1f} MB -> {depois.sum() / 2**20:.1f} MB)")
+
+    indices = IndiceCatalogo(original), IndiceCatalogo(compacto)
+    pagina = slice(len(original) // 2, len(original) // 2 + 20)
+    assert registros_json(indices[0].linhas(pagina)) == registros_json(indices[1].linhas(pagina))
+    tempos = [cronometrar(lambda: registros_json(indice.linhas(pagina)), repeticoes) for indice in indices]
+    print(f"página de 20 livros em JSON: {tempos[0]:.0f} us (original) | {tempos[1]:.0f} us (compacto)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--csv", help="Também mede um CSV real do catálogo (ex.: data/info_livros.csv).")
+    parser.add_argument("--repeticoes", type=int, default=2_000)
+    args = parser.parse_args()
+
+    if args.csv:
+        relatorio(args.csv, preparar_livros(pd.read_csv(args.csv, sep=";")), args.repeticoes)
+    for tamanho in args.tamanhos:
+        relatorio("sintético", preparar_livros(gerar_livros(tamanho)), args.repeticoes)
+
+
+if __name__ == "__main__":
+    main()
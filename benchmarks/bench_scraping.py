@@ -0,0 +1,77 @@
+# benchmarks/bench_scraping.py
+"""
+Compara páginas por segundo dos motores de scraping contra a réplica local do
+site (benchmarks/site_local.py), sem acessar a internet:
+
+- http (sequencial): motor HTTP com concorrência 1, equivalente ao laço página a
+  página do Selenium, mas sem navegador;
+- http (concorrente): motor HTTP com o pool de conexões e concorrência padrão;
+- selenium: o motor original (só com --selenium; exige Chrome instalado).
+
+O servidor local responde com uma latência simulada (--atraso-ms, padrão 50 ms)
+para aproximar o custo de buscar cada página num host remoto.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_scraping --livros 400
+    python -m benchmarks.bench_scraping --livros 400 --atraso-ms 0 --selenium
+"""
+import argparse
+import asyncio
+import time
+
+import pandas as pd
+
+from benchmarks.site_local import SiteLocal
+from scripts.webscraping_http import CONCORRENCIA_PADRAO, coletar_livros_http
+from scripts.webscraping_livros import (
+    ProgressoScraping, coleta_info_livros, coleta_links_livros, coleta_quantidade_paginas, criar_driver
+)
+
+
+def rodar_http(site: SiteLocal, concorrencia: int) -> pd.DataFrame:
+    info = asyncio.run(coletar_livros_http(
+        site.url_base, ProgressoScraping(), concorrencia=concorrencia, requisicoes_por_segundo=0
+    ))
+    return pd.DataFrame(info)
+
+
+def rodar_selenium(site: SiteLocal) -> pd.DataFrame:
+    driver = criar_driver()
+    try:
+        total_paginas = coleta_quantidade_paginas(driver, site.url_base)
+        links = coleta_links_livros(driver, total_paginas, url_base=site.url_base)
+        return pd.DataFrame(coleta_info_livros(driver, links))
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--livros", type=int, default=400)
+    parser.add_argument("--atraso-ms", type=float, default=50.0, help="Latência simulada por requisição.")
+    parser.add_argument("--selenium", action="store_true", help="Inclui o motor Selenium (exige Chrome).")
+    args = parser.parse_args()
+
+    with SiteLocal(args.livros, atraso_ms=args.atraso_ms) as site:
+        # Página inicial + listagens + páginas de livro
+        paginas = 1 + len(site.esperados) // 20 + (len(site.esperados) % 20 > 0) + len(site.esperados)
+        esperados = site.esperados.assign(imagem=site.url_base + site.esperados["imagem"])
+
+        motores = [
+            ("http (sequencial)", lambda: rodar_http(site, 1)),
+            (f"http (concorrente, {CONCORRENCIA_PADRAO})", lambda: rodar_http(site, CONCORRENCIA_PADRAO)),
+        ]
+        if args.selenium:
+            motores.append(("selenium", lambda: rodar_selenium(site)))
+
+        print(f"{'motor':>26} | {'segundos':>9} | {'paginas/s':>10} | {'confere':>7}")
+        for nome, rodar in motores:
+            inicio = time.perf_counter()
+            resultado = rodar()
+            duracao = time.perf_counter() - inicio
+            confere = resultado.astype(str).equals(esperados.astype(str))
+            print(f"{nome:>26} | {duracao:>9.2f} | {paginas / duracao:>10.1f} | {str(confere):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# benchmarks/bench_serializacao.py
+"""
+Compara o custo de serializar listas de livros:
+
+- caminho do `response_model`: `to_dict(orient="records")` + validação de cada
+  registro em `List[Book]` + `json.dumps`, como o FastAPI faz por requisição;
+- caminho rápido: `api.serializacao.registros_json`, direto das colunas.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_serializacao
+    python -m benchmarks.bench_serializacao --tamanhos 1000 10000
+"""
+import argparse
+import json
+from typing import List
+
+from pydantic import TypeAdapter
+
+from api.serializacao import registros_json, validar_esquema
+from benchmarks.bench_indice_catalogo import cronometrar
+from benchmarks.dados_sinteticos import gerar_livros, preparar_livros
+from models.book_models import Book
+
+_ADAPTADOR = TypeAdapter(List[Book])
+
+
+def serializar_response_model(dados) -> bytes:
+    registros = _ADAPTADOR.validate_python(dados.to_dict(orient="records"))
+    conteudo = _ADAPTADOR.dump_python(registros, mode="json")
+    return json.dumps(conteudo, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'tamanho':>10} | {'response_model_ms':>18} | {'colunar_ms':>11} | {'ganho':>6}")
+    for tamanho in args.tamanhos:
+        dados = validar_esquema(preparar_livros(gerar_livros(tamanho)), Book)
+        assert serializar_response_model(dados) == registros_json(dados)
+        repeticoes = max(1, 100_000 // tamanho)
+        lento = cronometrar(lambda: serializar_response_model(dados), repeticoes) / 1000
+        rapido = cronometrar(lambda: registros_json(dados), repeticoes) / 1000
+        print(f"{tamanho:>10} | {lento:>18.2f} | {rapido:>11.2f} | {lento / rapido:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
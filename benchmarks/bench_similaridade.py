@@ -0,0 +1,66 @@
+# benchmarks/bench_similaridade.py
+"""
+Mede o IndiceSimilaridade (api/similaridade.py): tempo de construção da matriz
+de features, latência de uma consulta de vizinhos sem cache (produto matricial
+em blocos sobre o catálogo inteiro) e com cache. No menor tamanho, confere os
+vizinhos com uma busca exaustiva ingênua.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_similaridade
+    python -m benchmarks.bench_similaridade --tamanhos 10000 100000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from api.busca_titulos import IndiceTitulos
+from api.similaridade import IndiceSimilaridade
+from benchmarks.dados_sinteticos import gerar_livros, preparar_livros
+
+
+def vizinhos_exaustivos(indice: IndiceSimilaridade, posicao: int, k: int) -> np.ndarray:
+    """Distância para todos os livros, um por um, sem blocos nem argpartition."""
+    diferencas = indice._features - indice._features[posicao]
+    distancias = (diferencas.astype(np.float64) ** 2).sum(axis=1)
+    distancias += indice._penalidade_categoria * (indice._categorias != indice._categorias[posicao])
+    distancias[posicao] = np.inf
+    return np.lexsort((np.arange(len(distancias)), distancias))[:k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--consultas", type=int, default=20)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'tamanho':>9} | {'construcao_ms':>13} | {'sem_cache_ms':>12} | {'com_cache_us':>12}")
+    for i, tamanho in enumerate(args.tamanhos):
+        dados = preparar_livros(gerar_livros(tamanho))
+        busca = IndiceTitulos(dict(zip(dados["id"].tolist(), dados["titulo"].tolist())))
+
+        inicio = time.perf_counter()
+        indice = IndiceSimilaridade(dados, busca)
+        construcao_ms = (time.perf_counter() - inicio) * 1000
+
+        posicoes = np.random.default_rng(0).integers(0, tamanho, size=args.consultas).tolist()
+        inicio = time.perf_counter()
+        for posicao in posicoes:
+            indice.vizinhos(posicao, args.k)
+        sem_cache_ms = (time.perf_counter() - inicio) / len(posicoes) * 1000
+
+        inicio = time.perf_counter()
+        for posicao in posicoes:
+            indice.vizinhos(posicao, args.k)
+        com_cache_us = (time.perf_counter() - inicio) / len(posicoes) * 1e6
+
+        if i == 0:
+            for posicao in posicoes[:5]:
+                esperado = vizinhos_exaustivos(indice, posicao, args.k)
+                assert set(indice.vizinhos(posicao, args.k)[0]) == set(esperado), posicao
+        print(f"{tamanho:>9} | {construcao_ms:>13.1f} | {sem_cache_ms:>12.2f} | {com_cache_us:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
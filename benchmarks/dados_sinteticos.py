@@ -0,0 +1,102 @@
+# benchmarks/dados_sinteticos.py
+"""
+Catálogos sintéticos no formato de `data/info_livros.csv`, usados pelos
+benchmarks. Rodado direto, grava CSVs de vários tamanhos, que podem ser
+reaproveitados entre execuções (ex.: `python -m benchmarks.suite --csv ...`).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.dados_sinteticos --linhas 1000 100000 1000000 --diretorio data/sinteticos
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+CATEGORIAS = [
+    "Default", "Nonfiction", "Sequential", "Add", "Fiction", "Young", "Fantasy",
+    "Romance", "Mystery", "Science", "Food", "Childrens", "Historical", "Poetry",
+    "Classics", "History", "Womens", "Horror", "Music", "Business", "Travel",
+    "Thriller", "Philosophy", "Humor", "Christian", "Autobiography", "Art",
+    "Religion", "Psychology", "Spirituality", "New", "Sports", "Self", "Biography",
+    "Health", "Politics", "Contemporary", "Suspense", "Short", "Parenting",
+    "Paranormal", "Novels", "Erotica", "Cultural", "Crime", "Adult", "Academic",
+]
+
+PALAVRAS = [
+    "light", "attic", "velvet", "soumission", "sharp", "objects", "sapiens",
+    "requiem", "red", "dirty", "little", "secrets", "coming", "woman", "boys",
+    "boat", "black", "maria", "starving", "hearts", "shakespeare", "sonnets",
+    "set", "me", "free", "scott", "pilgrim", "precious", "little", "life",
+    "olio", "mesaerion", "libertarianism", "beginners", "rip", "it", "up",
+    "start", "again", "our", "band", "could", "be", "your", "history",
+]
+
+
+def gerar_livros(quantidade: int, semente: int = 42) -> pd.DataFrame:
+    """
+    Gera um DataFrame sintético com o mesmo formato de `data/info_livros.csv`.
+
+    Args:
+        quantidade (int): Número de livros a gerar.
+        semente (int): Semente do gerador aleatório (resultados reprodutíveis).
+
+    Returns:
+        pd.DataFrame: Colunas titulo, preco, avaliacao, disponibilidade,
+        estoque, categoria e imagem.
+    """
+
+    rng = np.random.default_rng(semente)
+    palavras = np.array(PALAVRAS)
+    n_palavras = rng.integers(1, 6, size=quantidade)
+    sorteio = rng.integers(0, len(palavras), size=(quantidade, 5))
+    titulos = [
+        " ".join(palavras[sorteio[i, :n_palavras[i]]]).title() + f" {i}"
+        for i in range(quantidade)
+    ]
+    hashes = rng.integers(0, 16**8, size=quantidade)
+
+    return pd.DataFrame({
+        "titulo": titulos,
+        "preco": np.round(rng.uniform(10, 60, size=quantidade), 2),
+        "avaliacao": rng.integers(1, 6, size=quantidade),
+        "disponibilidade": "In stock",
+        "estoque": rng.integers(1, 23, size=quantidade),
+        "categoria": np.array(CATEGORIAS)[rng.integers(0, len(CATEGORIAS), size=quantidade)],
+        "imagem": [f"https://books.toscrape.com/media/cache/{h:08x}.jpg" for h in hashes],
+    })
+
+
+def preparar_livros(dados: pd.DataFrame) -> pd.DataFrame:
+    """Aplica ao DataFrame sintético a mesma preparação feita pela API (id e tipos)."""
+
+    dados = dados.reset_index().rename(columns={"index": "id"})
+    dados["preco"] = pd.to_numeric(dados["preco"], errors="coerce").fillna(0)
+    dados["avaliacao"] = pd.to_numeric(dados["avaliacao"], errors="coerce").fillna(0)
+    dados["estoque"] = pd.to_numeric(dados["estoque"], errors="coerce").fillna(0).astype(int)
+    dados["disponibilidade"] = dados["disponibilidade"].astype(bool)
+    return dados
+
+
+def salvar_csv(quantidade: int, caminho: str, semente: int = 42) -> str:
+    """Grava `quantidade` livros sintéticos em `caminho` no formato do scraper (sep=';')."""
+
+    gerar_livros(quantidade, semente).to_csv(caminho, index=False, sep=";")
+    return caminho
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--diretorio", default="data/sinteticos", help="Onde gravar info_livros_<linhas>.csv.")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    os.makedirs(args.diretorio, exist_ok=True)
+    for linhas in args.linhas:
+        caminho = salvar_csv(linhas, os.path.join(args.diretorio, f"info_livros_{linhas}.csv"), args.semente)
+        print(f"{caminho}: {linhas} livros, {os.path.getsize(caminho) / 2**20:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
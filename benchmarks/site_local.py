@@ -0,0 +1,200 @@
+# benchmarks/site_local.py
+"""
+Réplica local do Books to Scrape para rodar os motores de scraping sem acessar
+a internet. As páginas seguem a marcação do site original (listagens com
+article.product_pod e paginação "Page X of N"; páginas de livro com
+.product_main, .price_color, .star-rating, .instock, .breadcrumb e .thumbnail)
+e são servidas por um http.server numa thread.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.site_local --livros 200 --porta 8001
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from functools import partial
+from html import escape
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from benchmarks.dados_sinteticos import gerar_livros
+
+LIVROS_POR_PAGINA = 20
+_NOTAS = {1: "One", 2: "Two", 3: "Three", 4: "Four", 5: "Five"}
+
+_LISTAGEM = """<!DOCTYPE html>
+<html lang="en-us"><head><meta charset="utf-8"><title>All products | Books to Scrape - Sandbox</title></head>
+<body id="default" class="default"><div class="container-fluid page"><div class="page_inner">
+<ul class="breadcrumb"><li><a href="../index.html">Home</a></li><li class="active">All products</li></ul>
+<section><ol class="row">
+{produtos}
+</ol>
+<div><ul class="pager"><li class="current">
+    Page {pagina} of {total}
+</li>{proxima}</ul></div>
+</section></div></div></body></html>
+"""
+
+_PRODUTO = """<li class="col-xs-6 col-sm-4 col-md-3 col-lg-3"><article class="product_pod">
+<div class="image_container"><a href="{slug}/index.html"><img src="../media/cache/{img}.jpg" alt="{titulo}" class="thumbnail"></a></div>
+<p class="star-rating {nota}"><i class="icon-star"></i></p>
+<h3><a href="{slug}/index.html" title="{titulo}">{titulo_curto}</a></h3>
+<div class="product_price"><p class="price_color">£{preco:.2f}</p>
+<p class="instock availability"><i class="icon-ok"></i>
+    In stock
+</p></div></article></li>"""
+
+_LIVRO = """<!DOCTYPE html>
+<html lang="en-us"><head><meta charset="utf-8"><title>{titulo} | Books to Scrape - Sandbox</title></head>
+<body id="default" class="default"><div class="container-fluid page"><div class="page_inner">
+<ul class="breadcrumb">
+    <li><a href="../../index.html">Home</a></li>
+    <li><a href="../category/books_1/index.html">Books</a></li>
+    <li><a href="../category/books/{slug_categoria}/index.html">{categoria}</a></li>
+    <li class="active">{titulo}</li>
+</ul>
+<article class="product_page"><div class="row">
+<div class="col-sm-6"><div id="product_gallery" class="carousel"><div class="thumbnail"><div class="carousel-inner">
+<div class="item active"><img src="../../media/cache/{img}.jpg" alt="{titulo}" /></div>
+</div></div></div></div>
+<div class="col-sm-6 product_main">
+    <h1>{titulo}</h1>
+    <p class="price_color">£{preco:.2f}</p>
+    <p class="instock availability">
+        <i class="icon-ok"></i>
+        In stock ({estoque} available)
+    </p>
+    <p class="star-rating {nota}"><i class="icon-star"></i></p>
+</div></div>
+<div class="sub-header"><h2>Product Description</h2></div><p>Lorem ipsum.</p>
+<table class="table table-striped"><tr><th>UPC</th><td>a897fe39b1053632</td></tr></table>
+</article>
+<div class="sub-header"><h2>You might also like</h2></div>
+<ol class="row"><li><article class="product_prod"><div class="image_container">
+<img src="../../media/cache/00/00/outro.jpg" alt="Outro" class="thumbnail"></div>
+<p class="star-rating One"></p><h3><a href="../outro_1/index.html">Outro</a></h3>
+<div class="product_price"><p class="price_color">£1.00</p></div></article></li></ol>
+</div></div></body></html>
+"""
+
+
+def gerar_site(diretorio: str, quantidade: int, semente: int = 42):
+    """
+    Escreve em `diretorio` as páginas de um site com `quantidade` livros sintéticos.
+
+    Returns:
+        pd.DataFrame: Os livros publicados, na ordem em que aparecem no site,
+        com as colunas de `info_livros` que os motores devem extrair.
+    """
+    livros = gerar_livros(quantidade, semente)
+    total = max(1, -(-quantidade // LIVROS_POR_PAGINA))
+    catalogo = os.path.join(diretorio, "catalogue")
+    os.makedirs(catalogo, exist_ok=True)
+
+    esperados = []
+    for pagina in range(1, total + 1):
+        produtos = []
+        for i in range((pagina - 1) * LIVROS_POR_PAGINA, min(pagina * LIVROS_POR_PAGINA, quantidade)):
+            livro = livros.iloc[i]
+            slug = f"livro_{i}"
+            img = livro["imagem"].rsplit("/", 1)[-1].removesuffix(".jpg")
+            campos = dict(
+                slug=slug, img=img, titulo=escape(livro["titulo"]), titulo_curto=escape(livro["titulo"][:20]),
+                preco=livro["preco"], nota=_NOTAS[int(livro["avaliacao"])], estoque=int(livro["estoque"]),
+                categoria=escape(livro["categoria"]), slug_categoria=livro["categoria"].lower() + "_2",
+            )
+            produtos.append(_PRODUTO.format(**campos))
+            os.makedirs(os.path.join(catalogo, slug), exist_ok=True)
+            with open(os.path.join(catalogo, slug, "index.html"), "w", encoding="utf-8") as arquivo:
+                arquivo.write(_LIVRO.format(**campos))
+            esperados.append({
+                "titulo": livro["titulo"], "preco": f"{livro['preco']:.2f}", "avaliacao": int(livro["avaliacao"]),
+                "disponibilidade": "In stock", "estoque": str(int(livro["estoque"])),
+                "categoria": livro["categoria"].split(" ")[0], "imagem": f"media/cache/{img}.jpg",  # relativo à url_base
+            })
+
+        proxima = f'<li class="next"><a href="page-{pagina + 1}.html">next</a></li>' if pagina < total else ""
+        html = _LISTAGEM.format(produtos="\n".join(produtos), pagina=pagina, total=total, proxima=proxima)
+        with open(os.path.join(catalogo, f"page-{pagina}.html"), "w", encoding="utf-8") as arquivo:
+            arquivo.write(html)
+        if pagina == 1:
+            # A página inicial do site é a primeira listagem (com links relativos à raiz)
+            with open(os.path.join(diretorio, "index.html"), "w", encoding="utf-8") as arquivo:
+                arquivo.write(html.replace('href="livro_', 'href="catalogue/livro_'))
+
+    return pd.DataFrame(esperados)
+
+
+class _HandlerSilencioso(SimpleHTTPRequestHandler):
+    atraso_segundos = 0.0
+
+    def do_GET(self):
+        # Simula a latência de rede de um servidor remoto
+        if self.atraso_segundos:
+            time.sleep(self.atraso_segundos)
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+class ServidorPaginas:
+    """
+    Servidor HTTP local com as páginas de `diretorio`, numa thread. Serve tanto
+    o site gerado por `gerar_site` quanto páginas salvas do site original
+    (tests/fixtures/books_toscrape). `atraso_ms` simula a latência de rede de
+    cada requisição.
+    """
+
+    def __init__(self, diretorio: str, porta: int = 0, atraso_ms: float = 0.0):
+        classe = type("_Handler", (_HandlerSilencioso,), {"atraso_segundos": atraso_ms / 1000})
+        handler = partial(classe, directory=diretorio)
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", porta), handler)
+        self._servidor.daemon_threads = True
+        self.url_base = f"http://127.0.0.1:{self._servidor.server_address[1]}/"
+
+    def __enter__(self):
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+
+class SiteLocal(ServidorPaginas):
+    """
+    Servidor HTTP local com o site gerado por `gerar_site`.
+
+    Exemplo:
+        with SiteLocal(200) as site:
+            rodar_scraping_http(url_base=site.url_base)
+    """
+
+    def __init__(self, quantidade: int, porta: int = 0, semente: int = 42, atraso_ms: float = 0.0):
+        self._temporario = tempfile.TemporaryDirectory()
+        self.esperados = gerar_site(self._temporario.name, quantidade, semente)
+        super().__init__(self._temporario.name, porta, atraso_ms)
+
+    def __exit__(self, *exc):
+        super().__exit__(*exc)
+        self._temporario.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--livros", type=int, default=200)
+    parser.add_argument("--porta", type=int, default=8001)
+    parser.add_argument("--atraso-ms", type=float, default=0.0, help="Latência simulada por requisição.")
+    args = parser.parse_args()
+
+    with SiteLocal(args.livros, args.porta, atraso_ms=args.atraso_ms) as site:
+        print(f"Servindo {args.livros} livros em {site.url_base} (Ctrl+C para sair)")
+        threading.Event().wait()
+
+
+if __name__ == "__main__":
+    main()
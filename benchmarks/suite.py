@@ -0,0 +1,313 @@
+# benchmarks/suite.py
+"""
+Suíte de desempenho da API inteira, para comparar uma mudança com a anterior:
+
+1. gera um catálogo sintético no formato de `data/info_livros.csv` (ou usa
+   `--csv`) e mede a carga dele;
+2. micro-benchmark de cada handler de api/main.py chamado direto, sem HTTP
+   (mediana e p95 em µs por chamada);
+3. carga HTTP no app ASGI, no mesmo processo (sem rede): para cada rota,
+   requisições com `--concorrencia` simultâneas, com req/s e p50/p95/p99. As
+   rotas autenticadas usam um token obtido em /api/v1/auth/login, e o próprio
+   login (bcrypt) também é medido.
+
+Os resultados saem em JSON (`--saida`). Com `--comparar`, cada métrica é
+comparada com um resultado guardado antes (o baseline); uma piora acima de
+`--tolerancia` é marcada como regressão e o processo termina com código 1.
+Compare só resultados da mesma máquina e do mesmo número de linhas.
+
+As rotas de ML ficam de fora (dependem do modelo treinado e do CSV real).
+
+Uso (a partir da raiz do projeto, com o banco criado por database/init_db.py):
+    python -m benchmarks.suite --linhas 10000 --saida benchmarks/resultados/base.json
+    python -m benchmarks.suite --linhas 10000 --comparar benchmarks/resultados/base.json
+    python -m benchmarks.suite --linhas 1000000 --requisicoes 200 --repeticoes 50
+    python -m benchmarks.suite --csv data/info_livros.csv --pular-http
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+from starlette.requests import Request
+
+os.environ.setdefault("CATALOGO_OBSERVAR_ARQUIVO", "0")
+os.environ.setdefault("LOG_AMOSTRA_2XX", "0")
+
+from benchmarks.dados_sinteticos import salvar_csv
+
+# Métricas comparadas com o baseline e se o melhor valor é o menor ou o maior
+METRICAS = {
+    "carga": {"duracao_ms": "menor"},
+    "handlers": {"mediana_us": "menor", "p95_us": "menor"},
+    "http": {"req_por_s": "maior", "p50_ms": "menor", "p95_ms": "menor", "p99_ms": "menor"},
+}
+
+
+def percentis(amostras, fator: float, sufixo: str, quais=(50, 95, 99)) -> Dict[str, float]:
+    valores = np.percentile(np.asarray(amostras) * fator, quais)
+    return {f"p{q}_{sufixo}": round(float(v), 3) for q, v in zip(quais, valores)}
+
+
+def cronometrar(funcao: Callable[[], object], repeticoes: int) -> Dict[str, float]:
+    """Tempo de cada chamada de `funcao` (depois de uma de aquecimento): mediana e p95 em µs."""
+    funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    resultado = percentis(tempos, 1e6, "us", quais=(50, 95))
+    return {"mediana_us": resultado.pop("p50_us"), **resultado, "repeticoes": repeticoes}
+
+
+def requisicao_falsa(path: str = "/") -> Request:
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"",
+                    "headers": [], "client": ("127.0.0.1", 0)})
+
+
+def medir_handlers(api_main, total: int, repeticoes: int, usuario: str, senha: str) -> dict:
+    """Chama cada handler como função Python, com todos os parâmetros explícitos (os padrões são `Query(...)`)."""
+    from fastapi.security import OAuth2PasswordRequestForm
+
+    from api.auth import UsuarioAutenticado
+
+    meio = total // 2
+    request = requisicao_falsa()
+    busca = dict(title=None, category=None, min_price=None, max_price=None, min_rating=None, max_rating=None,
+                 available=None, min_stock=None, sort=None, limit=20, offset=0)
+    loop = asyncio.new_event_loop()
+    formulario = OAuth2PasswordRequestForm(username=usuario, password=senha)
+    autenticado = UsuarioAutenticado(id=1, username=usuario, is_admin=True)
+
+    casos = {
+        "health_check": lambda: api_main.health_check(),
+        "get_livros": lambda: api_main.get_livros(request, None, 0, None),
+        "get_livros_pagina": lambda: api_main.get_livros(request, 20, meio, None),
+        "get_livro_id": lambda: api_main.get_livro_id(meio),
+        "get_livros_similares": lambda: api_main.get_livros_similares(meio, 10),
+        "search_livros_titulo": lambda: api_main.search_livros(**{**busca, "title": "light attic"}),
+        "search_livros_filtros": lambda: api_main.search_livros(
+            **{**busca, "category": ["Poetry"], "max_price": 40.0, "sort": "-avaliacao,preco"}),
+        "livros_top_avaliados": lambda: api_main.livros_top_avaliados(10),
+        "livros_por_preco": lambda: api_main.livros_por_preco(20.0, 20.5),
+        "get_categorias": lambda: api_main.get_categorias(request),
+        "stats_overview": lambda: api_main.stats_overview(request),
+        "stats_por_categoria": lambda: api_main.stats_por_categoria(request),
+        "stats_distribuicao": lambda: api_main.stats_distribuicao(request),
+        "refresh_token": lambda: api_main.refresh_token(autenticado),
+        "login": lambda: loop.run_until_complete(api_main.login(request, formulario)),
+    }
+    # O login espera o bcrypt (centenas de ms): poucas repetições bastam
+    lentos = {"login": max(1, repeticoes // 20)}
+    try:
+        return {nome: cronometrar(funcao, lentos.get(nome, repeticoes)) for nome, funcao in casos.items()}
+    finally:
+        loop.close()
+
+
+def rotas_http(total: int) -> Dict[str, dict]:
+    meio = total // 2
+    return {
+        "health": {"rota": "/api/v1/health"},
+        "livros_pagina": {"rota": f"/api/v1/books?limit=20&offset={meio}"},
+        "livro_id": {"rota": f"/api/v1/books/{meio}"},
+        "similares": {"rota": f"/api/v1/books/{meio}/similar?k=10"},
+        "busca_titulo": {"rota": "/api/v1/books/search?title=light%20attic&limit=20"},
+        "busca_filtros": {"rota": "/api/v1/books/search?category=Poetry&max_price=40&sort=-avaliacao,preco&limit=20"},
+        "top_avaliados": {"rota": "/api/v1/books/top-rated?quantidade=10"},
+        "faixa_preco": {"rota": "/api/v1/books/price-range?min_price=20&max_price=20.5"},
+        "categorias": {"rota": "/api/v1/categories"},
+        "stats_overview": {"rota": "/api/v1/stats/overview"},
+        "stats_categorias": {"rota": "/api/v1/stats/categories"},
+        "stats_distribuicao": {"rota": "/api/v1/stats/distribution"},
+        "auth_refresh": {"rota": "/api/v1/auth/refresh", "metodo": "POST", "autenticada": True},
+        "auth_login": {"rota": "/api/v1/auth/login", "metodo": "POST", "login": True},
+    }
+
+
+async def _carga_http(app, requisicoes: int, concorrencia: int, usuario: str, senha: str,
+                      rotas: Dict[str, dict]) -> dict:
+    credenciais = {"username": usuario, "password": senha}
+    transporte = httpx.ASGITransport(app=app, client=("127.0.0.1", 0))
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=120) as cliente:
+        resposta = await cliente.post("/api/v1/auth/login", data=credenciais)
+        if resposta.status_code != 200:
+            raise SystemExit(f"login de {usuario} falhou ({resposta.status_code}); o banco foi criado? "
+                             "(python database/init_db.py)")
+        autorizacao = {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+
+        async def enviar(spec: dict) -> httpx.Response:
+            if spec.get("login"):
+                return await cliente.post(spec["rota"], data=credenciais)
+            cabecalhos = autorizacao if spec.get("autenticada") else None
+            return await cliente.request(spec.get("metodo", "GET"), spec["rota"], headers=cabecalhos)
+
+        resultados = {}
+        for nome, spec in rotas.items():
+            quantidade = max(1, requisicoes // 20) if spec.get("login") else requisicoes
+            await enviar(spec)  # aquecimento
+            latencias: List[float] = []
+            pendentes = iter(range(quantidade))
+
+            async def usuario_virtual():
+                for _ in pendentes:
+                    inicio = time.perf_counter()
+                    resposta = await enviar(spec)
+                    latencias.append(time.perf_counter() - inicio)
+                    if resposta.status_code != 200:
+                        raise RuntimeError(f"{spec['rota']}: status {resposta.status_code}")
+
+            inicio = time.perf_counter()
+            await asyncio.gather(*(usuario_virtual() for _ in range(min(concorrencia, quantidade))))
+            decorrido = time.perf_counter() - inicio
+            resultados[nome] = {"rota": spec["rota"], "requisicoes": quantidade,
+                                "req_por_s": round(quantidade / decorrido, 1), **percentis(latencias, 1e3, "ms")}
+    return resultados
+
+
+def medir_http(api_main, requisicoes: int, concorrencia: int, usuario: str, senha: str, total: int) -> dict:
+    return asyncio.run(_carga_http(api_main.app, requisicoes, concorrencia, usuario, senha, rotas_http(total)))
+
+
+def comparar(atual: dict, base: dict, tolerancia: float) -> List[dict]:
+    """Variação de cada métrica presente nos dois resultados; `regressao` quando piorou mais que `tolerancia`."""
+    linhas = []
+    for secao, metricas in METRICAS.items():
+        grupos_atuais = atual.get(secao, {})
+        grupos_base = base.get(secao, {})
+        if secao == "carga":
+            grupos_atuais, grupos_base = {"catalogo": grupos_atuais}, {"catalogo": grupos_base}
+        for nome, valores in grupos_atuais.items():
+            anteriores = grupos_base.get(nome)
+            if not anteriores:
+                continue
+            for metrica, melhor in metricas.items():
+                antes, depois = anteriores.get(metrica), valores.get(metrica)
+                if not antes or depois is None:
+                    continue
+                variacao = depois / antes - 1
+                piora = -variacao if melhor == "maior" else variacao
+                linhas.append({"secao": secao, "nome": nome, "metrica": metrica, "antes": antes, "depois": depois,
+                               "variacao": round(variacao, 4), "regressao": piora > tolerancia})
+    return linhas
+
+
+def commit_atual() -> Optional[str]:
+    try:
+        saida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return saida.stdout.strip()
+
+
+def imprimir(resultado: dict) -> None:
+    carga = resultado["carga"]
+    print(f"carga do catálogo: {carga['duracao_ms']:.0f} ms ({carga['livros']} livros)")
+    if resultado.get("handlers"):
+        print(f"\n{'handler':>22} | {'mediana_us':>10} | {'p95_us':>10} | {'repetições':>10}")
+        for nome, r in resultado["handlers"].items():
+            print(f"{nome:>22} | {r['mediana_us']:>10.1f} | {r['p95_us']:>10.1f} | {r['repeticoes']:>10}")
+    if resultado.get("http"):
+        print(f"\n{'rota':>18} | {'req/s':>8} | {'p50_ms':>7} | {'p95_ms':>7} | {'p99_ms':>7}")
+        for nome, r in resultado["http"].items():
+            print(f"{nome:>18} | {r['req_por_s']:>8.1f} | {r['p50_ms']:>7.2f} | {r['p95_ms']:>7.2f} | {r['p99_ms']:>7.2f}")
+
+
+def imprimir_comparacao(linhas: List[dict], tolerancia: float) -> None:
+    """Só as regressões; a comparação completa vai para o JSON de `--saida`."""
+    regressoes = [linha for linha in linhas if linha["regressao"]]
+    print(f"\ncomparação com o baseline (tolerância {tolerancia:.0%}): "
+          f"{len(linhas)} métricas, {len(regressoes)} regressões")
+    for linha in regressoes:
+        print(f"{linha['secao']:>8} | {linha['nome']:>22} | {linha['metrica']:>10} | {linha['antes']:>10.2f} -> "
+              f"{linha['depois']:>10.2f} | {linha['variacao']:>+7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=10_000, help="Livros do catálogo sintético.")
+    parser.add_argument("--csv", help="Usa este CSV (formato do scraper) em vez de gerar um catálogo.")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--repeticoes", type=int, default=200, help="Chamadas por handler.")
+    parser.add_argument("--requisicoes", type=int, default=500, help="Requisições HTTP por rota.")
+    parser.add_argument("--concorrencia", type=int, default=8, help="Requisições HTTP simultâneas.")
+    parser.add_argument("--pular-handlers", action="store_true")
+    parser.add_argument("--pular-http", action="store_true")
+    parser.add_argument("--usuario", default="admin")
+    parser.add_argument("--senha", default="admin123")
+    parser.add_argument("--saida", help="Grava o resultado em JSON neste arquivo.")
+    parser.add_argument("--comparar", help="Resultado JSON anterior (baseline) para comparar.")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Piora relativa aceita (0.2 = 20%%).")
+    args = parser.parse_args()
+
+    # Importado aqui: os processos do pool de senhas (spawn) reimportam este módulo e não precisam do app
+    import api.main as api_main
+    from api.catalogo import GerenciadorCatalogo
+    from api.verificacao_senhas import LimitadorTentativas
+
+    logging.getLogger("api").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    # Todos os logins da suíte chegam ao bcrypt
+    api_main.limitador_tentativas = LimitadorTentativas(por_usuario=10 ** 9, por_ip=10 ** 9)
+
+    with tempfile.TemporaryDirectory(prefix="suite-api-") as diretorio:
+        caminho = args.csv or salvar_csv(args.linhas, os.path.join(diretorio, "info_livros.csv"), args.semente)
+        api_main.gerenciador_catalogo = GerenciadorCatalogo(caminho)
+        inicio = time.perf_counter()
+        catalogo = api_main.gerenciador_catalogo.carregar()
+        duracao_carga = time.perf_counter() - inicio
+        total = len(catalogo.dados)
+
+        resultado = {
+            "ambiente": {
+                "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "commit": commit_atual(),
+                "python": platform.python_version(),
+                "plataforma": platform.platform(),
+                "nucleos": os.cpu_count(),
+                "catalogo": args.csv or f"sintético ({args.linhas} linhas, semente {args.semente})",
+                "compacto": os.getenv("CATALOGO_COMPACTO", "1"),
+            },
+            "carga": {"livros": total, "duracao_ms": round(duracao_carga * 1000, 1)},
+        }
+        try:
+            if not args.pular_handlers:
+                resultado["handlers"] = medir_handlers(api_main, total, args.repeticoes, args.usuario, args.senha)
+            if not args.pular_http:
+                resultado["http"] = medir_http(api_main, args.requisicoes, args.concorrencia,
+                                               args.usuario, args.senha, total)
+        finally:
+            api_main.verificador_senhas.encerrar()
+
+    imprimir(resultado)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            base = json.load(arquivo)
+        if base.get("carga", {}).get("livros") != total:
+            print(f"\naviso: o baseline tem {base.get('carga', {}).get('livros')} livros e este resultado, {total}")
+        resultado["comparacao"] = {"baseline": args.comparar, "tolerancia": args.tolerancia,
+                                   "metricas": comparar(resultado, base, args.tolerancia)}
+        imprimir_comparacao(resultado["comparacao"]["metricas"], args.tolerancia)
+
+    if args.saida:
+        os.makedirs(os.path.dirname(os.path.abspath(args.saida)), exist_ok=True)
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+        print(f"\nresultado gravado em {args.saida}")
+
+    regressao = any(linha["regressao"] for linha in resultado.get("comparacao", {}).get("metricas", []))
+    return 1 if regressao else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,178 @@
 # database/db.py
-from sqlalchemy import create_engine
+import os
+import time
+from typing import Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Banco de usuários: SQLite local por padrão; em produção, aponte DATABASE_URL para
+# um banco compartilhado entre workers e máquinas (ex.: postgresql+psycopg://...)
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./database/users.db")
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./database/users.db"
+# Pool de conexões (por processo)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))       # segundos esperando uma conexão livre
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))       # recria conexões com mais de N segundos
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))  # SQLite: espera por um lock antes de falhar
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}  # SQLite + FastAPI
+# Sessões assíncronas (DB_ASYNC=1): exigem o driver assíncrono do banco (aiosqlite, asyncpg...)
+DB_ASYNC = os.getenv("DB_ASYNC", "0").lower() in ("1", "true", "sim")
+DRIVERS_ASSINCRONOS = {"sqlite": "aiosqlite", "postgresql": "asyncpg", "mysql": "aiomysql"}
+
+# Métricas por engine ("sync" para as sessões comuns, "async" para as de DB_ASYNC)
+POOL_CHECKOUTS = Counter("db_pool_checkouts", "Conexões retiradas do pool do banco de usuários.", ["engine"])
+POOL_ESPERA = Histogram(
+    "db_pool_espera_checkout_segundos",
+    "Tempo esperando uma conexão livre no pool do banco de usuários.",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
 )
+# Com vários workers (api/servidor.py), o /metrics soma os pools dos processos vivos
+POOL_EM_USO = Gauge("db_pool_conexoes_em_uso", "Conexões do pool em uso neste momento.", ["engine"],
+                    multiprocess_mode="livesum")
+POOL_OCIOSAS = Gauge("db_pool_conexoes_ociosas", "Conexões abertas e livres no pool.", ["engine"],
+                     multiprocess_mode="livesum")
+POOL_OVERFLOW = Gauge("db_pool_overflow", "Conexões além de DB_POOL_SIZE (negativo: ainda não abertas).", ["engine"],
+                      multiprocess_mode="livesum")
+
+
+class _MedirEspera:
+    """Mede quanto cada checkout esperou por uma conexão livre."""
+    rotulo_engine = "sync"
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_ESPERA.labels(engine=self.rotulo_engine).observe(time.perf_counter() - inicio)
+
+
+class PoolMedido(_MedirEspera, QueuePool):
+    pass
+
+
+class PoolMedidoAssincrono(_MedirEspera, AsyncAdaptedQueuePool):
+    rotulo_engine = "async"
+
+
+def _eh_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite"
+
+
+def _opcoes_engine(url) -> dict:
+    if _eh_sqlite(url) and url.database in (None, "", ":memory:"):
+        return {"connect_args": {"check_same_thread": False}}  # banco em memória: pool padrão do SQLAlchemy
+    opcoes = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+    if _eh_sqlite(url):
+        # SQLite + FastAPI: a conexão pode ser usada por outra thread do threadpool
+        opcoes["connect_args"] = {"check_same_thread": False, "timeout": DB_BUSY_TIMEOUT_MS / 1000}
+    return opcoes
+
+
+def _configurar_sqlite(engine_sync) -> None:
+    """WAL (leituras não esperam pela escrita) e busy_timeout em toda conexão nova."""
+    @event.listens_for(engine_sync, "connect")
+    def _pragmas(conexao, _registro):
+        cursor = conexao.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+        cursor.close()
+
+
+def _medir_pool(engine_sync, rotulo: str) -> None:
+    @event.listens_for(engine_sync, "checkout")
+    def _checkout(*_):
+        POOL_CHECKOUTS.labels(engine=rotulo).inc()
+
+
+url = make_url(SQLALCHEMY_DATABASE_URL)
+_opcoes = _opcoes_engine(url)
+if "pool_size" in _opcoes:
+    _opcoes["poolclass"] = PoolMedido
+engine = create_engine(url, **_opcoes)
+if _eh_sqlite(url):
+    _configurar_sqlite(engine)
+_medir_pool(engine, "sync")
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def descartar_conexoes_herdadas() -> None:
+    """
+    Chamado num processo filho logo depois do fork: esquece as conexões abertas
+    herdadas do pai (sem fechá-las, elas continuam sendo do pai) para que o
+    filho abra as suas.
+    """
+    engine.dispose(close=False)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
+
+
+def atualizar_metricas_pool(_info=None) -> None:
+    """Ocupação atual dos pools; registrada no Instrumentator, roda a cada requisição."""
+    engines = {"sync": engine}
+    if async_engine is not None:
+        engines["async"] = async_engine.sync_engine
+    for rotulo, engine_medido in engines.items():
+        pool = engine_medido.pool
+        if isinstance(pool, QueuePool):
+            POOL_EM_USO.labels(engine=rotulo).set(pool.checkedout())
+            POOL_OCIOSAS.labels(engine=rotulo).set(pool.checkedin())
+            POOL_OVERFLOW.labels(engine=rotulo).set(pool.overflow())
+
+
+# --- Sessões assíncronas (opcional) ---
+
+async_engine = None
+AsyncSessionLocal = None
+
+
+def url_assincrona(url_sincrona) -> Optional[str]:
+    """A mesma URL com o driver assíncrono do banco (sqlite -> sqlite+aiosqlite), ou None se não houver."""
+    url_sincrona = make_url(url_sincrona)
+    driver = DRIVERS_ASSINCRONOS.get(url_sincrona.get_backend_name())
+    if driver is None:
+        return None
+    return url_sincrona.set(drivername=f"{url_sincrona.get_backend_name()}+{driver}").render_as_string(
+        hide_password=False
+    )
+
+
+def iniciar_sessoes_assincronas():
+    """
+    Cria o engine assíncrono (uma vez) e retorna a fábrica de sessões, ou None
+    se DB_ASYNC estiver desligado. O driver assíncrono só é importado aqui.
+    """
+    global async_engine, AsyncSessionLocal
+    if not DB_ASYNC:
+        return None
+    if AsyncSessionLocal is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+        url_async = os.getenv("DATABASE_ASYNC_URL") or url_assincrona(url)
+        if url_async is None:
+            raise RuntimeError(f"DB_ASYNC=1, mas não há driver assíncrono conhecido para {url.drivername}; "
+                               "defina DATABASE_ASYNC_URL.")
+        opcoes = _opcoes_engine(make_url(url_async))
+        opcoes.get("connect_args", {}).pop("check_same_thread", None)
+        if "pool_size" in opcoes:
+            opcoes["poolclass"] = PoolMedidoAssincrono
+        async_engine = create_async_engine(url_async, **opcoes)
+        if _eh_sqlite(make_url(url_async)):
+            _configurar_sqlite(async_engine.sync_engine)
+        _medir_pool(async_engine.sync_engine, "async")
+        AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+    return AsyncSessionLocal
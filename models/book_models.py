@@ -1,6 +1,6 @@
 # models/book_models.py
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Dict, List
 
 class Book(BaseModel):
     """Modelo de dados para um livro."""
@@ -11,11 +11,17 @@ class Book(BaseModel):
     disponibilidade: bool = Field(..., description="Indica se o livro está disponível.")
     estoque: int = Field(..., description="Quantidade em estoque.")
     categoria: str = Field(..., description="Categoria do livro.")
-    imagem: str = Field(..., description="URL da imagem de capa do livro.")
+    imagem: str = Field(
+        ..., description="URL da imagem de capa do livro (com CAPAS_URL_LOCAL, a rota /api/v1/books/{id}/cover)."
+    )
 
     class Config:
         from_attributes = True
 
+class SimilarBook(Book):
+    """Livro similar a outro, com a distância entre eles (quanto menor, mais parecido)."""
+    distancia: float = Field(..., description="Distância entre as features dos dois livros.")
+
 class StatsOverview(BaseModel):
     """Modelo de resposta para as estatísticas gerais."""
     total_livros: int
@@ -29,4 +35,11 @@ class CategoryStats(BaseModel):
     total_livros: int
     preco_medio: float
     avaliacao_media: float
-    estoque_total: int
\ No newline at end of file
+    estoque_total: int
+
+class StatsDistribuicao(BaseModel):
+    """Modelo de resposta para a distribuição de preços e notas."""
+    percentis_preco: Dict[str, float] = Field(..., description="Percentis de preço do acervo (p10 a p99).")
+    percentis_preco_por_categoria: Dict[str, Dict[str, float]] = Field(..., description="Percentis de preço de cada categoria.")
+    histograma_avaliacao: Dict[str, int] = Field(..., description="Quantidade de livros em cada nota (0 a 5).")
+    histograma_avaliacao_por_categoria: Dict[str, Dict[str, int]] = Field(..., description="Histograma de notas de cada categoria.")
@@ -1,6 +1,6 @@
 # models/health.py
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 class HealthCheckResponse(BaseModel):
     """Modelo de resposta para a verificação de saúde da API."""
@@ -9,5 +9,14 @@ class HealthCheckResponse(BaseModel):
     livros_carregados: int
     categorias_disponiveis: List[str]
     quantidade_categorias: int
+    versao_dados: int
+    dados_carregados_em: str
     verificado_em: str
-    tempo_resposta_ms: float
\ No newline at end of file
+    tempo_resposta_ms: float
+
+class ProntidaoResponse(BaseModel):
+    """Modelo de resposta das verificações de vida e de prontidão da API."""
+    status: str
+    catalogo_carregado: bool
+    modelos_carregados: bool
+    versao_dados: Optional[int] = None
@@ -0,0 +1,22 @@
+# models/ml.py
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+class LivroPredicao(BaseModel):
+    """Features de um livro para predição (mesmas colunas de /api/v1/ml/features)."""
+    preco: Optional[float] = Field(None, description="Preço do livro (obrigatório para prever a avaliação).")
+    avaliacao: Optional[float] = Field(None, description="Avaliação de 0 a 5 (obrigatória para prever o preço).")
+    estoque: int = Field(0, description="Quantidade em estoque.")
+    disponibilidade: int = Field(1, description="1 se o livro está disponível, 0 caso contrário.")
+    categoria_codificada: int = Field(..., description="Código da categoria, como em /api/v1/ml/features.")
+
+class PredicaoRequest(BaseModel):
+    """Lote de livros para predição."""
+    alvo: Literal["avaliacao", "preco"] = Field("avaliacao", description="O que prever.")
+    livros: List[LivroPredicao] = Field(..., min_length=1, max_length=10_000)
+
+class PredicaoResponse(BaseModel):
+    """Predições na mesma ordem dos livros enviados."""
+    alvo: str
+    modelo: str = Field(..., description="Versão do modelo (data do treino).")
+    predicoes: List[float]
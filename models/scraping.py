@@ -0,0 +1,30 @@
+# models/scraping.py
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+class ProgressoScrapingModel(BaseModel):
+    """Andamento de uma execução do scraping."""
+    etapa: str = Field(..., description="Etapa atual: pendente, paginas, links, livros, salvando ou capas.")
+    paginas_total: int
+    paginas_processadas: int
+    links_coletados: int
+    livros_processados: int
+    capas_processadas: int = Field(0, description="Capas baixadas para o armazém local nesta execução.")
+    erros: int
+    ultimos_erros: List[str]
+    delta: Optional[Dict[str, int]] = Field(
+        None, description="Modo incremental: livros novos, alterados, removidos, inalterados e páginas não modificadas."
+    )
+    duracoes_etapas: Dict[str, float] = Field(
+        default_factory=dict, description="Segundos gastos em cada etapa já concluída."
+    )
+
+class ScrapingJob(BaseModel):
+    """Modelo de resposta com o estado de um job de scraping."""
+    job_id: str
+    status: str = Field(..., description="pendente, executando, concluido ou falhou.")
+    criado_em: str
+    iniciado_em: Optional[str] = None
+    finalizado_em: Optional[str] = None
+    mensagem: Optional[str] = None
+    progresso: ProgressoScrapingModel
@@ -0,0 +1,122 @@
+# scripts/armazenamento_livros.py
+"""
+Armazenamento dos livros raspados. O CSV (`data/info_livros.csv`) continua
+sendo o formato de exportação; ao lado dele o scraper grava uma cópia colunar
+em Arrow IPC (`data/info_livros.arrow`) com os tipos já limpos. Os
+carregadores leem o Arrow por memory-map: as colunas numéricas apontam direto
+para as páginas do arquivo, que o sistema operacional compartilha entre os
+processos (workers do uvicorn) em vez de cada um guardar uma cópia própria.
+"""
+import os
+from typing import Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+CAMINHO_CSV = "data/info_livros.csv"
+
+# Memory-map por padrão fora do Windows (lá um arquivo mapeado não pode ser
+# substituído enquanto a API o mantém aberto)
+MEMORY_MAP_PADRAO = os.name != "nt"
+
+
+def caminho_colunar(caminho_csv: str = CAMINHO_CSV) -> str:
+    """Caminho do arquivo Arrow que acompanha o CSV (mesmo nome, extensão .arrow)."""
+    return os.path.splitext(caminho_csv)[0] + ".arrow"
+
+
+def limpar_tipos(tabela: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte as colunas numéricas do jeito que API e ML sempre fizeram:
+    valores inválidos viram 0 e o estoque vira inteiro. As colunas de texto
+    (inclusive a disponibilidade) ficam como vieram do site.
+    """
+    tabela = tabela.copy()
+    tabela['preco'] = pd.to_numeric(tabela['preco'], errors='coerce').fillna(0)
+    tabela['avaliacao'] = pd.to_numeric(tabela['avaliacao'], errors='coerce').fillna(0)
+    tabela['estoque'] = pd.to_numeric(tabela['estoque'], errors='coerce').fillna(0).astype(int)
+    return tabela
+
+
+def _substituir_atomicamente(caminho: str, escrever):
+    temporario = f'{caminho}.tmp'
+    escrever(temporario)
+    os.replace(temporario, caminho)
+
+
+def salvar_livros(tabela: pd.DataFrame, caminho_csv: str = CAMINHO_CSV):
+    """
+    Grava o CSV de exportação e, em seguida, o Arrow com os tipos limpos. Cada
+    arquivo é escrito num temporário e trocado de uma vez, para que a API (que
+    observa os arquivos para recarregar o catálogo) nunca leia um arquivo pela metade.
+    """
+    _substituir_atomicamente(caminho_csv, lambda destino: tabela.to_csv(destino, index=False, sep=';'))
+    salvar_colunar(limpar_tipos(tabela), caminho_colunar(caminho_csv))
+
+
+def salvar_colunar(tabela: pd.DataFrame, caminho: str):
+    """Grava a tabela em Arrow IPC sem compressão (condição para o memory-map)."""
+    _substituir_atomicamente(
+        caminho,
+        lambda destino: feather.write_feather(
+            tabela.reset_index(drop=True), destino, compression="uncompressed"
+        ),
+    )
+
+
+def colunar_atualizado(caminho_csv: str = CAMINHO_CSV) -> bool:
+    """True se o Arrow existe e não é mais antigo que o CSV (ou se não há CSV)."""
+    try:
+        modificado_colunar = os.stat(caminho_colunar(caminho_csv)).st_mtime_ns
+    except FileNotFoundError:
+        return False
+    try:
+        return modificado_colunar >= os.stat(caminho_csv).st_mtime_ns
+    except FileNotFoundError:
+        return True
+
+
+def ler_colunar(caminho: str, memory_map: bool = MEMORY_MAP_PADRAO) -> pd.DataFrame:
+    """
+    Lê o arquivo Arrow. Com `memory_map`, as colunas numéricas sem nulos são
+    convertidas sem cópia (viram arrays somente leitura sobre o arquivo mapeado).
+    """
+    fonte = pa.memory_map(caminho, "r") if memory_map else pa.OSFile(caminho, "rb")
+    tabela = pa.ipc.open_file(fonte).read_all()
+    return tabela.to_pandas(split_blocks=True)
+
+
+def ler_livros(caminho_csv: str = CAMINHO_CSV, memory_map: bool = MEMORY_MAP_PADRAO) -> pd.DataFrame:
+    """
+    Lê os livros já com os tipos limpos: do Arrow, se ele estiver em dia com o
+    CSV, ou do próprio CSV (convertendo os tipos) caso contrário.
+
+    Raises:
+        FileNotFoundError: Se não existir nem o Arrow nem o CSV.
+    """
+    if colunar_atualizado(caminho_csv):
+        return ler_colunar(caminho_colunar(caminho_csv), memory_map)
+    return limpar_tipos(pd.read_csv(caminho_csv, sep=';'))
+
+
+def assinatura_livros(caminho_csv: str = CAMINHO_CSV) -> Tuple[Optional[Tuple[int, int]], ...]:
+    """(mtime em ns, tamanho) do CSV e do Arrow; None para o arquivo que não existir."""
+    assinaturas = []
+    for caminho in (caminho_csv, caminho_colunar(caminho_csv)):
+        try:
+            info = os.stat(caminho)
+            assinaturas.append((info.st_mtime_ns, info.st_size))
+        except FileNotFoundError:
+            assinaturas.append(None)
+    return tuple(assinaturas)
+
+
+if __name__ == "__main__":
+    # Gera o Arrow a partir de um CSV já existente (ex.: dados anteriores a este formato)
+    #   python -m scripts.armazenamento_livros [caminho_csv]
+    import sys
+
+    origem = sys.argv[1] if len(sys.argv) > 1 else CAMINHO_CSV
+    salvar_colunar(limpar_tipos(pd.read_csv(origem, sep=';')), caminho_colunar(origem))
+    print(f'✅ {caminho_colunar(origem)} gerado a partir de {origem}.')
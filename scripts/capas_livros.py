@@ -0,0 +1,237 @@
+# scripts/capas_livros.py
+"""
+Armazém local das capas dos livros, endereçado pelo conteúdo: cada imagem é
+gravada uma única vez, com o nome igual ao SHA-256 dos bytes
+(`objetos/ab/abcdef....jpg`), e um índice (`indice.json`) liga a URL original
+ao arquivo. Capas iguais em URLs diferentes ocupam um arquivo só.
+
+O scraping baixa as capas em paralelo, com o mesmo cliente HTTP do motor HTTP
+(concorrência limitada, limite de taxa e novas tentativas). As URLs que já
+estão no armazém não são baixadas de novo. Se o Pillow estiver instalado, as
+miniaturas de CAPAS_MINIATURAS (larguras em pixels) são geradas junto.
+
+A API serve as capas em GET /api/v1/covers/{hash} (ver api/capas.py).
+
+Uso (a partir da raiz do projeto, para baixar as capas do CSV atual):
+    python -m scripts.capas_livros
+    python -m scripts.capas_livros --csv data/info_livros.csv --concorrencia 8
+"""
+import argparse
+import asyncio
+import io
+import json
+import mimetypes
+import os
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from scripts.impressoes_paginas import hash_conteudo
+
+DIRETORIO_CAPAS = os.getenv("CAPAS_DIRETORIO", "data/capas")
+# Larguras (px) das miniaturas geradas junto com o download
+MINIATURAS_PADRAO = tuple(int(v) for v in os.getenv("CAPAS_MINIATURAS", "100,200").split(",") if v.strip())
+QUALIDADE_MINIATURA = 85
+EXTENSAO_PADRAO = ".jpg"
+
+
+class Capa(NamedTuple):
+    hash: str
+    caminho: str
+
+
+def _gravar_atomicamente(caminho: str, conteudo: bytes):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f'{caminho}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(conteudo)
+    os.replace(temporario, caminho)
+
+
+def _extensao(url: str, tipo: Optional[str]) -> str:
+    extensao = mimetypes.guess_extension((tipo or "").split(";")[0].strip()) if tipo else None
+    if not extensao:
+        extensao = os.path.splitext(url.split("?")[0])[1].lower()
+    return extensao if extensao in (".jpg", ".jpeg", ".png", ".gif", ".webp") else EXTENSAO_PADRAO
+
+
+class ArmazemCapas:
+    """
+    Capas em `diretorio`: objetos por hash, miniaturas por largura e o índice
+    URL -> nome do objeto. Quem só lê (a API) vê as capas novas sem reiniciar:
+    o índice é relido quando o arquivo muda.
+    """
+
+    def __init__(self, diretorio: str = DIRETORIO_CAPAS):
+        self.diretorio = diretorio
+        self._caminho_indice = os.path.join(diretorio, "indice.json")
+        self._indice: Dict[str, str] = {}
+        self._por_hash: Dict[str, str] = {}  # hash -> nome do objeto (o inverso do índice)
+        self._novos: Dict[str, str] = {}  # gravados por este processo, ainda fora do arquivo
+        self._assinatura: Optional[Tuple[int, int]] = None
+        self._trava = threading.Lock()
+
+    # --- leitura ---
+
+    def _atualizar_indice(self):
+        try:
+            info = os.stat(self._caminho_indice)
+        except FileNotFoundError:
+            return
+        assinatura = (info.st_mtime_ns, info.st_size)
+        if assinatura == self._assinatura:
+            return
+        with self._trava:
+            if assinatura == self._assinatura:
+                return
+            with open(self._caminho_indice, encoding="utf-8") as arquivo:
+                indice = json.load(arquivo)
+            # Troca de referência: leitores em outras threads veem o índice antigo ou o novo, inteiro
+            self._indice = {**indice, **self._novos}
+            self._por_hash = {os.path.splitext(nome)[0]: nome for nome in self._indice.values()}
+            self._assinatura = assinatura
+
+    def localizar(self, url: str) -> Optional[Capa]:
+        """A capa guardada para `url`, ou None se ela ainda não foi baixada."""
+        self._atualizar_indice()
+        nome = self._indice.get(url)
+        if nome is None:
+            return None
+        hash_capa = os.path.splitext(nome)[0]
+        return Capa(hash_capa, self.caminho_objeto(nome))
+
+    def localizar_hash(self, hash_capa: str) -> Optional[Capa]:
+        """A capa com o conteúdo `hash_capa`, ou None se ela não está no armazém."""
+        self._atualizar_indice()
+        nome = self._por_hash.get(hash_capa)
+        return None if nome is None else Capa(hash_capa, self.caminho_objeto(nome))
+
+    def __contains__(self, url: str) -> bool:
+        capa = self.localizar(url)
+        return capa is not None and os.path.exists(capa.caminho)
+
+    def caminho_objeto(self, nome: str) -> str:
+        return os.path.join(self.diretorio, "objetos", nome[:2], nome)
+
+    def caminho_miniatura(self, hash_capa: str, largura: int) -> str:
+        return os.path.join(self.diretorio, "miniaturas", str(largura), hash_capa[:2], f"{hash_capa}.jpg")
+
+    # --- escrita ---
+
+    def guardar(self, url: str, conteudo: bytes, tipo: Optional[str] = None) -> Tuple[Capa, bool]:
+        """
+        Grava a imagem e liga `url` a ela no índice em memória.
+
+        Returns:
+            tuple: A capa e se o conteúdo era novo (False: o mesmo arquivo já
+            estava no armazém, vindo de outra URL).
+        """
+        nome = hash_conteudo(conteudo) + _extensao(url, tipo)
+        caminho = self.caminho_objeto(nome)
+        novo = not os.path.exists(caminho)
+        if novo:
+            _gravar_atomicamente(caminho, conteudo)
+        with self._trava:
+            self._novos[url] = nome
+            self._indice = {**self._indice, url: nome}
+            self._por_hash = {**self._por_hash, os.path.splitext(nome)[0]: nome}
+        return Capa(os.path.splitext(nome)[0], caminho), novo
+
+    def salvar_indice(self):
+        """Grava o índice (o do arquivo mais as capas novas), trocando o arquivo de uma vez."""
+        self._atualizar_indice()
+        with self._trava:
+            conteudo = json.dumps(self._indice, ensure_ascii=False, sort_keys=True).encode("utf-8")
+            _gravar_atomicamente(self._caminho_indice, conteudo)
+            self._novos.clear()
+
+    def miniatura(self, capa: Capa, largura: int) -> Optional[str]:
+        """
+        Caminho da miniatura de `capa` com `largura` px (proporção mantida, nunca
+        maior que a original), gerando-a se ainda não existir. None sem o Pillow.
+        """
+        caminho = self.caminho_miniatura(capa.hash, largura)
+        if os.path.exists(caminho):
+            return caminho
+        try:
+            from PIL import Image
+        except ImportError:
+            return None
+
+        with Image.open(capa.caminho) as imagem:
+            imagem = imagem.convert("RGB")
+            if imagem.width > largura:
+                altura = max(1, round(imagem.height * largura / imagem.width))
+                imagem = imagem.resize((largura, altura), Image.Resampling.LANCZOS)
+            saida = io.BytesIO()
+            imagem.save(saida, "JPEG", quality=QUALIDADE_MINIATURA, optimize=True)
+        _gravar_atomicamente(caminho, saida.getvalue())
+        return caminho
+
+
+# ----------------------- DOWNLOAD -----------------------
+
+async def baixar_capas(urls: Iterable[str], armazem: ArmazemCapas, progresso=None,
+                       miniaturas: Tuple[int, ...] = MINIATURAS_PADRAO, **opcoes_cliente) -> Dict[str, int]:
+    """
+    Baixa em paralelo as capas de `urls` que ainda não estão no armazém e gera
+    as miniaturas. Falhas são registradas no progresso (se houver) e não
+    interrompem as demais.
+
+    Returns:
+        dict: Contagens de capas baixadas, já existentes, repetidas (mesmo conteúdo
+        de outra URL) e com erro.
+    """
+    # Import local: a API usa o armazém (leitura) sem precisar do cliente de scraping
+    from scripts.webscraping_http import ClienteScraping
+
+    distintas = list(dict.fromkeys(url for url in urls if url))
+    pendentes = [url for url in distintas if url not in armazem]
+    contagem = {"baixadas": 0, "existentes": len(distintas) - len(pendentes), "repetidas": 0, "erros": 0}
+
+    async def capa(url: str):
+        try:
+            resposta = await cliente.baixar(url)
+            guardada, nova = armazem.guardar(url, resposta.content, resposta.headers.get("content-type"))
+            for largura in miniaturas:
+                # Pillow fora do event loop: não segura os outros downloads
+                await asyncio.to_thread(armazem.miniatura, guardada, largura)
+        except Exception as erro:
+            contagem["erros"] += 1
+            if progresso is not None:
+                progresso.registrar_erro(url, erro)
+            return
+        contagem["baixadas" if nova else "repetidas"] += 1
+        if progresso is not None:
+            progresso.capa_processada()
+
+    async with ClienteScraping(**opcoes_cliente) as cliente:
+        await asyncio.gather(*(capa(url) for url in pendentes))
+    armazem.salvar_indice()
+    return contagem
+
+
+def rodar_download_capas(urls: List[str], progresso=None, diretorio: str = DIRETORIO_CAPAS,
+                         **opcoes_cliente) -> Dict[str, int]:
+    """Versão síncrona de `baixar_capas` (para o scraping, que roda numa thread)."""
+    armazem = ArmazemCapas(diretorio)
+    contagem = asyncio.run(baixar_capas(urls, armazem, progresso, **opcoes_cliente))
+    print(f'🖼️  Capas: {contagem["baixadas"]} baixadas, {contagem["existentes"]} já existentes, '
+          f'{contagem["repetidas"]} repetidas, {contagem["erros"]} com erro.')
+    return contagem
+
+
+def main():
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default="data/info_livros.csv")
+    parser.add_argument("--diretorio", default=DIRETORIO_CAPAS)
+    parser.add_argument("--concorrencia", type=int, default=16)
+    args = parser.parse_args()
+
+    urls = pd.read_csv(args.csv, sep=";", usecols=["imagem"])["imagem"].dropna().tolist()
+    rodar_download_capas(urls, diretorio=args.diretorio, concorrencia=args.concorrencia)
+
+
+if __name__ == "__main__":
+    main()
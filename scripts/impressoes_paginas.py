@@ -0,0 +1,101 @@
+# scripts/impressoes_paginas.py
+"""
+Armazém local de "impressões digitais" das páginas já raspadas: para cada URL
+guarda o ETag, o Last-Modified, o hash do conteúdo e o resultado já extraído
+(links de uma listagem ou campos de um livro). Permite que o scraping
+incremental faça requisições condicionais e só leia de novo as páginas que mudaram.
+"""
+import hashlib
+import json
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Set
+
+CAMINHO_PADRAO = "data/impressoes_paginas.db"
+
+
+class ImpressaoPagina(NamedTuple):
+    url: str
+    tipo: str                       # "listagem" ou "livro"
+    etag: Optional[str]
+    last_modified: Optional[str]
+    hash_conteudo: str
+    registro: Any                   # links (listagem) ou dicionário de campos (livro)
+
+
+def hash_conteudo(conteudo: bytes) -> str:
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+class ArmazemImpressoes:
+    """Impressões das páginas em um banco SQLite local (um registro por URL)."""
+
+    def __init__(self, caminho: str = CAMINHO_PADRAO):
+        self._conexao = sqlite3.connect(caminho)
+        self._conexao.execute(
+            """
+            CREATE TABLE IF NOT EXISTS paginas (
+                url TEXT PRIMARY KEY,
+                tipo TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                hash_conteudo TEXT NOT NULL,
+                registro TEXT NOT NULL,
+                atualizado_em TEXT NOT NULL
+            )
+            """
+        )
+        self._cache: Dict[str, ImpressaoPagina] = {
+            linha[0]: ImpressaoPagina(*linha[:5], json.loads(linha[5]))
+            for linha in self._conexao.execute(
+                "SELECT url, tipo, etag, last_modified, hash_conteudo, registro FROM paginas"
+            )
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def fechar(self):
+        self._conexao.close()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def obter(self, url: str) -> Optional[ImpressaoPagina]:
+        return self._cache.get(url)
+
+    def urls(self, tipo: str) -> Set[str]:
+        return {url for url, impressao in self._cache.items() if impressao.tipo == tipo}
+
+    @staticmethod
+    def cabecalhos_condicionais(impressao: Optional[ImpressaoPagina]) -> dict:
+        """Cabeçalhos If-None-Match / If-Modified-Since para revalidar a página."""
+        cabecalhos = {}
+        if impressao is not None:
+            if impressao.etag:
+                cabecalhos["If-None-Match"] = impressao.etag
+            if impressao.last_modified:
+                cabecalhos["If-Modified-Since"] = impressao.last_modified
+        return cabecalhos
+
+    def salvar(self, impressoes: Iterable[ImpressaoPagina]):
+        """Grava (ou substitui) as impressões em uma única transação."""
+        impressoes = list(impressoes)
+        agora = datetime.now().isoformat(timespec="seconds")
+        with self._conexao:
+            self._conexao.executemany(
+                "INSERT OR REPLACE INTO paginas VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(*i[:5], json.dumps(i.registro, ensure_ascii=False), agora) for i in impressoes],
+            )
+        for impressao in impressoes:
+            self._cache[impressao.url] = impressao
+
+    def remover(self, urls: Iterable[str]):
+        urls = list(urls)
+        with self._conexao:
+            self._conexao.executemany("DELETE FROM paginas WHERE url = ?", [(url,) for url in urls])
+        for url in urls:
+            self._cache.pop(url, None)
@@ -1,41 +1,158 @@
 # scripts/processamento_dados_ml.py
+import io
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 import pandas as pd
-from sklearn.preprocessing import LabelEncoder
-from sklearn.model_selection import train_test_split
+
+from scripts.armazenamento_livros import assinatura_livros, ler_livros
+
+CAMINHO_CODIFICACAO_CATEGORIAS = 'data/codificacao_categorias.json'
+COLUNAS_FEATURES = ["titulo", "preco", "avaliacao", "estoque", "disponibilidade", "categoria_codificada"]
+COLUNAS_NUMERICAS = ["preco", "avaliacao", "estoque", "disponibilidade", "categoria_codificada"]
 
 def carregar_dados(nome_arquivo:str = 'info_livros.csv'):
-    """Lê os dados do arquivo CSV do scraping."""
+    """
+    Lê os dados do scraping: do arquivo colunar (Arrow, por memory-map) se ele
+    estiver em dia com o CSV, ou do próprio CSV. Preço, avaliação e estoque já
+    chegam convertidos.
+    """
 
-    return pd.read_csv(f'data/{nome_arquivo}', sep=';') # Contando que sempre será salvo na pasta data
+    return ler_livros(f'data/{nome_arquivo}') # Contando que sempre será salvo na pasta data
 
-def ml_features():
+
+class CodificadorCategorias:
     """
-    Retorna um DataFrame pronto para ser usado como input de modelos ML.
-    Inclui: preco, avaliacao, estoque, disponibilidade (binária), categoria (codificada) e id do livro.
+    Codificação categoria -> inteiro persistida em JSON. Na primeira vez os
+    códigos seguem a ordem alfabética (como o LabelEncoder); categorias novas
+    recebem o próximo código livre e as removidas mantêm o seu, de modo que o
+    código de uma categoria não muda entre atualizações dos dados.
+    """
+
+    def __init__(self, caminho: str = CAMINHO_CODIFICACAO_CATEGORIAS):
+        self.caminho = caminho
+        try:
+            with open(caminho, encoding='utf-8') as arquivo:
+                self.categorias: List[str] = json.load(arquivo)
+        except FileNotFoundError:
+            self.categorias = []
+
+    def codificar(self, categorias: pd.Series) -> np.ndarray:
+        """Códigos das categorias, registrando (e persistindo) as que ainda não têm código."""
+        categorias = categorias.astype(str)
+        conhecidas = set(self.categorias)
+        novas = sorted(c for c in categorias.unique() if c not in conhecidas)
+        if novas:
+            self.categorias = self.categorias + novas
+            self._salvar()
+        return pd.Categorical(categorias, categories=self.categorias).codes.astype(np.int64)
+
+    def _salvar(self):
+        os.makedirs(os.path.dirname(self.caminho) or '.', exist_ok=True)
+        # Nome único por processo e thread: workers pré-fork podem gravar ao mesmo tempo
+        temporario = f'{self.caminho}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump(self.categorias, arquivo, ensure_ascii=False, indent=2)
+        os.replace(temporario, self.caminho)
+
+
+class ArmazemFeatures:
     """
-    df = carregar_dados()
-    
-    # Propostas de formatação de features para o projeto de recomendação de livros:
-    # 1 - Garantir colunas numéricas
-    # 2 - Mapear disponibilidade: "In stock" = 1, caso contrário = 0
-    # 3 - Codificar categoria
-    # 4 - Selecionar as colunas de features // todas menos as imagens
+    Features de ML calculadas uma vez por versão dos dados (assinatura dos
+    arquivos do scraping) e reaproveitadas pelos endpoints de ML. As divisões
+    treino/teste e as exportações numéricas também ficam em cache, por versão.
 
-    # 1. 
-    df['preco'] = pd.to_numeric(df['preco'], errors="coerce").fillna(0)
-    df['avaliacao'] = pd.to_numeric(df['avaliacao'], errors="coerce").fillna(0)
-    df['estoque'] = pd.to_numeric(df['estoque'], errors="coerce").fillna(0).astype(int)
+    Os DataFrames devolvidos são compartilhados entre chamadas e não devem ser alterados.
+    """
+
+    def __init__(self, caminho_csv: str = 'data/info_livros.csv',
+                 caminho_codificacao: str = CAMINHO_CODIFICACAO_CATEGORIAS):
+        self.caminho_csv = caminho_csv
+        self.codificador = CodificadorCategorias(caminho_codificacao)
+        self._trava = threading.Lock()
+        self._versao = None
+        self._features: Optional[pd.DataFrame] = None
+        self._divisoes: Dict[Tuple[float, int], Tuple[pd.DataFrame, pd.DataFrame]] = {}
+        self._exportacoes: Dict[tuple, bytes] = {}
+
+    def features(self) -> pd.DataFrame:
+        versao = assinatura_livros(self.caminho_csv)
+        with self._trava:
+            if self._features is None or versao != self._versao:
+                self._features = self._calcular(ler_livros(self.caminho_csv))
+                self._versao = versao
+                self._divisoes.clear()
+                self._exportacoes.clear()
+            return self._features
+
+    def _calcular(self, df: pd.DataFrame) -> pd.DataFrame:
+        # Propostas de formatação de features para o projeto de recomendação de livros:
+        # 1 - Garantir colunas numéricas (já feito no carregamento, ver scripts/armazenamento_livros.py)
+        # 2 - Mapear disponibilidade: "In stock" = 1, caso contrário = 0
+        # 3 - Codificar categoria (códigos estáveis entre atualizações)
+        # 4 - Selecionar as colunas de features // todas menos as imagens
+        disponibilidade = df['disponibilidade'].astype(str).str.strip().str.lower().eq("in stock").astype(np.int64)
+        return pd.DataFrame({
+            "titulo": df['titulo'],
+            "preco": df['preco'],
+            "avaliacao": df['avaliacao'],
+            "estoque": df['estoque'],
+            "disponibilidade": disponibilidade,
+            "categoria_codificada": self.codificador.codificar(df['categoria']),
+        }, columns=COLUNAS_FEATURES)
+
+    def divisao(self, test_size: float = 0.2, semente: int = 40) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Divisão treino/teste determinística (mesma semente, mesmo resultado), em cache por versão."""
+        # Import local: o scikit-learn só é carregado quando alguém pede a divisão (API sobe sem ele)
+        from sklearn.model_selection import train_test_split
+
+        features = self.features()
+        chave = (test_size, semente)
+        with self._trava:
+            if chave not in self._divisoes:
+                self._divisoes[chave] = tuple(train_test_split(features, test_size=test_size, random_state=semente))
+            return self._divisoes[chave]
+
+    def exportar(self, conjunto: str = "todos", test_size: float = 0.2, semente: int = 40) -> bytes:
+        """
+        Features numéricas em um arquivo .npz (NumPy) para treino de modelos:
+        `X` (float32, uma linha por livro), `colunas` (nomes das colunas de X) e
+        `ids` (id do livro na API, isto é, a posição da linha nos dados).
 
-    # 2. 
-    df['disponibilidade'] = df['disponibilidade'].apply(lambda x: 1 if str(x).strip().lower() == "in stock" else 0)
+        Args:
+            conjunto (str): "todos", "treino" ou "teste".
+        """
+        if conjunto == "todos":
+            dados = self.features()
+        else:
+            treino, teste = self.divisao(test_size, semente)
+            dados = treino if conjunto == "treino" else teste
 
-    # 3. 
-    le = LabelEncoder()
-    df['categoria_codificada'] = le.fit_transform(df['categoria'].astype(str))
+        chave = (conjunto, test_size, semente)
+        with self._trava:
+            if chave not in self._exportacoes:
+                saida = io.BytesIO()
+                np.savez(
+                    saida,
+                    X=dados[COLUNAS_NUMERICAS].to_numpy(dtype=np.float32),
+                    colunas=np.array(COLUNAS_NUMERICAS),
+                    ids=dados.index.to_numpy(dtype=np.int64),
+                )
+                self._exportacoes[chave] = saida.getvalue()
+            return self._exportacoes[chave]
 
-    # 4. 
-    colunas_final = ["titulo", "preco", "avaliacao", "estoque", "disponibilidade", "categoria_codificada"]
-    return df[colunas_final]
+
+armazem_features = ArmazemFeatures()
+
+def ml_features():
+    """
+    Retorna um DataFrame pronto para ser usado como input de modelos ML.
+    Inclui: titulo, preco, avaliacao, estoque, disponibilidade (binária) e categoria (codificada).
+    """
+    return armazem_features.features()
 
 
 def ml_training_data():
@@ -43,8 +160,6 @@ def ml_training_data():
     Retorna 80% dos dados (amostragem aleatória) para treinamento de modelos.
     Inclui todas as colunas de features.
     """
-    df = ml_features()
-
-    df_treino, _ = train_test_split(df, test_size=0.2, random_state=40)
+    df_treino, _ = armazem_features.divisao(test_size=0.2, semente=40)
 
-    return df_treino
\ No newline at end of file
+    return df_treino
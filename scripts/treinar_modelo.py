@@ -0,0 +1,62 @@
+# scripts/treinar_modelo.py
+"""
+Treina os modelos servidos por /api/v1/ml/predictions a partir das features de
+`scripts/processamento_dados_ml.py` e grava o artefato em data/modelo_livros.joblib.
+
+Um modelo por alvo: `avaliacao` (nota prevista a partir de preço, estoque,
+disponibilidade e categoria) e `preco` (preço previsto a partir de avaliação,
+estoque, disponibilidade e categoria).
+
+Uso (a partir da raiz do projeto):
+    python -m scripts.treinar_modelo
+"""
+from datetime import datetime
+
+import pandas as pd
+
+CAMINHO_MODELO = 'data/modelo_livros.joblib'
+
+# Colunas de entrada de cada alvo (todas as features numéricas, menos o próprio alvo)
+COLUNAS_POR_ALVO = {
+    "avaliacao": ["preco", "estoque", "disponibilidade", "categoria_codificada"],
+    "preco": ["avaliacao", "estoque", "disponibilidade", "categoria_codificada"],
+}
+
+
+def treinar_modelos(treino: pd.DataFrame, semente: int = 40) -> dict:
+    """
+    Ajusta um RandomForestRegressor para cada alvo.
+
+    Returns:
+        dict: Artefato com a versão (data do treino) e, por alvo, as colunas de
+        entrada (na ordem esperada) e o estimador ajustado.
+    """
+    from sklearn.ensemble import RandomForestRegressor
+
+    modelos = {}
+    for alvo, colunas in COLUNAS_POR_ALVO.items():
+        estimador = RandomForestRegressor(n_estimators=50, max_depth=10, random_state=semente, n_jobs=1)
+        estimador.fit(treino[colunas].to_numpy(dtype=float), treino[alvo].to_numpy(dtype=float))
+        modelos[alvo] = {"colunas": colunas, "estimador": estimador}
+    return {"versao": datetime.now().strftime("%Y%m%d%H%M%S"), "modelos": modelos}
+
+
+def main():
+    # Imports locais: a API importa este módulo (CAMINHO_MODELO) sem precisar do scikit-learn
+    import joblib
+    from sklearn.metrics import mean_absolute_error
+
+    from scripts.processamento_dados_ml import armazem_features
+
+    treino, teste = armazem_features.divisao(test_size=0.2, semente=40)
+    artefato = treinar_modelos(treino)
+    for alvo, modelo in artefato["modelos"].items():
+        previsto = modelo["estimador"].predict(teste[modelo["colunas"]].to_numpy(dtype=float))
+        print(f'📈 {alvo}: MAE no teste = {mean_absolute_error(teste[alvo], previsto):.3f}')
+
+    joblib.dump(artefato, CAMINHO_MODELO)
+    print(f'✅ Modelo {artefato["versao"]} salvo em {CAMINHO_MODELO}.')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,480 @@
+# scripts/webscraping_http.py
+"""
+Motor de scraping por HTTP para o Books to Scrape.
+
+O site é HTML estático, então não precisa de navegador: as páginas são baixadas
+com um cliente HTTP assíncrono (conexões reaproveitadas, concorrência limitada,
+limite de requisições por segundo por host e novas tentativas com espera
+exponencial) e lidas com o parser HTML da biblioteca padrão.
+
+Gera as mesmas colunas de `info_livros` do motor Selenium
+(scripts/webscraping_livros.py), com os mesmos valores.
+"""
+import asyncio
+import os
+import random
+import re
+import time
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+
+from scripts.armazenamento_livros import colunar_atualizado
+from scripts.impressoes_paginas import ArmazemImpressoes, ImpressaoPagina, hash_conteudo
+from scripts.webscraping_livros import (
+    AVALIACOES_NUMERICAS, COLUNAS_INFO_LIVROS, URL_BASE, ProgressoScraping, salvar_info_livros
+)
+
+CONCORRENCIA_PADRAO = 16
+REQUISICOES_POR_SEGUNDO_PADRAO = 50.0
+TENTATIVAS_PADRAO = 3
+ESPERA_BASE_SEGUNDOS = 0.5
+STATUS_REPETIVEIS = {429, 500, 502, 503, 504}
+CAMINHO_CSV = "data/info_livros.csv"
+CAMINHO_IMPRESSOES = "data/impressoes_paginas.db"
+
+
+# ----------------------- PARSERS HTML -----------------------
+
+class ParserListagem(HTMLParser):
+    """
+    Lê uma página de listagem: links dos livros (article.product_pod > h3 > a)
+    e o texto da paginação (li.current, ex.: "Page 1 of 50").
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.links: List[str] = []
+        self.paginacao = ""
+        self._dentro_produto = False
+        self._dentro_h3 = False
+        self._dentro_paginacao = False
+
+    def handle_starttag(self, tag, attrs):
+        atributos = dict(attrs)
+        classes = (atributos.get("class") or "").split()
+        if tag == "article" and "product_pod" in classes:
+            self._dentro_produto = True
+        elif tag == "h3" and self._dentro_produto:
+            self._dentro_h3 = True
+        elif tag == "a" and self._dentro_h3 and atributos.get("href"):
+            self.links.append(atributos["href"])
+        elif tag == "li" and "current" in classes:
+            self._dentro_paginacao = True
+
+    def handle_endtag(self, tag):
+        if tag == "article":
+            self._dentro_produto = False
+        elif tag == "h3":
+            self._dentro_h3 = False
+        elif tag == "li":
+            self._dentro_paginacao = False
+
+    def handle_data(self, data):
+        if self._dentro_paginacao:
+            self.paginacao += data
+
+
+class ParserLivro(HTMLParser):
+    """
+    Lê a página de um livro, reproduzindo os seletores do motor Selenium: o
+    primeiro elemento de cada classe na página (h1 de .product_main,
+    .price_color, .star-rating, .instock, textos de .breadcrumb e img de .thumbnail).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.titulo: Optional[str] = None
+        self.preco: Optional[str] = None
+        self.classe_avaliacao: Optional[str] = None
+        self.estoque_texto: Optional[str] = None
+        self.breadcrumb: List[str] = []
+        self.imagem: Optional[str] = None
+        self._captura: Optional[str] = None
+        self._texto: List[str] = []
+        self._profundidade_main = 0
+        self._dentro_breadcrumb = False
+        self._dentro_thumbnail = False
+
+    def _iniciar_captura(self, campo: str):
+        self._captura = campo
+        self._texto = []
+
+    def handle_starttag(self, tag, attrs):
+        atributos = dict(attrs)
+        classes = (atributos.get("class") or "").split()
+
+        if self._profundidade_main and tag == "div":
+            self._profundidade_main += 1
+        if tag == "div" and "product_main" in classes and self.titulo is None:
+            self._profundidade_main = 1
+        if tag == "div" and "thumbnail" in classes and self.imagem is None:
+            self._dentro_thumbnail = True
+
+        if tag == "h1" and self._profundidade_main and self.titulo is None:
+            self._iniciar_captura("titulo")
+        elif tag == "p" and "price_color" in classes and self.preco is None:
+            self._iniciar_captura("preco")
+        elif tag == "p" and "instock" in classes and self.estoque_texto is None:
+            self._iniciar_captura("estoque_texto")
+        elif tag == "ul" and "breadcrumb" in classes and not self.breadcrumb:
+            self._dentro_breadcrumb = True
+        elif tag == "li" and self._dentro_breadcrumb:
+            self._iniciar_captura("breadcrumb")
+        elif tag == "img" and self._dentro_thumbnail and self.imagem is None:
+            self.imagem = atributos.get("src")
+            self._dentro_thumbnail = False
+
+        if "star-rating" in classes and self.classe_avaliacao is None:
+            self.classe_avaliacao = atributos.get("class")
+
+    def handle_endtag(self, tag):
+        if self._profundidade_main and tag == "div":
+            self._profundidade_main -= 1
+        if tag == "ul" and self._dentro_breadcrumb:
+            self._dentro_breadcrumb = False
+
+        fecha = {"titulo": "h1", "preco": "p", "estoque_texto": "p", "breadcrumb": "li"}
+        if self._captura and fecha[self._captura] == tag:
+            texto = " ".join("".join(self._texto).split())
+            if self._captura == "breadcrumb":
+                self.breadcrumb.append(texto)
+            else:
+                setattr(self, self._captura, texto)
+            self._captura = None
+
+    def handle_data(self, data):
+        if self._captura:
+            self._texto.append(data)
+
+
+def ler_total_paginas(html: str) -> int:
+    """Número total de páginas a partir do texto "Page 1 of N" da paginação."""
+    parser = ParserListagem()
+    parser.feed(html)
+    numeros = re.findall(r"\d+", parser.paginacao)
+    return int(numeros[-1]) if numeros else 1
+
+
+def ler_links_livros(html: str, url_pagina: str) -> List[str]:
+    """Links absolutos dos livros de uma página de listagem."""
+    parser = ParserListagem()
+    parser.feed(html)
+    return [urljoin(url_pagina, link) for link in parser.links]
+
+
+def ler_info_livro(html: str, url_livro: str) -> dict:
+    """
+    Campos de `info_livros` de uma página de livro, com os mesmos tratamentos
+    do motor Selenium (ex.: categoria = terceira palavra do breadcrumb).
+
+    Raises:
+        ValueError: Se algum campo obrigatório não for encontrado na página.
+    """
+    parser = ParserLivro()
+    parser.feed(html)
+    if None in (parser.titulo, parser.preco, parser.classe_avaliacao, parser.estoque_texto, parser.imagem) \
+            or len(parser.breadcrumb) < 3:
+        raise ValueError("página de livro incompleta")
+
+    return {
+        'titulo': parser.titulo,
+        'preco': parser.preco.replace('£', '').strip(),
+        'avaliacao': AVALIACOES_NUMERICAS.get(parser.classe_avaliacao.split()[-1]),
+        'disponibilidade': parser.estoque_texto.split('(')[0].strip(),
+        'estoque': parser.estoque_texto.split('(')[1].split(' ')[0],
+        'categoria': " ".join(parser.breadcrumb).split(' ')[2],
+        'imagem': urljoin(url_livro, parser.imagem),
+    }
+
+
+# ----------------------- CLIENTE HTTP -----------------------
+
+class LimitadorTaxa:
+    """Limita as requisições por segundo de cada host (intervalo mínimo entre saídas)."""
+
+    def __init__(self, requisicoes_por_segundo: float):
+        self._intervalo = 1.0 / requisicoes_por_segundo if requisicoes_por_segundo > 0 else 0.0
+        self._proxima: Dict[str, float] = {}
+        self._travas: Dict[str, asyncio.Lock] = {}
+
+    async def aguardar(self, url: str):
+        if not self._intervalo:
+            return
+        host = urlsplit(url).netloc
+        trava = self._travas.setdefault(host, asyncio.Lock())
+        async with trava:
+            agora = time.monotonic()
+            liberacao = max(agora, self._proxima.get(host, agora))
+            self._proxima[host] = liberacao + self._intervalo
+        if liberacao > agora:
+            await asyncio.sleep(liberacao - agora)
+
+
+class ClienteScraping:
+    """
+    Cliente HTTP assíncrono com pool de conexões, concorrência máxima,
+    limite de taxa por host e novas tentativas com espera exponencial.
+    """
+
+    def __init__(self, concorrencia: int = CONCORRENCIA_PADRAO,
+                 requisicoes_por_segundo: float = REQUISICOES_POR_SEGUNDO_PADRAO,
+                 tentativas: int = TENTATIVAS_PADRAO, timeout: float = 30.0):
+        self._semaforo = asyncio.Semaphore(concorrencia)
+        self._limitador = LimitadorTaxa(requisicoes_por_segundo)
+        self._tentativas = tentativas
+        self.http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=concorrencia, max_keepalive_connections=concorrencia),
+            timeout=timeout,
+            follow_redirects=True,
+            headers={"User-Agent": "consulta-livros-scraper/1.0"},
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.http.aclose()
+
+    async def baixar(self, url: str, **kwargs) -> httpx.Response:
+        """
+        GET com novas tentativas para erros de rede e status 429/5xx.
+        Outros status de erro (ex.: 404) são levantados na hora; 304 (resposta a
+        uma requisição condicional) é devolvido normalmente.
+        """
+        for tentativa in range(self._tentativas):
+            try:
+                await self._limitador.aguardar(url)
+                async with self._semaforo:
+                    resposta = await self.http.get(url, **kwargs)
+                if resposta.status_code == 304:
+                    return resposta
+                if resposta.status_code not in STATUS_REPETIVEIS:
+                    resposta.raise_for_status()
+                    return resposta
+                erro: Exception = httpx.HTTPStatusError(
+                    f"status {resposta.status_code}", request=resposta.request, response=resposta
+                )
+            except httpx.TransportError as e:
+                erro = e
+            if tentativa + 1 < self._tentativas:
+                await asyncio.sleep(ESPERA_BASE_SEGUNDOS * 2 ** tentativa * (1 + random.random()))
+        raise erro
+
+
+# ----------------------- COLETA -----------------------
+
+async def coleta_links_livros_http(cliente: ClienteScraping, url_base: str = URL_BASE,
+                                   progresso: ProgressoScraping = None) -> List[str]:
+    """
+    Descobre o total de páginas e baixa todas as listagens em paralelo.
+
+    Returns:
+        list[str]: URLs dos livros, na ordem do site.
+    """
+    primeira = await cliente.baixar(url_base)
+    total_paginas = ler_total_paginas(primeira.text)
+    if progresso:
+        progresso.paginas_total = total_paginas
+        progresso.definir_etapa("links")
+
+    async def pagina(numero: int) -> List[str]:
+        url = f'{url_base}catalogue/page-{numero}.html'
+        links = ler_links_livros((await cliente.baixar(url)).text, url)
+        if progresso:
+            progresso.pagina_processada(len(links))
+        return links
+
+    paginas = await asyncio.gather(*(pagina(n) for n in range(1, total_paginas + 1)))
+    return [link for links in paginas for link in links]
+
+
+async def coleta_info_livros_http(cliente: ClienteScraping, links_livros: List[str],
+                                  progresso: ProgressoScraping = None) -> dict:
+    """
+    Baixa e lê as páginas dos livros em paralelo. Livros que falham depois de
+    todas as tentativas são registrados no progresso e ficam de fora.
+
+    Returns:
+        dict: Dicionário com listas de dados para cada campo dos livros, na ordem de `links_livros`.
+    """
+    async def livro(url: str) -> Optional[dict]:
+        try:
+            info = ler_info_livro((await cliente.baixar(url)).text, url)
+        except Exception as erro:
+            if progresso is None:
+                raise
+            progresso.registrar_erro(url, erro)
+            return None
+        if progresso:
+            progresso.livro_processado()
+        return info
+
+    resultados = await asyncio.gather(*(livro(url) for url in links_livros))
+    info_livros = {campo: [] for campo in COLUNAS_INFO_LIVROS}
+    for info in resultados:
+        if info is not None:
+            for campo in COLUNAS_INFO_LIVROS:
+                info_livros[campo].append(info[campo])
+    return info_livros
+
+
+async def coletar_livros_http(url_base: str = URL_BASE, progresso: ProgressoScraping = None,
+                              **opcoes_cliente) -> dict:
+    """Coleta todos os livros do site e retorna o dicionário `info_livros`."""
+    progresso = progresso or ProgressoScraping()
+    async with ClienteScraping(**opcoes_cliente) as cliente:
+        progresso.definir_etapa("paginas")
+        links_livros = await coleta_links_livros_http(cliente, url_base, progresso)
+        progresso.definir_etapa("livros")
+        return await coleta_info_livros_http(cliente, links_livros, progresso)
+
+
+# ----------------------- COLETA INCREMENTAL -----------------------
+
+async def _revalidar(cliente: ClienteScraping, armazem: ArmazemImpressoes, url: str):
+    """
+    Requisição condicional para `url`.
+
+    Returns:
+        tuple: (impressão anterior, resposta, hash do conteúdo, mudou). `mudou` é
+        False se o servidor respondeu 304 ou se o conteúdo tem o mesmo hash de antes.
+    """
+    anterior = armazem.obter(url)
+    resposta = await cliente.baixar(url, headers=armazem.cabecalhos_condicionais(anterior))
+    if resposta.status_code == 304 and anterior is not None:
+        return anterior, resposta, anterior.hash_conteudo, False
+    hash_atual = hash_conteudo(resposta.content)
+    return anterior, resposta, hash_atual, anterior is None or anterior.hash_conteudo != hash_atual
+
+
+def _impressao(url: str, tipo: str, resposta: httpx.Response, hash_atual: str, registro) -> ImpressaoPagina:
+    return ImpressaoPagina(
+        url, tipo, resposta.headers.get("etag"), resposta.headers.get("last-modified"), hash_atual, registro
+    )
+
+
+async def coletar_livros_incremental(armazem: ArmazemImpressoes, url_base: str = URL_BASE,
+                                     progresso: ProgressoScraping = None, **opcoes_cliente):
+    """
+    Coleta os livros reaproveitando o armazém de impressões: cada página já vista
+    é revalidada com If-None-Match/If-Modified-Since e só é lida de novo se o
+    servidor mandar um conteúdo com hash diferente. Livros que saíram das
+    listagens são removidos do armazém.
+
+    Returns:
+        tuple: O dicionário `info_livros` completo (na ordem do site) e o delta com
+        as contagens de livros novos, alterados, removidos e inalterados.
+    """
+    progresso = progresso or ProgressoScraping()
+    novas: List[ImpressaoPagina] = []
+    delta = {"novos": 0, "alterados": 0, "removidos": 0, "inalterados": 0, "paginas_nao_modificadas": 0}
+
+    async with ClienteScraping(**opcoes_cliente) as cliente:
+        progresso.definir_etapa("paginas")
+        primeira = await cliente.baixar(url_base)
+        total_paginas = ler_total_paginas(primeira.text)
+        progresso.paginas_total = total_paginas
+        progresso.definir_etapa("links")
+
+        async def pagina(numero: int) -> List[str]:
+            url = f'{url_base}catalogue/page-{numero}.html'
+            anterior, resposta, hash_atual, mudou = await _revalidar(cliente, armazem, url)
+            if mudou:
+                links = ler_links_livros(resposta.text, url)
+            else:
+                links = anterior.registro
+                delta["paginas_nao_modificadas"] += 1
+            if resposta.status_code != 304:
+                novas.append(_impressao(url, "listagem", resposta, hash_atual, links))
+            progresso.pagina_processada(len(links))
+            return links
+
+        paginas = await asyncio.gather(*(pagina(n) for n in range(1, total_paginas + 1)))
+        links_livros = [link for links in paginas for link in links]
+
+        progresso.definir_etapa("livros")
+
+        async def livro(url: str) -> Optional[dict]:
+            try:
+                anterior, resposta, hash_atual, mudou = await _revalidar(cliente, armazem, url)
+                if not mudou:
+                    delta["inalterados"] += 1
+                    delta["paginas_nao_modificadas"] += 1
+                    info = anterior.registro
+                else:
+                    info = ler_info_livro(resposta.text, url)
+                    if anterior is None:
+                        delta["novos"] += 1
+                    elif info != anterior.registro:
+                        delta["alterados"] += 1
+                    else:
+                        delta["inalterados"] += 1
+                if resposta.status_code != 304:
+                    novas.append(_impressao(url, "livro", resposta, hash_atual, info))
+            except Exception as erro:
+                progresso.registrar_erro(url, erro)
+                # Uma falha temporária não deve apagar um livro que já conhecíamos
+                anterior = armazem.obter(url)
+                if anterior is None:
+                    return None
+                delta["inalterados"] += 1
+                info = anterior.registro
+            progresso.livro_processado()
+            return info
+
+        resultados = await asyncio.gather(*(livro(url) for url in links_livros))
+
+    removidos = armazem.urls("livro") - set(links_livros)
+    delta["removidos"] = len(removidos)
+    armazem.salvar(novas)
+    armazem.remover(removidos | (armazem.urls("listagem") - {
+        f'{url_base}catalogue/page-{n}.html' for n in range(1, total_paginas + 1)
+    }))
+
+    info_livros = {campo: [] for campo in COLUNAS_INFO_LIVROS}
+    for info in resultados:
+        if info is not None:
+            for campo in COLUNAS_INFO_LIVROS:
+                info_livros[campo].append(info[campo])
+    return info_livros, delta
+
+
+def rodar_scraping_http(progresso: ProgressoScraping = None, url_base: str = URL_BASE,
+                        incremental: bool = False, caminho_impressoes: str = None, **opcoes_cliente):
+    """
+    Executa o scraping pelo motor HTTP e salva o CSV em data/info_livros.csv
+    (e a cópia colunar em data/info_livros.arrow).
+
+    No modo incremental, usa o armazém de impressões (data/impressoes_paginas.db)
+    para só baixar e ler o que mudou, e só regrava o CSV se algum livro foi
+    adicionado, alterado ou removido (ou se os arquivos ainda não existem).
+    """
+    progresso = progresso or ProgressoScraping()
+    print('🔄 Iniciando o scraper HTTP de livros do site Books to Scrape...')
+
+    if not incremental:
+        info_livros = asyncio.run(coletar_livros_http(url_base, progresso, **opcoes_cliente))
+        print(f'📘 {len(info_livros["titulo"])} livros processados com sucesso ({progresso.erros} com erro).')
+        progresso.definir_etapa("salvando")
+        salvar_info_livros(info_livros)
+        return
+
+    with ArmazemImpressoes(caminho_impressoes or CAMINHO_IMPRESSOES) as armazem:
+        info_livros, delta = asyncio.run(
+            coletar_livros_incremental(armazem, url_base, progresso, **opcoes_cliente)
+        )
+    progresso.registrar_delta(delta)
+    print(
+        f'📘 {len(info_livros["titulo"])} livros no catálogo: {delta["novos"]} novos, '
+        f'{delta["alterados"]} alterados, {delta["removidos"]} removidos, '
+        f'{delta["inalterados"]} inalterados ({progresso.erros} com erro).'
+    )
+    arquivos_em_dia = os.path.exists(CAMINHO_CSV) and colunar_atualizado(CAMINHO_CSV)
+    if delta["novos"] or delta["alterados"] or delta["removidos"] or not arquivos_em_dia:
+        progresso.definir_etapa("salvando")
+        salvar_info_livros(info_livros)
+    else:
+        print('✅ Nenhuma alteração; CSV mantido.')
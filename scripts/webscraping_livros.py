@@ -1,53 +1,162 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import TYPE_CHECKING
+
 import pandas as pd
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
+# O Selenium (e o webdriver_manager) só é importado quando o motor Selenium é
+# usado: a API importa este módulo na subida e o motor padrão é o HTTP
+if TYPE_CHECKING:
+    from selenium import webdriver
+
+from scripts.armazenamento_livros import salvar_livros
+
+URL_BASE = 'https://books.toscrape.com/'
+
+COLUNAS_INFO_LIVROS = ['titulo', 'preco', 'avaliacao', 'disponibilidade', 'estoque', 'categoria', 'imagem']
+
+AVALIACOES_NUMERICAS = {
+    'One': 1,
+    'Two': 2,
+    'Three': 3,
+    'Four': 4,
+    'Five': 5
+}
+
+
+class ProgressoScraping:
+    """
+    Contadores de andamento de uma execução do scraping. Pode ser lido por outra
+    thread (ex.: a API consultando o status de um job) enquanto o scraping roda.
+    """
+
+    MAX_ERROS_GUARDADOS = 20
 
-from webdriver_manager.chrome import ChromeDriverManager
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.etapa = "pendente"
+        self.paginas_total = 0
+        self.paginas_processadas = 0
+        self.links_coletados = 0
+        self.livros_processados = 0
+        self.capas_processadas = 0
+        self.erros = 0
+        self.ultimos_erros: list[str] = []
+        self.delta: dict = None
+        self.duracoes_etapas: dict = {}
+        self._inicio_etapa: float = None
 
+    def definir_etapa(self, etapa: str):
+        """Muda de etapa; a duração da etapa anterior fica em `duracoes_etapas` (em segundos)."""
+        with self._trava:
+            self._fechar_etapa()
+            self.etapa = etapa
+            self._inicio_etapa = time.perf_counter()
 
-def coleta_quantidade_paginas(driver:webdriver):
+    def encerrar_etapa(self):
+        """Fecha a etapa atual (a última de uma execução) sem abrir outra."""
+        with self._trava:
+            self._fechar_etapa()
+
+    def _fechar_etapa(self):
+        if self._inicio_etapa is not None:
+            # Uma etapa pode se repetir (ex.: "links" no modo incremental); as durações se somam
+            duracao = time.perf_counter() - self._inicio_etapa
+            self.duracoes_etapas[self.etapa] = self.duracoes_etapas.get(self.etapa, 0.0) + duracao
+            self._inicio_etapa = None
+
+    def pagina_processada(self, links: int):
+        with self._trava:
+            self.paginas_processadas += 1
+            self.links_coletados += links
+
+    def livro_processado(self):
+        with self._trava:
+            self.livros_processados += 1
+
+    def capa_processada(self):
+        with self._trava:
+            self.capas_processadas += 1
+
+    def registrar_delta(self, delta: dict):
+        """Guarda as contagens de livros novos, alterados, removidos e inalterados (modo incremental)."""
+        with self._trava:
+            self.delta = dict(delta)
+
+    def registrar_erro(self, url: str, erro: Exception):
+        with self._trava:
+            self.erros += 1
+            self.ultimos_erros.append(f"{url}: {erro}")
+            del self.ultimos_erros[:-self.MAX_ERROS_GUARDADOS]
+
+    def para_dict(self) -> dict:
+        with self._trava:
+            return {
+                "etapa": self.etapa,
+                "paginas_total": self.paginas_total,
+                "paginas_processadas": self.paginas_processadas,
+                "links_coletados": self.links_coletados,
+                "livros_processados": self.livros_processados,
+                "capas_processadas": self.capas_processadas,
+                "erros": self.erros,
+                "ultimos_erros": list(self.ultimos_erros),
+                "delta": dict(self.delta) if self.delta is not None else None,
+                "duracoes_etapas": {etapa: round(segundos, 3) for etapa, segundos in self.duracoes_etapas.items()},
+            }
+
+
+def coleta_quantidade_paginas(driver:webdriver, url_base:str = URL_BASE):
     """
     Coleta a quantidade total de páginas no site principal.
 
     Args:
         driver (webdriver): Instância do navegador Selenium.
+        url_base (str): Endereço raiz do site.
 
     Returns:
         int: Número total de páginas.
     """
 
-    url = 'https://books.toscrape.com/'
-    driver.get(url)
+    from selenium.webdriver.common.by import By
+
+    driver.get(url_base)
     paginacao = driver.find_element(By.CLASS_NAME, 'current').text
     total_paginas = paginacao.split(' ')[-1]
     return int(total_paginas)
 
-def coleta_links_livros(driver:webdriver, total_paginas:int):
+def coleta_links_livros(driver:webdriver, total_paginas:int, progresso:ProgressoScraping = None,
+                        url_base:str = URL_BASE):
     """
     Percorre todas as páginas do site e coleta os links individuais de cada livro.
 
     Args:
         driver (webdriver): Instância do navegador Selenium.
         total_paginas (int): Total de páginas no site.
+        progresso (ProgressoScraping, opcional): Recebe a contagem de páginas processadas.
+        url_base (str): Endereço raiz do site.
 
     Returns:
         list[str]: Lista de URLs dos livros.
     """
 
+    from selenium.webdriver.common.by import By
+
     links_livros = []
     for pagina in range(1, total_paginas+1):
-        url = f'https://books.toscrape.com/catalogue/page-{pagina}.html'
+        url = f'{url_base}catalogue/page-{pagina}.html'
         driver.get(url)
         containers_livros = driver.find_elements(By.CLASS_NAME, 'product_pod')
         for container in containers_livros:
             link_livro = container.find_element(By.TAG_NAME, 'h3').find_element(By.TAG_NAME, 'a').get_attribute('href')
             links_livros.append(link_livro)
+        if progresso:
+            progresso.pagina_processada(len(containers_livros))
     return links_livros
 
-def coleta_info_livros(driver:webdriver, links_livros:list[str]):
+def coleta_info_livros(driver:webdriver, links_livros:list[str], progresso:ProgressoScraping = None):
     """
     Visita cada página de livro individual e coleta informações como título, preço, 
     avaliacao, disponibilidade, estoque, categoria e url da imagem.
@@ -55,48 +164,61 @@ def coleta_info_livros(driver:webdriver, links_livros:list[str]):
     Args:
         driver (webdriver): Instância do navegador Selenium.
         links_livros (list[str]): Lista de URLs de cada livro.
+        progresso (ProgressoScraping, opcional): Recebe a contagem de livros processados
+            e os erros. Com ele, um livro que falha é registrado e pulado; sem ele,
+            o erro interrompe a coleta.
 
     Returns:
         dict: Dicionário com listas de dados para cada campo dos livros.
     """
 
-    info_livros = {
-        'titulo': [],
-        'preco': [],
-        'avaliacao': [],
-        'disponibilidade': [],
-        'estoque': [],
-        'categoria': [],
-        'imagem': []
-    }
-    
-    avaliacoes_numericas = {
-    'One': 1,
-    'Two': 2,
-    'Three': 3,
-    'Four': 4,
-    'Five': 5
-    }
+    from selenium.webdriver.common.by import By
+
+    info_livros = {campo: [] for campo in COLUNAS_INFO_LIVROS}
 
     for link_livro in links_livros:
-        driver.get(link_livro)
-        
-        info_livros['titulo'].append(driver.find_element(By.CLASS_NAME, 'product_main').find_element(By.TAG_NAME, 'h1').text)
-        info_livros['preco'].append(driver.find_element(By.CLASS_NAME, 'price_color').text.replace('£', '').strip())
-        info_livros['avaliacao'].append(avaliacoes_numericas.get(driver.find_element(By.CLASS_NAME, 'star-rating').get_attribute('class').split()[-1]))
-        info_livros['disponibilidade'].append(driver.find_element(By.CLASS_NAME, 'instock').text.split('(')[0].strip())
-        info_livros['estoque'].append(driver.find_element(By.CLASS_NAME, 'instock').text.split('(')[1].split(' ')[0])
-        info_livros['categoria'].append(driver.find_element(By.CLASS_NAME, 'breadcrumb').text.split(' ')[2]) 
-        info_livros['imagem'].append(driver.find_element(By.CLASS_NAME, 'thumbnail').find_element(By.TAG_NAME, 'img').get_attribute('src'))
+        try:
+            driver.get(link_livro)
+
+            # Os campos são lidos antes de qualquer append para que um erro no meio
+            # da página não deixe as listas com tamanhos diferentes
+            livro = {
+                'titulo': driver.find_element(By.CLASS_NAME, 'product_main').find_element(By.TAG_NAME, 'h1').text,
+                'preco': driver.find_element(By.CLASS_NAME, 'price_color').text.replace('£', '').strip(),
+                'avaliacao': AVALIACOES_NUMERICAS.get(driver.find_element(By.CLASS_NAME, 'star-rating').get_attribute('class').split()[-1]),
+                'disponibilidade': driver.find_element(By.CLASS_NAME, 'instock').text.split('(')[0].strip(),
+                'estoque': driver.find_element(By.CLASS_NAME, 'instock').text.split('(')[1].split(' ')[0],
+                'categoria': driver.find_element(By.CLASS_NAME, 'breadcrumb').text.split(' ')[2],
+                'imagem': driver.find_element(By.CLASS_NAME, 'thumbnail').find_element(By.TAG_NAME, 'img').get_attribute('src'),
+            }
+        except Exception as erro:
+            if progresso is None:
+                raise
+            progresso.registrar_erro(link_livro, erro)
+            continue
+
+        for campo, valor in livro.items():
+            info_livros[campo].append(valor)
+        if progresso:
+            progresso.livro_processado()
 
     return info_livros
 
 
 # ----------------------- PROGRAMA PRINCIPAL -----------------------
-def main ():
-    print('🔄 Iniciando o scraper de livros do site Books to Scrape...')
+def criar_driver() -> webdriver.Chrome:
+    """
+    Cria o navegador Chrome em modo oculto (headless) usado pelo scraping.
+
+    Returns:
+        webdriver.Chrome: Instância do navegador Selenium.
+    """
+
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
 
-    # Configuração do navegador
     print('🛠️  Configurando o navegador...')
     options = Options()
 
@@ -108,33 +230,111 @@ def main ():
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    return webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+
+def main (progresso:ProgressoScraping = None):
+    print('🔄 Iniciando o scraper de livros do site Books to Scrape...')
+    progresso = progresso or ProgressoScraping()
+
+    # Configuração do navegador
+    driver = criar_driver()
 
     # Coleta de dados
-    print('🌐 1/4 Encontrando total de páginas...')
-    total_paginas = coleta_quantidade_paginas(driver)
-    print(f'📄 {total_paginas} páginas encontradas.')
+    try:
+        print('🌐 1/4 Encontrando total de páginas...')
+        progresso.definir_etapa("paginas")
+        total_paginas = coleta_quantidade_paginas(driver)
+        progresso.paginas_total = total_paginas
+        print(f'📄 {total_paginas} páginas encontradas.')
 
-    print('🌐 2/4 Coletando links de todos os livros...')
-    links_livros = coleta_links_livros(driver, total_paginas)
-    print(f'🔗 {len(links_livros)} links coletados.')
+        print('🌐 2/4 Coletando links de todos os livros...')
+        progresso.definir_etapa("links")
+        links_livros = coleta_links_livros(driver, total_paginas, progresso)
+        print(f'🔗 {len(links_livros)} links coletados.')
 
-    print('🌐 3/4 Coletando as informações de cada um dos livros...')
-    info_livros = coleta_info_livros(driver, links_livros)
-    print(f'📘 {len(info_livros["titulo"])} livros processados com sucesso.')
+        print('🌐 3/4 Coletando as informações de cada um dos livros...')
+        progresso.definir_etapa("livros")
+        info_livros = coleta_info_livros(driver, links_livros, progresso)
+        print(f'📘 {len(info_livros["titulo"])} livros processados com sucesso ({progresso.erros} com erro).')
 
-    driver.quit()
-    print('🧹 Navegador encerrado.')
+    finally:
+        driver.quit()
+        print('🧹 Navegador encerrado.')
 
-    # Salvamento dos dados
-    # nome_arquivo_csv = input('💾 Escreva um nome para o arquivo de dados (apenas o nome, sem o formato .csv): ')
-    nome_arquivo_csv = "info_livros"
     print('📂 4/4 Salvando arquivo...')
-    tabela_livros = pd.DataFrame(info_livros)
-    tabela_livros.to_csv(f'data/{nome_arquivo_csv}.csv', index = False, sep = ';')
+    progresso.definir_etapa("salvando")
+    salvar_info_livros(info_livros)
+
+def salvar_info_livros(info_livros:dict, nome_arquivo_csv:str = "info_livros"):
+    """
+    Salva os dados coletados em data/<nome_arquivo_csv>.csv (separador ';') e
+    em data/<nome_arquivo_csv>.arrow (colunar, com os tipos já convertidos).
+
+    Args:
+        info_livros (dict): Dicionário com listas de dados para cada campo dos livros.
+        nome_arquivo_csv (str): Nome do arquivo, sem a extensão.
+    """
+
+    # nome_arquivo_csv = input('💾 Escreva um nome para o arquivo de dados (apenas o nome, sem o formato .csv): ')
+    tabela_livros = pd.DataFrame(info_livros, columns=COLUNAS_INFO_LIVROS)
+    # CSV de exportação + cópia colunar (Arrow) com os tipos limpos, lida pela API e pelo ML
+    salvar_livros(tabela_livros, f'data/{nome_arquivo_csv}.csv')
     print('✅ Arquivo salvo na pasta /data.')
 
 # main()
 
-def rodar_scraping():
-    main()
\ No newline at end of file
+def rodar_scraping(progresso:ProgressoScraping = None, motor:str = None, incremental:bool = None,
+                   capas:bool = None):
+    """
+    Executa o scraping e salva o CSV.
+
+    Args:
+        progresso (ProgressoScraping, opcional): Recebe o andamento da execução.
+        motor (str, opcional): "http" (cliente HTTP assíncrono, padrão) ou "selenium".
+            Se omitido, usa a variável de ambiente SCRAPING_MOTOR. Se o motor HTTP
+            falhar, o Selenium é usado como alternativa.
+        incremental (bool, opcional): No motor HTTP, revalida as páginas já vistas
+            com requisições condicionais e só lê de novo as que mudaram. Se omitido,
+            usa a variável de ambiente SCRAPING_INCREMENTAL (padrão: ativado).
+        capas (bool, opcional): Depois de salvar o CSV, baixa as capas que ainda não
+            estão no armazém local (scripts/capas_livros.py). Se omitido, usa a
+            variável de ambiente SCRAPING_CAPAS (padrão: ativado).
+    """
+
+    motor = (motor or os.getenv("SCRAPING_MOTOR", "http")).lower()
+    if incremental is None:
+        incremental = os.getenv("SCRAPING_INCREMENTAL", "1").lower() not in ("0", "false", "nao", "não")
+    if capas is None:
+        capas = os.getenv("SCRAPING_CAPAS", "1").lower() not in ("0", "false", "nao", "não")
+    executado = False
+    if motor == "http":
+        # Import local: o módulo HTTP importa deste as constantes e o ProgressoScraping
+        from scripts.webscraping_http import rodar_scraping_http
+        try:
+            rodar_scraping_http(progresso, incremental=incremental)
+            executado = True
+        except Exception as erro:
+            print(f'⚠️  Motor HTTP falhou ({erro}); usando o Selenium.')
+    if not executado:
+        main(progresso)
+    if capas:
+        baixar_capas_catalogo(progresso)
+
+def baixar_capas_catalogo(progresso:ProgressoScraping = None, caminho_csv:str = "data/info_livros.csv"):
+    """
+    Baixa as capas dos livros do CSV salvo que ainda não estão no armazém local.
+    Uma falha aqui não derruba o scraping: o CSV já foi salvo e a API serve as
+    capas que faltarem redirecionando para a URL original.
+    """
+
+    from scripts.capas_livros import rodar_download_capas
+
+    if progresso:
+        progresso.definir_etapa("capas")
+    try:
+        urls = pd.read_csv(caminho_csv, sep=';', usecols=['imagem'])['imagem'].dropna().tolist()
+        rodar_download_capas(urls, progresso)
+    except Exception as erro:
+        print(f'⚠️  Download das capas falhou ({erro}).')
+        if progresso:
+            progresso.registrar_erro("capas", erro)
\ No newline at end of file
@@ -1,2 +1,5 @@
 #!/bin/bash
-uvicorn api.main:app --host 0.0.0.0 --port 10000
+# WEB_CONCURRENCY > 1: vários workers com o catálogo carregado uma vez antes do fork (api/servidor.py)
+# O proxy do Render chega ao serviço pela rede privada: confia no X-Forwarded-For vindo dela (api/servidor.py)
+export FORWARDED_ALLOW_IPS="${FORWARDED_ALLOW_IPS:-10.0.0.0/8,172.16.0.0/12,192.168.0.0/16,127.0.0.1}"
+exec python -m api.servidor --host 0.0.0.0 --port 10000
@@ -0,0 +1,52 @@
+# tests/atualizar_fixtures.py
+"""
+Baixa de novo, do Books to Scrape, as páginas salvas em
+tests/fixtures/books_toscrape: a página inicial, a primeira listagem, os 20
+livros dela e a folha de estilos do tema (usada pelo teste com Selenium).
+
+Os valores esperados (esperados.csv) não são regerados: eles vêm do CSV
+coletado pelo motor Selenium e são o gabarito que as páginas precisam
+reproduzir.
+
+Uso (a partir da raiz do projeto):
+    python -m tests.atualizar_fixtures
+"""
+import argparse
+import os
+
+import httpx
+
+from scripts.webscraping_http import ler_links_livros
+from scripts.webscraping_livros import URL_BASE
+
+DIRETORIO = os.path.join(os.path.dirname(__file__), "fixtures", "books_toscrape")
+
+
+def baixar(cliente: httpx.Client, url_base: str, caminho: str) -> str:
+    resposta = cliente.get(url_base + caminho)
+    resposta.raise_for_status()
+    destino = os.path.join(DIRETORIO, *caminho.split("/"))
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    with open(destino, "wb") as arquivo:
+        arquivo.write(resposta.content)
+    # O servidor não declara o charset; as páginas são UTF-8
+    return resposta.content.decode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url-base", default=URL_BASE)
+    args = parser.parse_args()
+
+    with httpx.Client(timeout=30, follow_redirects=True) as cliente:
+        baixar(cliente, args.url_base, "index.html")
+        baixar(cliente, args.url_base, "static/oscar/css/styles.css")
+        listagem = baixar(cliente, args.url_base, "catalogue/page-1.html")
+        links = ler_links_livros(listagem, f"{args.url_base}catalogue/page-1.html")
+        for link in links:
+            baixar(cliente, args.url_base, link.removeprefix(args.url_base))
+    print(f"✅ {len(links)} páginas de livro salvas em {DIRETORIO}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from benchmarks.site_local import ServidorPaginas
+
+DIRETORIO_FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "books_toscrape")
+URL_ORIGINAL = "https://books.toscrape.com/"
+
+
+@pytest.fixture(scope="session")
+def diretorio_site(tmp_path_factory) -> str:
+    """
+    Cópia das páginas salvas em que a paginação anuncia uma única página: só a
+    primeira listagem foi salva, e os motores pediriam as outras 49.
+    """
+    destino = tmp_path_factory.mktemp("books_toscrape")
+    shutil.copytree(DIRETORIO_FIXTURES, destino, dirs_exist_ok=True)
+    for caminho in (destino / "index.html", destino / "catalogue" / "page-1.html"):
+        html = caminho.read_text(encoding="utf-8")
+        assert "Page 1 of 50" in html
+        caminho.write_text(html.replace("Page 1 of 50", "Page 1 of 1"), encoding="utf-8")
+    return str(destino)
+
+
+@pytest.fixture(scope="session")
+def site(diretorio_site):
+    with ServidorPaginas(diretorio_site) as servidor:
+        yield servidor
+
+
+@pytest.fixture(scope="session")
+def esperados() -> pd.DataFrame:
+    """Linhas do CSV coletado no site real, com as URLs relativas à raiz do site."""
+    dados = pd.read_csv(os.path.join(DIRETORIO_FIXTURES, "esperados.csv"), sep=";", dtype=str)
+    return dados.assign(imagem=dados["imagem"].str.removeprefix(URL_ORIGINAL))
+
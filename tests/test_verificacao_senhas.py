@@ -0,0 +1,44 @@
+from api.verificacao_senhas import LimitadorTentativas
+
+
+def test_logins_aceitos_nao_contam_para_o_ip():
+    limitador = LimitadorTentativas(por_usuario=5, por_ip=3)
+
+    # Vários usuários atrás do mesmo proxy/NAT, todos com a senha certa
+    for i in range(10):
+        assert limitador.registrar(f"usuario{i}", "10.0.0.1") is None
+        limitador.sucesso(f"usuario{i}", "10.0.0.1")
+
+    assert limitador.registrar("outro", "10.0.0.1") is None
+
+
+def test_falhas_bloqueiam_o_ip():
+    limitador = LimitadorTentativas(por_usuario=5, por_ip=3)
+
+    for i in range(3):
+        assert limitador.registrar(f"usuario{i}", "10.0.0.1") is None
+
+    assert limitador.registrar("usuario_certo", "10.0.0.1") is not None
+    assert limitador.registrar("usuario_certo", "10.0.0.2") is None
+
+
+def test_sucesso_zera_o_usuario_mas_mantem_as_falhas_do_ip():
+    limitador = LimitadorTentativas(por_usuario=3, por_ip=3)
+
+    assert limitador.registrar("ana", "10.0.0.1") is None  # senha errada
+    assert limitador.registrar("ana", "10.0.0.1") is None  # senha errada
+    assert limitador.registrar("ana", "10.0.0.1") is None
+    limitador.sucesso("ana", "10.0.0.1")
+
+    # Sem o sucesso, a ana estaria no limite; o IP segue com as duas falhas
+    assert limitador.registrar("ana", "10.0.0.1") is None
+    assert limitador.registrar("bia", "10.0.0.1") is not None
+
+
+def test_cancelar_devolve_a_tentativa_nao_verificada():
+    limitador = LimitadorTentativas(por_usuario=1, por_ip=1)
+
+    assert limitador.registrar("ana", "10.0.0.1") is None
+    limitador.cancelar("ana", "10.0.0.1")  # pool saturado: a senha nem foi verificada
+
+    assert limitador.registrar("ana", "10.0.0.1") is None
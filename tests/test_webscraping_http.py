@@ -0,0 +1,92 @@
+import asyncio
+import os
+
+import httpx
+import pandas as pd
+import pytest
+
+from scripts.impressoes_paginas import ArmazemImpressoes
+from scripts.webscraping_http import (
+    ClienteScraping, coletar_livros_http, coletar_livros_incremental, ler_info_livro, ler_links_livros,
+    ler_total_paginas,
+)
+from scripts.webscraping_livros import COLUNAS_INFO_LIVROS, ProgressoScraping
+from tests.conftest import DIRETORIO_FIXTURES, URL_ORIGINAL
+
+
+def ler_pagina(caminho: str) -> str:
+    with open(os.path.join(DIRETORIO_FIXTURES, *caminho.split("/")), encoding="utf-8") as arquivo:
+        return arquivo.read()
+
+
+def como_tabela(info_livros: dict, url_base: str) -> pd.DataFrame:
+    tabela = pd.DataFrame(info_livros, columns=COLUNAS_INFO_LIVROS).astype(str)
+    return tabela.assign(imagem=tabela["imagem"].str.removeprefix(url_base))
+
+
+def test_listagem_salva_tem_50_paginas_e_20_livros():
+    assert ler_total_paginas(ler_pagina("index.html")) == 50
+    assert ler_total_paginas(ler_pagina("catalogue/page-1.html")) == 50
+
+    url_pagina = f"{URL_ORIGINAL}catalogue/page-1.html"
+    links = ler_links_livros(ler_pagina("catalogue/page-1.html"), url_pagina)
+    assert len(links) == 20
+    assert links[0] == f"{URL_ORIGINAL}catalogue/a-light-in-the-attic_1000/index.html"
+    assert links[-1] == f"{URL_ORIGINAL}catalogue/its-only-the-himalayas_981/index.html"
+    # Na página inicial os links são relativos à raiz, mas apontam para os mesmos livros
+    assert ler_links_livros(ler_pagina("index.html"), URL_ORIGINAL) == links
+
+
+def test_parser_de_livro_reproduz_o_csv_coletado(esperados):
+    url_pagina = f"{URL_ORIGINAL}catalogue/page-1.html"
+    links = ler_links_livros(ler_pagina("catalogue/page-1.html"), url_pagina)
+
+    linhas = [ler_info_livro(ler_pagina(link.removeprefix(URL_ORIGINAL)), link) for link in links]
+
+    resultado = como_tabela({campo: [linha[campo] for linha in linhas] for campo in COLUNAS_INFO_LIVROS}, URL_ORIGINAL)
+    pd.testing.assert_frame_equal(resultado, esperados)
+
+
+def test_parser_de_livro_rejeita_pagina_incompleta():
+    html = ler_pagina("catalogue/olio_984/index.html").replace('class="price_color"', 'class="preco"')
+    with pytest.raises(ValueError):
+        ler_info_livro(html, f"{URL_ORIGINAL}catalogue/olio_984/index.html")
+
+
+def test_coleta_http_pelo_servidor_local(site, esperados):
+    progresso = ProgressoScraping()
+
+    info_livros = asyncio.run(coletar_livros_http(site.url_base, progresso, requisicoes_por_segundo=0))
+
+    pd.testing.assert_frame_equal(como_tabela(info_livros, site.url_base), esperados)
+    assert progresso.paginas_processadas == 1
+    assert progresso.livros_processados == 20
+    assert progresso.erros == 0
+
+
+def test_cliente_falha_em_pagina_inexistente(site):
+    async def baixar():
+        async with ClienteScraping(requisicoes_por_segundo=0) as cliente:
+            await cliente.baixar(f"{site.url_base}catalogue/page-2.html")
+
+    with pytest.raises(httpx.HTTPStatusError) as erro:
+        asyncio.run(baixar())
+    assert erro.value.response.status_code == 404
+
+
+def test_coleta_incremental_so_le_de_novo_o_que_mudou(site, esperados, tmp_path):
+    with ArmazemImpressoes(str(tmp_path / "impressoes.db")) as armazem:
+        info_livros, delta = asyncio.run(
+            coletar_livros_incremental(armazem, site.url_base, requisicoes_por_segundo=0)
+        )
+        pd.testing.assert_frame_equal(como_tabela(info_livros, site.url_base), esperados)
+        assert delta["novos"] == 20
+
+        # O servidor responde 304 às requisições condicionais: nada é lido de novo
+        info_livros, delta = asyncio.run(
+            coletar_livros_incremental(armazem, site.url_base, requisicoes_por_segundo=0)
+        )
+        pd.testing.assert_frame_equal(como_tabela(info_livros, site.url_base), esperados)
+        assert delta["novos"] == delta["alterados"] == delta["removidos"] == 0
+        assert delta["inalterados"] == 20
+        assert delta["paginas_nao_modificadas"] == 21
@@ -0,0 +1,75 @@
+import shutil
+
+import pandas as pd
+import pytest
+
+import scripts.webscraping_http as webscraping_http
+import scripts.webscraping_livros as webscraping_livros
+from scripts.webscraping_livros import (
+    COLUNAS_INFO_LIVROS, ProgressoScraping, coleta_info_livros, coleta_links_livros, coleta_quantidade_paginas,
+    rodar_scraping,
+)
+
+CHROME = next(
+    (nome for nome in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser") if shutil.which(nome)),
+    None,
+)
+
+
+@pytest.fixture
+def motores(monkeypatch):
+    """Troca os dois motores por versões que só registram a chamada."""
+    chamadas = []
+
+    def http(progresso=None, **opcoes):
+        chamadas.append(("http", progresso))
+
+    def selenium(progresso=None):
+        chamadas.append(("selenium", progresso))
+
+    monkeypatch.setattr(webscraping_http, "rodar_scraping_http", http)
+    monkeypatch.setattr(webscraping_livros, "main", selenium)
+    return chamadas
+
+
+def test_motor_http_nao_aciona_o_selenium(motores):
+    progresso = ProgressoScraping()
+
+    rodar_scraping(progresso, motor="http", incremental=False, capas=False)
+
+    assert motores == [("http", progresso)]
+
+
+def test_falha_do_motor_http_cai_no_selenium(motores, monkeypatch):
+    def http_com_falha(progresso=None, **opcoes):
+        motores.append(("http", progresso))
+        raise RuntimeError("site fora do ar")
+
+    monkeypatch.setattr(webscraping_http, "rodar_scraping_http", http_com_falha)
+    progresso = ProgressoScraping()
+
+    rodar_scraping(progresso, motor="http", incremental=False, capas=False)
+
+    # O Selenium recebe o mesmo progresso, para o job seguir contando de onde estava
+    assert motores == [("http", progresso), ("selenium", progresso)]
+
+
+def test_motor_selenium_escolhido_nao_tenta_o_http(motores):
+    rodar_scraping(motor="selenium", incremental=False, capas=False)
+
+    assert [motor for motor, _ in motores] == ["selenium"]
+
+
+@pytest.mark.skipif(CHROME is None, reason="Chrome não instalado")
+def test_coleta_selenium_pelo_servidor_local(site, esperados):
+    driver = webscraping_livros.criar_driver()
+    try:
+        total_paginas = coleta_quantidade_paginas(driver, site.url_base)
+        links = coleta_links_livros(driver, total_paginas, url_base=site.url_base)
+        info_livros = coleta_info_livros(driver, links, ProgressoScraping())
+    finally:
+        driver.quit()
+
+    tabela = pd.DataFrame(info_livros, columns=COLUNAS_INFO_LIVROS).astype(str)
+    tabela = tabela.assign(imagem=tabela["imagem"].str.removeprefix(site.url_base))
+    pd.testing.assert_frame_equal(tabela, esperados)